@@ -1,4 +1,5 @@
-from flask import Flask, render_template, send_from_directory, send_file, request, jsonify, session, redirect, url_for
+import click
+from flask import Flask, Response, render_template, send_from_directory, send_file, request, jsonify, session, redirect, url_for
 from flask_cors import CORS
 from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
@@ -9,7 +10,9 @@ import json
 import csv
 import logging
 import sys
+import uuid
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -35,7 +38,19 @@ from .config import (
     MAX_FILE_SIZE, ALLOWED_EXTENSIONS, UPLOAD_FOLDER, MODULES,
     JWT_EXPIRATION_HOURS, COURSES, PROJECTS, MODULE_CATEGORIES, COURSE_PROJECTS
 )
-from .utils.validation import allowed_file, validate_input
+from .utils.validation import allowed_file, validate_input, validate_uuid
+from .utils.pagination import validate_pagination, pagination_headers, TIME_ID_CURSOR, NAME_ID_CURSOR
+from .utils.cache import TTLCache
+from .utils.serialization import rows_response, requested_layout
+from .utils.conditional import conditional_get
+from .utils.delta import validate_updated_since, delta_response
+from .utils.events import broker as event_broker, event_stream
+from .utils.view_counter import view_counter
+from .utils.module_registry import module_registry
+from .utils.notebooks import (
+    notebook_cache, render_notebook_html, cell_index_cache, render_cells_page, image_store, admin_image_store,
+    NOTEBOOK_LAZY_BYTES, NOTEBOOK_PAGE_CELLS, NOTEBOOK_MAX_PAGE_CELLS
+)
 from .utils.auth import (
     generate_admin_token, admin_required, admin_page_required
 )
@@ -55,12 +70,14 @@ try:
         update_stage_status, get_project_models, add_project_model,
         get_stage_documents, add_stage_document, update_group_project_info,
         update_group_credentials, get_group_by_username, update_group_last_login,
-        get_group_with_submissions, submit_group_stage_work, get_group_feedback,
+        get_group_document, get_group_neighbors, get_submission_scores,
+        submit_group_stage_work, update_submission_score, get_group_feedback,
         get_class_by_code_section, get_class_by_id, get_students_by_class, get_ungrouped_students,
-        get_grouped_students, assign_student_to_group, get_student_by_campus_id, get_student_by_id,
+        get_grouped_students, get_available_students, get_class_roster, assign_student_to_group, assign_students_to_group, get_student_by_campus_id, get_student_by_id,
         get_group_members, unassign_student_from_group,
         upload_submission_file, get_submission_file_url, delete_submission_file,
-        submit_stage_work, get_group_submissions,
+        submit_stage_work, get_group_submissions, get_admin_submission_rows, get_groups_with_submissions, list_group_comments,
+        get_groups_submission_status as fetch_groups_submission_status,
         # Course Resources
         get_course_resources, get_resource_by_id, create_resource,
         update_resource, delete_resource, reorder_resources, get_resource_counts_by_course,
@@ -69,7 +86,11 @@ try:
         # Assessments
         get_assessments_by_class, create_assessment, update_assessment, delete_assessment,
         get_grades_by_assessment, get_student_grades_for_class, upsert_student_grade,
-        bulk_upsert_grades, get_assessment_stats
+        bulk_upsert_grades, get_assessment_stats,
+        # Admin Dashboard
+        get_admin_stats_summary, repair_admin_stats,
+        # Delta sync
+        get_tombstones
     )
     logger.debug("Successfully imported database_client")
 except Exception as e:
@@ -130,6 +151,13 @@ except Exception as e:
 
 app = Flask(__name__, static_folder='../static', static_url_path='/static')
 
+# Share one database session per request across all database_client helpers
+try:
+    from database import init_app as init_database
+    init_database(app)
+except ImportError as e:
+    logger.warning(f"Request-scoped database session not enabled: {e}")
+
 # =============================================================================
 # SECURITY CONFIGURATION
 # =============================================================================
@@ -240,7 +268,8 @@ else:
 # Configure CORS - only allow specified origins in production
 allowed_origins = os.environ.get('ALLOWED_ORIGINS', 'http://localhost:*').split(',')
 CORS(app, resources={
-    r"/api/*": {"origins": allowed_origins, "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]},
+    r"/api/*": {"origins": allowed_origins, "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+               "expose_headers": ["X-Next-Cursor"]},
 }, supports_credentials=True)
 logger.info(f"CORS configured for origins: {allowed_origins}")
 
@@ -251,34 +280,6 @@ logger.info(f"CORS configured for origins: {allowed_origins}")
 # Auth functions, validation, and config imported from organized modules above
 # See: api/utils/auth.py, api/utils/validation.py, api/config.py
 
-def get_available_modules(course_id=None):
-    """Dynamically discover available module templates for a course.
-
-    Args:
-        course_id: The course identifier (e.g., 'cmsc173'). If None, returns empty dict.
-
-    Returns:
-        Dict of available modules keyed by module number.
-    """
-    if not course_id:
-        return {}
-
-    course = COURSES.get(course_id)
-    if not course:
-        return {}
-
-    templates_dir = os.path.join(os.path.dirname(__file__), 'templates', 'courses', course_id)
-    available = {}
-
-    for module_num, module_info in course.get('modules', {}).items():
-        filename = module_info['filename']
-        filepath = os.path.join(templates_dir, filename)
-
-        if os.path.exists(filepath):
-            available[module_num] = module_info
-
-    return available
-
 @app.route('/')
 def index():
     """Course Hub - main landing page with all courses"""
@@ -307,40 +308,31 @@ def course_detail(course_id):
     # Get projects for this course
     course_projects = [PROJECTS[pid] for pid in course.get('projects', []) if pid in PROJECTS]
 
-    # For CMSC 178IP, load exam notebook data for inline viewing
-    exam_notebook = None
+    # For CMSC 178IP, load the exam answer key for admins
     answer_key_notebook = None
-    if course_id == 'cmsc178ip':
-        notebook_path = os.path.join(
+    answer_key_html = None
+    if course_id == 'cmsc178ip' and session.get('is_admin'):
+        answer_key_path = os.path.join(
             app.root_path, '..', 'static', 'data', 'courses',
-            'cmsc178ip', 'finals_exam', 'student_template',
-            'CMSC178IP_Finals_Unified.ipynb'
+            'cmsc178ip', 'finals_exam', 'admin',
+            'CMSC178IP_Finals_ANSWER_KEY.ipynb'
         )
-        if os.path.exists(notebook_path):
-            with open(notebook_path, 'r') as f:
-                exam_notebook = json.load(f)
-
-        # Load answer key for admins
-        if session.get('is_admin'):
-            answer_key_path = os.path.join(
-                app.root_path, '..', 'static', 'data', 'courses',
-                'cmsc178ip', 'finals_exam', 'admin',
-                'CMSC178IP_Finals_ANSWER_KEY.ipynb'
-            )
-            if os.path.exists(answer_key_path):
-                with open(answer_key_path, 'r') as f:
-                    answer_key_notebook = json.load(f)
+        answer_key = notebook_cache.get(answer_key_path)
+        if answer_key:
+            answer_key_notebook = answer_key.notebook
+            answer_key_html = render_notebook_html(answer_key, class_prefix='nb-', id_prefix='ak-cell-')
 
     return render_template('course_detail.html',
         course=course,
         course_id=course_id,
         projects=course_projects,
         categories=MODULE_CATEGORIES,
+        module_groups=module_registry.course(course_id).groups,
         courses=COURSES,
         active_course=course_id,
         is_admin=session.get('is_admin', False),
-        exam_notebook=exam_notebook,
-        answer_key_notebook=answer_key_notebook
+        answer_key_notebook=answer_key_notebook,
+        answer_key_html=answer_key_html
     )
 
 @app.route('/course/<course_id>/module/<module_id>')
@@ -363,9 +355,9 @@ def show_module(course_id, module_id):
             courses=COURSES
         ), 404
 
-    available_modules = get_available_modules(course_id)
+    module = module_registry.course(course_id).get(module_number)
 
-    if module_number not in available_modules:
+    if module is None:
         return render_template('error.html',
             error_title="Module Not Found",
             error_message=f"Module {module_number} not found in {course['code']}.",
@@ -374,29 +366,15 @@ def show_module(course_id, module_id):
             courses=COURSES
         ), 404
 
-    # -- Supabase Integration --
-    # Only track view counts for numeric module IDs (skip "intro" etc.)
+    # Only track view counts for numeric module IDs (skip "intro" etc.).
+    # Views are buffered in-process and flushed in batches, so this does not
+    # touch the database on the request path.
     view_count = 0
-    supabase_client = get_supabase_client()
-    if supabase_client and isinstance(module_number, int):
-        try:
-            # Increment view count (include course_id for future multi-course analytics)
-            supabase_client.rpc('increment_module_view', {'module_id': module_number}).execute()
-
-            # Get view count
-            response = supabase_client.table('module_views').select('view_count').eq('module_number', module_number).execute()
-            if response.data:
-                view_count = response.data[0]['view_count']
-            logger.info(f"Course {course_id} Module {module_number} view count: {view_count}")
-        except Exception as e:
-            logger.error(f"Error interacting with Supabase for {course_id}/module {module_number}: {e}", exc_info=True)
-            view_count = 0
-    # --------------------------
+    if get_supabase_client() and isinstance(module_number, int):
+        view_count = view_counter.record(course_id, module_number)
 
-    module = available_modules[module_number]
-    # Use course-scoped template path
-    template_path = f"courses/{course_id}/{module['filename']}"
-    return render_template(template_path, view_count=view_count, course=course, course_id=course_id, courses=COURSES)
+    return render_template(module.template, view_count=view_count, course=course, course_id=course_id,
+                           courses=COURSES, module=module)
 
 @app.route('/course/<course_id>/syllabus')
 def show_syllabus(course_id):
@@ -526,7 +504,8 @@ def view_exam_notebook(course_id):
         )
         title = "Finals Exam"
 
-    if not os.path.exists(notebook_path):
+    notebook = notebook_cache.get(notebook_path)
+    if notebook is None:
         return render_template('error.html',
             error_title="File Not Found",
             error_message="Notebook file not found.",
@@ -535,14 +514,10 @@ def view_exam_notebook(course_id):
             courses=COURSES
         ), 404
 
-    # Read notebook JSON
-    import json
-    with open(notebook_path, 'r') as f:
-        notebook_data = json.load(f)
-
     course = COURSES.get(course_id)
     return render_template('notebook_viewer.html',
-        notebook=notebook_data,
+        notebook=notebook.notebook,
+        notebook_html=render_notebook_html(notebook, private=show_answer_key),
         title=title,
         course=course,
         course_id=course_id,
@@ -551,6 +526,33 @@ def view_exam_notebook(course_id):
         courses=COURSES
     )
 
+def _send_notebook_image(store, digest, cache_control):
+    found = store.find(digest)
+    if found is None:
+        return jsonify({"error": "Image not found"}), 404
+    path, mimetype = found
+    response = send_file(path, mimetype=mimetype, etag=digest)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+@app.route('/nbimg/<digest>')
+@limiter.exempt
+def notebook_image(digest):
+    """
+    Serve an image extracted from a public notebook (the exam).
+
+    Images are addressed by the sha256 of their content, so a URL never
+    changes meaning and can be cached forever, by shared caches too.
+    """
+    return _send_notebook_image(image_store, digest, 'public, max-age=31536000, immutable')
+
+@app.route('/admin/nbimg/<digest>')
+@limiter.exempt
+@admin_required
+def admin_notebook_image(digest):
+    """Serve an image extracted from an admin-only notebook (answer key, midterm submissions)."""
+    return _send_notebook_image(admin_image_store, digest, 'private, max-age=31536000, immutable')
+
 @app.route('/course/<course_id>/lab/<int:week_num>/download')
 def download_lab(course_id, week_num):
     """Download lab notebook."""
@@ -715,21 +717,17 @@ def create_group_api():
             group_id = new_group['id']
             logger.info(f"Created group {group_id} with name '{group_name}'")
 
-            # Add members by student ID (update their group_id in the database)
-            for student_id in member_ids:
-                try:
-                    # Assign student to group - this updates the student's group_id in the database
-                    if assign_student_to_group(group_id, student_id):
-                        logger.info(f"Assigned student {student_id} to group {group_id}")
-                    else:
-                        logger.warning(f"Failed to assign student {student_id} to group {group_id}")
-                except Exception as e:
-                    logger.warning(f"Error assigning student {student_id} to group: {e}")
+            # Add members by student ID in one statement (updates their group_id in the database)
+            member_assignments = assign_students_to_group(group_id, member_ids)
+            for outcome in member_assignments:
+                if outcome['status'] != 'assigned':
+                    logger.warning(f"Failed to assign student {outcome['student_id']} to group {group_id}: {outcome['status']}")
 
             # Set group credentials (username and hashed password)
             password_hash = generate_password_hash(password)
             if update_group_credentials(group_id, username, password_hash):
                 logger.info(f"Set credentials for group {group_id}")
+                new_group['member_assignments'] = member_assignments
                 return jsonify(new_group), 201
             else:
                 return jsonify({"error": "Failed to set group credentials"}), 500
@@ -751,9 +749,25 @@ def get_groups_api():
     supabase_client = get_supabase_client()
     if not supabase_client:
         return jsonify({"error": "Supabase not configured"}), 500
-    try:
-        groups = get_groups()
-        return jsonify(groups), 200
+    is_valid, error_msg, limit, cursor = validate_pagination(request.args, TIME_ID_CURSOR)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+    is_valid, error_msg, updated_since = validate_updated_since(request.args)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+    try:
+        if updated_since:
+            tombstones = get_tombstones('groups', updated_since)
+            if tombstones is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            changed = get_groups(columns='summary', updated_since=updated_since)
+            if changed is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            return delta_response(changed, tombstones)
+        groups = get_groups(limit=limit, cursor=cursor, columns='summary')
+        if groups is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        return jsonify(groups), 200, pagination_headers(groups)
     except Exception as e:
         return jsonify({"error": "An internal error occurred"}), 500
 
@@ -763,7 +777,7 @@ def get_group_details_api(group_id):
     if not supabase_client:
         return jsonify({"error": "Supabase not configured"}), 500
     try:
-        group_details = get_group_with_submissions(group_id)
+        group_details = get_group_document(group_id)
         if group_details:
             return jsonify(group_details), 200
         return jsonify({"error": "Group not found"}), 404
@@ -1217,21 +1231,30 @@ def cmsc173_midterm_file(filepath):
         return send_from_directory(directory, filename, as_attachment=True)
 
 
+def _cmsc173_midterm_path(filepath):
+    """Resolve a path inside the CMSC173 midterm data directory, or None if it escapes it."""
+    requested = os.path.realpath(os.path.join(CMSC173_DATA_DIR, filepath))
+    if not requested.startswith(os.path.realpath(CMSC173_DATA_DIR) + os.sep):
+        return None
+    return requested
+
+
 @app.route('/admin_cmsc173_midterm/notebook/<path:filepath>')
 @admin_page_required
 def cmsc173_midterm_notebook(filepath):
-    """View a student's notebook in the notebook viewer."""
-    notebook_path = os.path.realpath(os.path.join(CMSC173_DATA_DIR, filepath))
-    allowed = os.path.realpath(CMSC173_DATA_DIR)
-    if not notebook_path.startswith(allowed + os.sep) or not os.path.exists(notebook_path):
-        return "Notebook not found", 404
+    """
+    View a student's notebook in the notebook viewer.
 
-    with open(notebook_path, 'r', encoding='utf-8') as f:
-        notebook_data = json.load(f)
+    Notebooks of NOTEBOOK_LAZY_BYTES or more (or any with ?lazy=1) open in
+    paged mode: the first page of cells is rendered from the cell index and
+    the viewer fetches the rest from the notebook-cells API as it scrolls.
+    """
+    notebook_path = _cmsc173_midterm_path(filepath)
+    if notebook_path is None or not os.path.isfile(notebook_path):
+        return "Notebook not found", 404
 
     student_name = filepath.split('/')[0].split(' (')[0]
-    return render_template('notebook_viewer.html',
-        notebook=notebook_data,
+    context = dict(
         title=f"Midterm Notebook - {student_name}",
         course=None,
         course_id='cmsc173',
@@ -1241,46 +1264,105 @@ def cmsc173_midterm_notebook(filepath):
         active_page='admin_cmsc173_midterm'
     )
 
+    try:
+        if request.args.get('lazy') == '1' or os.path.getsize(notebook_path) >= NOTEBOOK_LAZY_BYTES:
+            index = cell_index_cache.get(notebook_path)
+            if index is None:
+                return "Notebook not found", 404
+            stop = min(NOTEBOOK_PAGE_CELLS, len(index))
+            return render_template('notebook_viewer.html',
+                notebook=None,
+                notebook_html=render_cells_page(index, 0, stop),
+                lazy_cells_url=url_for('cmsc173_midterm_notebook_cells', filepath=filepath),
+                lazy_next_offset=stop if stop < len(index) else None,
+                cell_count=len(index),
+                **context
+            )
+
+        notebook = notebook_cache.get(notebook_path)
+        if notebook is None:
+            return "Notebook not found", 404
+        notebook_html = render_notebook_html(notebook)
+    except ValueError as e:
+        # Not a notebook, or rewritten while it was being read; same as the notebook-cells API
+        logger.warning(f"Could not read notebook {filepath}: {e}")
+        return "Notebook could not be read", 409
+
+    return render_template('notebook_viewer.html',
+        notebook=notebook.notebook,
+        notebook_html=notebook_html,
+        **context
+    )
+
+
+@app.route('/api/admin/cmsc173-midterm/notebook-cells/<path:filepath>')
+@limiter.exempt
+@admin_required
+def cmsc173_midterm_notebook_cells(filepath):
+    """A page of rendered cells (offset, limit) for the paged notebook viewer."""
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', NOTEBOOK_PAGE_CELLS))
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    if offset < 0 or not 1 <= limit <= NOTEBOOK_MAX_PAGE_CELLS:
+        return jsonify({"error": f"offset must be >= 0 and limit between 1 and {NOTEBOOK_MAX_PAGE_CELLS}"}), 400
+
+    notebook_path = _cmsc173_midterm_path(filepath)
+    if notebook_path is None:
+        return jsonify({"error": "Invalid file path"}), 400
+    if not os.path.isfile(notebook_path):
+        return jsonify({"error": "Notebook not found"}), 404
+    try:
+        index = cell_index_cache.get(notebook_path)
+        if index is None:
+            return jsonify({"error": "Notebook not found"}), 404
+        stop = min(offset + limit, len(index))
+        html = render_cells_page(index, offset, stop)
+    except ValueError as e:
+        # Not a notebook, or rewritten between indexing and reading; a reload re-indexes
+        logger.warning(f"Could not page notebook {filepath}: {e}")
+        return jsonify({"error": "Notebook could not be read"}), 409
+
+    return jsonify({
+        "html": str(html),
+        "offset": offset,
+        "next_offset": stop if stop < len(index) else None,
+        "total": len(index),
+        "version": index.version
+    })
+
 
 @app.route('/api/admin/statistics', methods=['GET'])
 @admin_required
+@conditional_get('groups', 'group_submissions')
 def get_admin_statistics():
-    """Get dashboard statistics for admin"""
+    """Get dashboard statistics for admin (one read of the admin_stats summary row)"""
     supabase_client = get_supabase_client()
     if not supabase_client:
         return jsonify({"error": "Database not configured"}), 500
 
     try:
-        # Count total groups (only active ones)
-        groups_response = supabase_client.table('groups').select('id', count='exact').eq('is_active', True).execute()
-        total_groups = groups_response.count
-
-        # Count total submissions
-        submissions_response = supabase_client.table('group_submissions').select('id', count='exact').execute()
-        total_submissions = submissions_response.count
+        summary = get_admin_stats_summary()
+        if summary is None:
+            return jsonify({"error": "An internal error occurred"}), 500
 
-        # Count submissions by stage
-        submissions_by_stage = {}
-        for stage_num in range(1, 7):
-            stage_response = supabase_client.table('group_submissions').select('id', count='exact').eq('stage_number', stage_num).execute()
-            submissions_by_stage[f'stage_{stage_num}'] = stage_response.count
+        total_groups = summary['total_groups']
+        total_submissions = summary['total_submissions']
+        submissions_by_stage = summary['submissions_by_stage']
 
         # Calculate submission rate per stage
         submission_rates = {}
-        for stage_num in range(1, 7):
-            rate = (submissions_by_stage[f'stage_{stage_num}'] / total_groups * 100) if total_groups > 0 else 0
-            submission_rates[f'stage_{stage_num}'] = round(rate, 1)
-
-        # Get recent submissions (last 10)
-        recent_submissions_query = supabase_client.table('group_submissions').select('*, groups(group_name, project_title)').order('submitted_at', desc=True).limit(10)
-        recent_submissions = recent_submissions_query.execute()
+        for stage_key, count in submissions_by_stage.items():
+            rate = (count / total_groups * 100) if total_groups > 0 else 0
+            submission_rates[stage_key] = round(rate, 1)
 
         statistics = {
             'total_groups': total_groups,
             'total_submissions': total_submissions,
             'submissions_by_stage': submissions_by_stage,
             'submission_rates': submission_rates,
-            'recent_submissions': recent_submissions.data,
+            'recent_submissions': summary['recent_submissions'],
             'average_submissions_per_group': round(total_submissions / total_groups, 1) if total_groups > 0 else 0
         }
 
@@ -1291,52 +1373,85 @@ def get_admin_statistics():
         logger.error(f"Error fetching admin statistics: {e}", exc_info=True)
         return jsonify({"error": "An internal error occurred"}), 500
 
+@app.route('/api/admin/statistics/repair', methods=['POST'])
+@csrf.exempt
+@admin_required
+def repair_admin_statistics():
+    """Recompute the dashboard summary row from scratch."""
+    repaired = repair_admin_stats()
+    if repaired is None:
+        return jsonify({"error": "An internal error occurred"}), 500
+    return jsonify(repaired), 200
+
+@app.cli.command('repair-admin-stats')
+def repair_admin_stats_command():
+    """Recompute the admin_stats summary row (run from cron to correct drift)."""
+    repaired = repair_admin_stats()
+    if repaired is None:
+        raise click.ClickException("Repairing admin stats failed; see the log for details")
+    click.echo(f"admin_stats: {repaired['total_groups']} groups, "
+               f"{repaired['total_submissions']} submissions, "
+               f"by stage {repaired['submissions_by_stage']}")
+
+@app.route('/api/admin/db/pool-stats', methods=['GET'])
+@admin_required
+def get_db_pool_stats():
+    """Live connection pool statistics for the worker serving this request."""
+    try:
+        from database import get_pool_stats
+        return jsonify(get_pool_stats()), 200
+    except Exception as e:
+        logger.error(f"Error fetching pool stats: {e}", exc_info=True)
+        return jsonify({"error": "An internal error occurred"}), 500
+
 @app.route('/api/admin/submissions', methods=['GET'])
 @admin_required
+@conditional_get('groups', 'group_submissions')
 def get_all_submissions_admin():
-    """Get all submissions with optional filters"""
+    """Get submissions (newest first) with optional filters and keyset pagination"""
     supabase_client = get_supabase_client()
     if not supabase_client:
         return jsonify({"error": "Database not configured"}), 500
 
+    is_valid, error_msg, limit, cursor = validate_pagination(request.args, TIME_ID_CURSOR)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+    is_valid, error_msg, updated_since = validate_updated_since(request.args)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+
     try:
         # Get query parameters for filtering
         group_id = request.args.get('group_id')
         stage_number = request.args.get('stage_number')
 
-        # Build query
-        query = supabase_client.table('group_submissions').select('*, groups(id, group_name, project_title)')
-
-        # Apply filters
-        if group_id:
-            query = query.eq('group_id', group_id)
-        if stage_number:
-            query = query.eq('stage_number', int(stage_number))
-
-        # Order by submission date (newest first)
-        query = query.order('submitted_at', desc=True)
-
-        response = query.execute()
-
-        # Flatten the response data for the frontend
-        flattened_submissions = []
-        for submission in response.data:
-            group_data = submission.get('groups', {})
-            flattened_submission = {
-                'id': submission.get('id'),
-                'group_id': submission.get('group_id'),
-                'group_name': group_data.get('group_name') if group_data else 'N/A',
-                'project_title': group_data.get('project_title') if group_data else 'N/A',
-                'stage': submission.get('stage_number'),
-                'stage_number': submission.get('stage_number'),
-                'file_name': submission.get('file_path', '').split('/')[-1] if submission.get('file_path') else 'N/A',
-                'submitted_at': submission.get('submitted_at'),
-                'file_size': submission.get('file_size'),
-            }
-            flattened_submissions.append(flattened_submission)
-
-        logger.info(f"Fetched {len(flattened_submissions)} submissions for admin")
-        return jsonify(flattened_submissions), 200
+        if updated_since:
+            # Changed rows since the client's last sync, plus deleted submission ids
+            tombstones = get_tombstones('group_submissions', updated_since)
+            if tombstones is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            changed = get_admin_submission_rows(
+                group_id=group_id,
+                stage_number=int(stage_number) if stage_number else None,
+                updated_since=updated_since
+            )
+            if changed is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            return delta_response(changed, tombstones, requested_layout(request.args))
+
+        # Rows come back already flattened for the frontend; without a limit
+        # they stream from a server-side cursor instead of being buffered
+        submissions = get_admin_submission_rows(
+            group_id=group_id,
+            stage_number=int(stage_number) if stage_number else None,
+            limit=limit,
+            cursor=cursor,
+            stream=True
+        )
+        if submissions is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        return rows_response(submissions, requested_layout(request.args),
+                             headers=pagination_headers(submissions))
 
     except Exception as e:
         logger.error(f"Error fetching submissions: {e}", exc_info=True)
@@ -1490,6 +1605,7 @@ def view_submission_file(submission_id):
 
 @app.route('/api/admin/groups/submission-status', methods=['GET'])
 @admin_required
+@conditional_get('groups', 'group_submissions')
 def get_groups_submission_status():
     """Get all groups with their submission status for each stage"""
     supabase_client = get_supabase_client()
@@ -1497,46 +1613,9 @@ def get_groups_submission_status():
         return jsonify({"error": "Database not configured"}), 500
 
     try:
-        # Get all active groups
-        groups_response = supabase_client.table('groups').select('id, group_name, project_title').eq('is_active', True).execute()
-
-        if not groups_response.data:
-            return jsonify([]), 200
-
-        groups_data = []
-
-        # For each group, get submission status for each stage
-        for group in groups_response.data:
-            group_id = group['id']
-            group_name = group.get('group_name', 'N/A')
-            project_title = group.get('project_title', 'N/A')
-
-            # Get submissions for this group
-            submissions_response = supabase_client.table('group_submissions').select('stage_number').eq('group_id', group_id).execute()
-
-            # Create a set of stages that have submissions
-            submitted_stages = set()
-            if submissions_response.data:
-                for submission in submissions_response.data:
-                    stage_num = submission.get('stage_number')
-                    if stage_num:
-                        submitted_stages.add(stage_num)
-
-            # Build the group status object
-            group_status = {
-                'id': group_id,
-                'group_name': group_name,
-                'project_title': project_title,
-                'stages': {
-                    'stage_1': 1 in submitted_stages,
-                    'stage_2': 2 in submitted_stages,
-                    'stage_3': 3 in submitted_stages,
-                    'stage_4': 4 in submitted_stages,
-                    'stage_5': 5 in submitted_stages,
-                    'stage_6': 6 in submitted_stages,
-                }
-            }
-            groups_data.append(group_status)
+        groups_data = fetch_groups_submission_status()
+        if groups_data is None:
+            return jsonify({"error": "An internal error occurred"}), 500
 
         logger.info(f"Fetched submission status for {len(groups_data)} groups")
         return jsonify(groups_data), 200
@@ -1597,22 +1676,19 @@ def group_submission_portal():
 
     group_id = session.get('group_id')
     try:
-        group = get_group_with_submissions(group_id)
+        group = get_group_document(group_id)
         if not group:
             return render_template('group_submission_portal.html', error='Group not found', group=None, courses=COURSES)
 
-        # Derive project from group's class
+        # Derive project from group's class (course_code comes with the group document)
         project_id = 'ml-research-project'  # Default fallback
         course_id = 'cmsc173'  # Default fallback
 
-        class_id = group.get('class_id')
-        if class_id:
-            class_data = get_class_by_id(class_id)
-            if class_data:
-                course_code = class_data.get('course_code', '')
-                project_id = COURSE_PROJECTS.get(course_code, 'ml-research-project')
-                project_config = PROJECTS.get(project_id, {})
-                course_id = project_config.get('course', 'cmsc173')
+        course_code = group.get('class_course_code')
+        if course_code:
+            project_id = COURSE_PROJECTS.get(course_code, 'ml-research-project')
+            project_config = PROJECTS.get(project_id, {})
+            course_id = project_config.get('course', 'cmsc173')
 
         project = PROJECTS.get(project_id, PROJECTS.get('ml-research-project', {}))
         course = COURSES.get(course_id, COURSES.get('cmsc173', {}))
@@ -1628,62 +1704,68 @@ def group_submission_portal():
         logger.error(f"Error loading group submission portal: {e}", exc_info=True)
         return render_template('group_submission_portal.html', error='An error occurred', group=None, courses=COURSES)
 
+# Group documents fetched ahead of the admin clicking "Next" while grading.
+# Entries are consumed on first use and expire quickly, so a grader never
+# sees a document older than GROUP_PREFETCH_TTL seconds.
+GROUP_PREFETCH_TTL = 30
+_group_prefetch = TTLCache(ttl=GROUP_PREFETCH_TTL, max_entries=32)
+_group_prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='group-prefetch')
+
+
+def _prefetch_key(group_id):
+    """Cache key for a group id, whether it came from the URL (str) or the database (UUID)."""
+    return str(group_id).lower()
+
+
+def _prefetch_group_document(group_id):
+    """Warm the prefetch cache with a group's document (runs on the prefetch thread)."""
+    try:
+        document = get_group_document(group_id)
+        if document:
+            _group_prefetch.set(_prefetch_key(group_id), document)
+    except Exception as e:
+        logger.warning(f"Could not prefetch group {group_id}: {e}")
+
+
 @app.route('/admin/group/<group_id>')
 @admin_page_required
 def admin_view_group(group_id):
     """Admin view of a specific group's submissions and portal (admin only)"""
     try:
-        supabase_client = get_supabase_client()
-        group = get_group_with_submissions(group_id)
+        group = _group_prefetch.pop(_prefetch_key(group_id)) or get_group_document(group_id)
         if not group:
             return render_template('group_submission_portal.html', error='Group not found', courses=COURSES)
 
-        # Derive project from group's class
+        # Derive project from group's class (course_code comes with the group document)
         project_id = 'ml-research-project'  # Default fallback
         course_id = 'cmsc173'  # Default fallback
 
-        class_id = group.get('class_id')
-        if class_id:
-            class_data = get_class_by_id(class_id)
-            if class_data:
-                course_code = class_data.get('course_code', '')
-                project_id = COURSE_PROJECTS.get(course_code, 'ml-research-project')
-                project_config = PROJECTS.get(project_id, {})
-                course_id = project_config.get('course', 'cmsc173')
+        course_code = group.get('class_course_code')
+        if course_code:
+            project_id = COURSE_PROJECTS.get(course_code, 'ml-research-project')
+            project_config = PROJECTS.get(project_id, {})
+            course_id = project_config.get('course', 'cmsc173')
 
         project = PROJECTS.get(project_id, PROJECTS.get('ml-research-project', {}))
         course = COURSES.get(course_id, COURSES.get('cmsc173', {}))
 
-        # Get all groups for prev/next navigation
-        prev_group_id = None
-        next_group_id = None
-        try:
-            all_groups = supabase_client.table('groups').select('id, group_name').order('group_name').execute()
-            if all_groups.data:
-                group_ids = [g['id'] for g in all_groups.data]
-                if group_id in group_ids:
-                    current_index = group_ids.index(group_id)
-                    if current_index > 0:
-                        prev_group_id = group_ids[current_index - 1]
-                    if current_index < len(group_ids) - 1:
-                        next_group_id = group_ids[current_index + 1]
-        except Exception as nav_error:
-            logger.warning(f"Could not fetch group navigation: {nav_error}")
-
-        # Fetch existing scores for this group's submissions
+        # Prev/next navigation (only the neighboring rows are read)
+        neighbors = get_group_neighbors(group_id)
+        prev_group_id = neighbors['prev_id']
+        next_group_id = neighbors['next_id']
+
+        # Warm the next group's document while the admin grades this one
+        if next_group_id and _prefetch_key(next_group_id) not in _group_prefetch:
+            _group_prefetch_executor.submit(_prefetch_group_document, next_group_id)
+
+        # Fetch existing scores for this group's submissions, keyed by submission position
         scores = {}
         try:
-            if group.get('submissions'):
-                submission_ids = [s['id'] for s in group['submissions'] if s]
-                if submission_ids:
-                    scores_result = supabase_client.table('submission_scores').select('*').in_('submission_id', submission_ids).execute()
-                    if scores_result.data:
-                        for score in scores_result.data:
-                            # Find which stage this score belongs to
-                            for i, sub in enumerate(group['submissions']):
-                                if sub and sub['id'] == score['submission_id']:
-                                    scores[i] = score
-                                    break
+            submission_index = {str(sub['id']): i for i, sub in enumerate(group.get('submissions') or []) if sub}
+            for score in get_submission_scores(list(submission_index)):
+                i = submission_index.get(str(score['submission_id']))
+                if i is not None:
+                    scores[i] = score
             group['scores'] = scores
         except Exception as score_error:
             logger.warning(f"Could not fetch scores: {score_error}")
@@ -2045,29 +2127,24 @@ def get_students_by_class_api(class_id):
 
 @app.route('/api/students/ungrouped/all', methods=['GET'])
 def get_all_ungrouped_students_api():
-    """Get all ungrouped students across all classes."""
+    """Get all ungrouped students across all classes (or one, with ?class_id=)."""
     try:
         supabase_client = get_supabase_client()
         if not supabase_client:
             return jsonify({"error": "Database not configured"}), 500
 
-        # Get all ungrouped students
-        response = supabase_client.table('students').select('*').is_('group_id', 'null').order('last_name').execute()
-        students = response.data
+        class_id = request.args.get('class_id') or None
+        if class_id:
+            is_valid, error = validate_uuid(class_id, "class_id")
+            if not is_valid:
+                return jsonify({"error": error}), 400
 
-        # Return safe student data
-        safe_students = []
-        for student in students:
-            safe_students.append({
-                'id': student['id'],
-                'first_name': student.get('first_name', ''),
-                'last_name': student.get('last_name', ''),
-                'campus_id': student.get('campus_id', ''),
-                'program': student.get('program', ''),
-                'class_id': student.get('class_id', '')
-            })
+        # Only the picker's columns are selected, so no sensitive fields leave the database
+        students = get_available_students(class_id=class_id)
+        if students is None:
+            return jsonify({"error": "An internal error occurred"}), 500
 
-        return jsonify(safe_students), 200
+        return jsonify(students), 200
     except Exception as e:
         logger.error(f"Error getting all ungrouped students: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
@@ -2112,7 +2189,7 @@ def get_student_api(campus_id):
 def assign_student_to_group_api(student_id, group_id):
     """Assign a student to a group."""
     try:
-        success = assign_student_to_group(student_id, group_id)
+        success = assign_student_to_group(group_id, student_id)
         if success:
             logger.info(f"Assigned student {student_id} to group {group_id}")
             return jsonify({"success": True}), 200
@@ -2188,30 +2265,16 @@ def get_available_students_for_group_api():
     if not supabase_client:
         return jsonify({"error": "Database not configured"}), 500
 
-    try:
-        # Get all ungrouped students
-        all_ungrouped = supabase_client.table('students').select('*').is_('group_id', 'null').order('last_name').execute()
-        ungrouped_students = all_ungrouped.data if all_ungrouped.data else []
+    if not group_id:
+        return jsonify({"error": "group_id is required"}), 400
 
-        # Get current group members
-        group_members = supabase_client.table('group_members').select('student_id').eq('group_id', group_id).execute()
-        member_ids = {m['student_id'] for m in (group_members.data if group_members.data else [])}
+    try:
+        # Ungrouped students in the group's class, minus current members, in one query
+        available_students = get_available_students(group_id=group_id)
+        if available_students is None:
+            return jsonify({"error": "An internal error occurred"}), 500
 
-        # Filter out students already in this group
-        available_students = [
-            {
-                'id': student['id'],
-                'first_name': student.get('first_name', ''),
-                'last_name': student.get('last_name', ''),
-                'campus_id': student.get('campus_id', ''),
-                'program': student.get('program', ''),
-                'class_id': student.get('class_id', '')
-            }
-            for student in ungrouped_students
-            if student['id'] not in member_ids
-        ]
-
-        logger.info(f"Group {group_id}: Found {len(ungrouped_students)} ungrouped, {len(member_ids)} group members, returning {len(available_students)} available")
+        logger.info(f"Group {group_id}: returning {len(available_students)} available students")
         return jsonify(available_students), 200
     except Exception as e:
         logger.error(f"Error getting available students for group: {e}")
@@ -2247,31 +2310,18 @@ def add_group_member_api():
             logger.warning(f"Invalid student_id for adding to group: {error_msg}")
             return jsonify({"error": error_msg}), 400
 
-        success = assign_student_to_group(group_id, student_id)
-        if success:
+        outcome = assign_students_to_group(group_id, [student_id])[0]
+        if outcome['status'] == 'assigned':
             logger.info(f"Student {student_id} successfully added to group {group_id}")
             return jsonify({"success": True, "message": "Student added successfully"}), 200
+        elif outcome['status'] == 'already_grouped':
+            error_msg = f"Student {outcome['first_name'] or ''} {outcome['last_name'] or ''} is already in another group"
+            logger.warning(f"Failed to add student {student_id} to group {group_id}: {error_msg}")
+            return jsonify({"error": error_msg}), 400
+        elif outcome['status'] == 'not_found':
+            logger.warning(f"Student {student_id} not found in database")
+            return jsonify({"error": "Student not found"}), 404
         else:
-            # Check why the assignment failed - most likely student already in a group
-            logger.warning(f"assign_student_to_group returned False for student {student_id} and group {group_id}")
-            try:
-                # Use regular query (no .single()) to get list of students
-                student_response = supabase_client.table('students').select('group_id, first_name, last_name').eq('id', student_id).execute()
-                logger.info(f"Student response: {student_response.data}")
-                if student_response.data and len(student_response.data) > 0:
-                    student_data = student_response.data[0]
-                    if student_data.get('group_id') is not None:
-                        error_msg = f"Student {student_data.get('first_name', '')} {student_data.get('last_name', '')} is already in another group"
-                        logger.warning(f"Failed to add student {student_id} to group {group_id}: {error_msg}")
-                        return jsonify({"error": error_msg}), 400
-                    else:
-                        logger.warning(f"Student {student_id} exists but assignment failed for unknown reason")
-                else:
-                    logger.warning(f"Student {student_id} not found in database")
-                    return jsonify({"error": "Student not found"}), 404
-            except Exception as e:
-                logger.error(f"Error checking student status: {e}", exc_info=True)
-
             logger.warning(f"Failed to add student {student_id} to group {group_id} - unknown reason")
             return jsonify({"error": "Failed to add student to group"}), 500
     except Exception as e:
@@ -2302,11 +2352,14 @@ def get_group_comments(group_id):
         if not is_valid:
             return jsonify({"error": error_msg}), 400
 
-        # Fetch comments from group_comments table
-        response = supabase_client.table('group_comments').select('*').eq('group_id', group_id).order('created_at', desc=True).execute()
+        is_valid, error_msg, limit, cursor = validate_pagination(request.args, TIME_ID_CURSOR)
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
 
-        logger.info(f"Fetched {len(response.data)} comments for group {group_id}")
-        return jsonify(response.data), 200
+        comments = list_group_comments(group_id, limit=limit, cursor=cursor)
+        if comments is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        return jsonify(comments), 200, pagination_headers(comments)
 
     except Exception as e:
         logger.error(f"Error fetching group comments: {e}", exc_info=True)
@@ -2361,6 +2414,8 @@ def get_class_api(course_code, section):
     Args:
         course_code: Course code (e.g., 'cmsc173', 'CMSC173')
         section: Section letter (e.g., 'a', 'A', 'd', 'D')
+
+    Pass ?counts_only=1 to get just the class and its student counts.
     """
     try:
         # Normalize inputs
@@ -2377,18 +2432,12 @@ def get_class_api(course_code, section):
             logger.warning(f"Class not found: {course_code_upper} Section {section_upper}")
             return jsonify({"error": "Class not found"}), 404
 
-        all_students = get_students_by_class(cmsc_class['id'])
-        ungrouped = get_ungrouped_students(cmsc_class['id'])
-        grouped = get_grouped_students(cmsc_class['id'])
+        counts_only = request.args.get('counts_only', '').lower() in ('1', 'true', 'yes')
+        roster = get_class_roster(cmsc_class['id'], counts_only=counts_only)
+        if roster is None:
+            return jsonify({"error": "An internal error occurred"}), 500
 
-        return jsonify({
-            "class": cmsc_class,
-            "total_students": len(all_students),
-            "ungrouped_count": len(ungrouped),
-            "grouped_count": len(grouped),
-            "ungrouped_students": ungrouped,
-            "grouped_students": grouped
-        }), 200
+        return jsonify({"class": cmsc_class, **roster}), 200
     except Exception as e:
         logger.error(f"Error getting class {course_code}/{section}: {e}", exc_info=True)
         return jsonify({"error": "An internal error occurred"}), 500
@@ -2420,6 +2469,10 @@ def save_submission_score(submission_id):
     if not supabase:
         return jsonify({"error": "Database not configured"}), 500
 
+    is_valid, error = validate_uuid(submission_id, "submission_id")
+    if not is_valid:
+        return jsonify({"error": error}), 400
+
     try:
         data = request.json or request.form.to_dict()
         score = float(data.get('score', 0))
@@ -2427,22 +2480,35 @@ def save_submission_score(submission_id):
         feedback = data.get('feedback', '')
         admin_notes = data.get('admin_notes', '')
 
-        result = supabase.table('group_submissions').update({
-            'score': score,
-            'max_score': max_score,
-            'feedback': feedback,
-            'admin_notes': admin_notes
-        }).eq('id', submission_id).execute()
-
-        # Return updated record
-        result = supabase.table('group_submissions').select('*').eq('id', submission_id).execute()
-        return jsonify(result.data[0] if result.data else {"error": "Not found"}), 200 if result.data else 404
+        # Also notifies the live admin feed once the request commits
+        submission = update_submission_score(submission_id, score, max_score, feedback, admin_notes)
+        if submission is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        if submission is False:
+            return jsonify({"error": "Not found"}), 404
+        return jsonify(submission), 200
     except ValueError:
         return jsonify({"error": "Invalid score value"}), 400
     except Exception as e:
         logger.error(f"Error saving submission score: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
+@app.route('/api/admin/events', methods=['GET'])
+@admin_required
+def admin_events_stream():
+    """Live submission, score and group changes as Server-Sent Events.
+
+    Events come from this worker's single LISTEN connection; the stream holds
+    a gthread worker thread, not a DB connection, and ends after a few
+    minutes so EventSource reconnects.
+    """
+    subscription = event_broker.subscribe()
+    if subscription is None:
+        # This worker's stream slots are full; the dashboard keeps polling
+        return jsonify({"error": "Too many live connections"}), 503, {'Retry-After': '30'}
+    return Response(event_stream(event_broker, subscription), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/admin/submissions/<submission_id>/score', methods=['GET'])
 @admin_required
 def get_submission_score(submission_id):
@@ -2464,15 +2530,23 @@ def get_submission_score(submission_id):
 @app.route('/api/admin/groups/submissions-grid', methods=['GET'])
 @admin_required
 def get_groups_submissions_grid():
-    """Get all groups with their submission statuses organized for dashboard grid view."""
+    """Get all groups with their submission statuses organized for dashboard grid view.
+
+    Submissions carry the "summary" projection; pass ?fields=full to include
+    summary_markdown and content.
+    """
     supabase = get_supabase_client()
     if not supabase:
         return jsonify({"error": "Database not configured"}), 500
 
+    fields = request.args.get('fields', 'summary')
+    if fields not in ('summary', 'full'):
+        return jsonify({"error": "fields must be 'summary' or 'full'"}), 400
+
     try:
         # Get all groups with their submissions
-        groups = supabase.table('groups').select('*, group_submissions(*)').eq('is_active', True).execute()
-        return jsonify(groups.data), 200
+        groups = get_groups_with_submissions(submission_columns=fields)
+        return jsonify(groups), 200
     except Exception as e:
         logger.error(f"Error getting groups submissions grid: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
@@ -2849,11 +2923,21 @@ def reorder_resources_api():
             return jsonify({"error": "course_id is required"}), 400
         if not isinstance(ordered_ids, list):
             return jsonify({"error": "ordered_ids must be a list"}), 400
+        for resource_id in ordered_ids:
+            is_valid, error_msg = validate_uuid(resource_id, "each of ordered_ids")
+            if not is_valid:
+                return jsonify({"error": error_msg}), 400
+        # Canonical form, so differently written duplicates are caught too
+        ordered_ids = [str(uuid.UUID(resource_id)) for resource_id in ordered_ids]
+        if len(set(ordered_ids)) != len(ordered_ids):
+            return jsonify({"error": "ordered_ids must not contain duplicates"}), 400
 
         success = reorder_resources(course_id, ordered_ids)
         if success:
             logger.info(f"Resources reordered for course {course_id}")
             return jsonify({"message": "Resources reordered successfully"}), 200
+        elif success is False:
+            return jsonify({"error": "ordered_ids must all be resources of this course"}), 400
         else:
             return jsonify({"error": "Failed to reorder resources"}), 500
 
@@ -2897,10 +2981,19 @@ def get_classes_api():
 @app.route('/api/admin/class-records/<class_id>', methods=['GET'])
 @admin_required
 def get_class_records_api(class_id):
-    """Get all students in a class with exam status and scores."""
+    """Get students in a class with exam status and scores.
+
+    Keyset-paginated with ?limit=&cursor=; ?format=compact returns
+    {"columns": [...], "rows": [[...], ...]} instead of an array of objects.
+    """
+    is_valid, error_msg, limit, cursor = validate_pagination(request.args, NAME_ID_CURSOR)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
     try:
-        records = get_class_records(class_id)
-        return jsonify(records), 200
+        records = get_class_records(class_id, limit=limit, cursor=cursor, compact=True, stream=True)
+        if records is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        return rows_response(records, requested_layout(request.args), headers=pagination_headers(records))
     except Exception as e:
         logger.error(f"Error fetching class records: {e}", exc_info=True)
         return jsonify({"error": "An internal error occurred"}), 500
@@ -3068,10 +3161,27 @@ def get_assessment_stats_api(assessment_id):
 @app.route('/api/admin/grades/<assessment_id>', methods=['GET'])
 @admin_required
 def get_grades_api(assessment_id):
-    """Get all grades for an assessment."""
-    try:
-        grades = get_grades_by_assessment(assessment_id)
-        return jsonify(grades), 200
+    """Get grades for an assessment (?limit=&cursor= pagination, ?updated_since= delta, ?format=compact layout)."""
+    is_valid, error_msg, limit, cursor = validate_pagination(request.args, NAME_ID_CURSOR)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+    is_valid, error_msg, updated_since = validate_updated_since(request.args)
+    if not is_valid:
+        return jsonify({"error": error_msg}), 400
+    try:
+        if updated_since:
+            # Grades are only removed with their assessment, so there are no tombstones
+            tombstones = get_tombstones('student_grades', updated_since)
+            if tombstones is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            grades = get_grades_by_assessment(assessment_id, compact=True, updated_since=updated_since)
+            if grades is None:
+                return jsonify({"error": "An internal error occurred"}), 500
+            return delta_response(grades, tombstones, requested_layout(request.args))
+        grades = get_grades_by_assessment(assessment_id, limit=limit, cursor=cursor, compact=True, stream=True)
+        if grades is None:
+            return jsonify({"error": "An internal error occurred"}), 500
+        return rows_response(grades, requested_layout(request.args), headers=pagination_headers(grades))
     except Exception as e:
         logger.error(f"Error fetching grades: {e}", exc_info=True)
         return jsonify({"error": "An internal error occurred"}), 500
@@ -3141,11 +3251,18 @@ def bulk_upsert_grades_api():
 
         if not assessment_id:
             return jsonify({"error": "assessment_id is required"}), 400
+        is_valid, error_msg = validate_uuid(assessment_id, "assessment_id")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
 
         if not isinstance(grades, list):
             return jsonify({"error": "grades must be a list"}), 400
 
         result = bulk_upsert_grades(assessment_id, grades)
+        if result is None:
+            return jsonify({"error": "Failed to save grades"}), 500
+        if result is False:
+            return jsonify({"error": "Assessment not found"}), 404
         return jsonify(result), 200
 
     except Exception as e:
@@ -4,41 +4,15 @@ from flask import Blueprint, render_template, send_from_directory
 import logging
 
 from ..config import COURSES, PROJECTS, MODULE_CATEGORIES
+from ..utils.database_client import get_supabase_client
+from ..utils.module_registry import module_registry
+from ..utils.view_counter import view_counter
 
 logger = logging.getLogger(__name__)
 
 courses_bp = Blueprint('courses', __name__)
 
 
-def get_available_modules(course_id: str = None) -> dict:
-    """Dynamically discover available module templates for a course.
-
-    Args:
-        course_id: The course identifier (e.g., 'cmsc173').
-
-    Returns:
-        Dict of available modules keyed by module number.
-    """
-    if not course_id:
-        return {}
-
-    course = COURSES.get(course_id)
-    if not course:
-        return {}
-
-    templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'courses', course_id)
-    available = {}
-
-    for module_num, module_info in course.get('modules', {}).items():
-        filename = module_info['filename']
-        filepath = os.path.join(templates_dir, filename)
-
-        if os.path.exists(filepath):
-            available[module_num] = module_info
-
-    return available
-
-
 @courses_bp.route('/')
 def index():
     """Course Hub - main landing page with all courses."""
@@ -69,6 +43,7 @@ def course_detail(course_id: str):
         course_id=course_id,
         projects=course_projects,
         categories=MODULE_CATEGORIES,
+        module_groups=module_registry.course(course_id).groups,
         courses=COURSES,
         active_course=course_id
     )
@@ -91,9 +66,9 @@ def show_module(course_id: str, module_id: str):
             back_text="Back to Course Hub"
         ), 404
 
-    available_modules = get_available_modules(course_id)
+    module = module_registry.course(course_id).get(module_number)
 
-    if module_number not in available_modules:
+    if module is None:
         return render_template('error.html',
             error_title="Module Not Found",
             error_message=f"Module {module_number} not found in {course['code']}.",
@@ -101,24 +76,13 @@ def show_module(course_id: str, module_id: str):
             back_text=f"Back to {course['code']}"
         ), 404
 
-    # Optional: Track view count via Supabase
+    # Views are buffered in-process and flushed in batches (see view_counter)
     view_count = 0
-    try:
-        from api.utils.supabase_client import get_supabase_client
-        supabase_client = get_supabase_client()
-        if supabase_client:
-            supabase_client.rpc('increment_module_view', {'module_id': module_number}).execute()
-            response = supabase_client.table('module_views').select('view_count').eq('module_number', module_number).execute()
-            if response.data:
-                view_count = response.data[0]['view_count']
-            logger.info(f"Course {course_id} Module {module_number} view count: {view_count}")
-    except Exception as e:
-        logger.error(f"Error tracking module view: {e}", exc_info=True)
-        view_count = 0
-
-    module = available_modules[module_number]
-    template_path = f"courses/{course_id}/{module['filename']}"
-    return render_template(template_path, view_count=view_count, course=course, course_id=course_id)
+    if get_supabase_client() and isinstance(module_number, int):
+        view_count = view_counter.record(course_id, module_number)
+
+    return render_template(module.template, view_count=view_count, course=course, course_id=course_id,
+                           module=module)
 
 
 @courses_bp.route('/favicon.ico')
@@ -4,15 +4,21 @@ This module provides database abstraction for the presenter app,
 replacing Supabase client with direct PostgreSQL queries via SQLAlchemy.
 """
 import os
+import io
+import re
 import json
+import math
+import uuid
 import logging
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Sequence, Tuple
 from sqlalchemy import text
 from database import (
-    execute_raw_sql, execute_insert, execute_update,
-    row_to_dict, rows_to_dicts, get_db_context
+    execute_raw_sql, execute_raw_sql_compact, stream_raw_sql, execute_insert, execute_update,
+    row_to_dict, rows_to_dicts, get_db_context, CompactRows, StreamedRows
 )
+from .pagination import Page, encode_cursor, decode_cursor
+from .events import EVENTS_CHANNEL
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,122 @@ def get_supabase_admin_client():
     return os.environ.get('DATABASE_URL') is not None
 
 
+# --- Column Projections ---
+
+# Named column sets for read helpers. "full" selects every column; "summary"
+# leaves out large text columns (submission markdown/content, group project
+# write-ups) and credentials, for list endpoints that only show ids and names.
+PROJECTIONS = {
+    'students': {
+        'summary': ('id', 'first_name', 'last_name', 'email', 'campus_id', 'program',
+                    'class_id', 'group_id'),
+    },
+    'groups': {
+        'summary': ('id', 'group_name', 'project_title', 'class_id', 'is_active', 'created_at'),
+    },
+    'group_submissions': {
+        'summary': ('id', 'group_id', 'stage_number', 'presentation_link', 'file_path', 'file_name',
+                    'file_size', 'file_mime_type', 'submitted_at', 'updated_at'),
+    },
+}
+
+# A projection is a name from PROJECTIONS, "full", or an explicit column list
+Columns = Union[str, Sequence[str]]
+
+_IDENTIFIER = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def resolve_columns(table: str, columns: Columns = 'full',
+                    required: Sequence[str] = ()) -> Optional[Tuple[str, ...]]:
+    """
+    Resolve a projection to a tuple of column names, or None for every column.
+
+    Columns in `required` (e.g. keyset sort keys) are appended when missing.
+    Raises ValueError for unknown projection names or invalid identifiers.
+    """
+    if columns is None or columns == 'full':
+        return None
+    if isinstance(columns, str):
+        if columns not in PROJECTIONS.get(table, {}):
+            raise ValueError(f"Unknown projection '{columns}' for {table}")
+        resolved = PROJECTIONS[table][columns]
+    else:
+        resolved = tuple(columns)
+        invalid = [c for c in resolved if not _IDENTIFIER.match(c)]
+        if not resolved or invalid:
+            raise ValueError(f"Invalid columns for {table}: {invalid or 'none given'}")
+    return resolved + tuple(c for c in required if c not in resolved)
+
+
+def _select_list(table: str, columns: Columns = 'full', alias: Optional[str] = None,
+                 required: Sequence[str] = ()) -> str:
+    """SQL select list for a projection, e.g. "s.id, s.first_name" or "s.*"."""
+    prefix = f"{alias}." if alias else ''
+    resolved = resolve_columns(table, columns, required)
+    if resolved is None:
+        return f"{prefix}*"
+    return ', '.join(f"{prefix}{column}" for column in resolved)
+
+
+def _jsonb_object(table: str, columns: Columns, alias: str) -> str:
+    """SQL expression building a jsonb object of a row's projected columns."""
+    resolved = resolve_columns(table, columns)
+    if resolved is None:
+        return f"to_jsonb({alias})"
+    return "jsonb_build_object(" + ', '.join(f"'{c}', {alias}.{c}" for c in resolved) + ")"
+
+
+def _fetch_keyset_page(query: str, params: Dict[str, Any], sort_keys: List[str], after_clause: str,
+                       limit: Optional[int] = None, cursor: Optional[str] = None,
+                       compact: bool = False, stream: bool = False) -> Union[Page, CompactRows, StreamedRows]:
+    """
+    Run a query that ends in ORDER BY, returning one keyset page.
+
+    The query marks where the cursor predicate goes with {after}; after_clause
+    compares the ORDER BY columns against :after_0, :after_1, ... Rows are read
+    one past the limit to tell whether another page exists. With compact=True
+    the page is CompactRows (tuples + shared header) instead of dicts. With
+    stream=True and no limit, the rows come back as StreamedRows read from a
+    server-side cursor.
+    """
+    params = dict(params)
+    if cursor:
+        for i, value in enumerate(decode_cursor(cursor, len(sort_keys))):
+            params[f'after_{i}'] = value
+        query = query.replace('{after}', after_clause)
+    else:
+        query = query.replace('{after}', '')
+
+    if stream and limit is None:
+        return stream_raw_sql(query, params)
+
+    if limit is not None:
+        params['limit'] = limit + 1
+        query += "\nLIMIT :limit"
+
+    if compact or stream:
+        page = execute_raw_sql_compact(query, params)
+        if limit is not None and len(page) > limit:
+            del page.rows[limit:]
+            last = page.rows[-1]
+            page.next_cursor = encode_cursor([last[page.index_of(key)] for key in sort_keys])
+        return page
+
+    rows = rows_to_dicts(execute_raw_sql(query, params))
+    if limit is None or len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor([rows[-1][key] for key in sort_keys]))
+
+
+def _notify_change(db, kind: str, **payload) -> None:
+    """Queue a live-feed event (api/utils/events.py); Postgres delivers it when db's transaction commits."""
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {
+        'channel': EVENTS_CHANNEL,
+        'payload': json.dumps({'kind': kind, **payload}, default=str),
+    })
+
+
 # --- Group CRUD Operations ---
 
 def create_group(group_name: str, project_title: str, class_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -45,6 +167,8 @@ def create_group(group_name: str, project_title: str, class_id: Optional[str] =
         with get_db_context() as db:
             result = db.execute(text(query), params)
             group = result.fetchone()
+            if group:
+                _notify_change(db, 'group', action='created', group_id=group.id)
             logger.info(f"Group created: {group.id if group else 'unknown'}")
             return row_to_dict(group)
     except Exception as e:
@@ -69,6 +193,7 @@ def add_group_member(group_id: str, member_name: str, student_id: Optional[str]
         with get_db_context() as db:
             result = db.execute(text(query), params)
             member = result.fetchone()
+            _notify_change(db, 'group', action='members', group_id=group_id)
             logger.info(f"Member '{member_name}' (student ID: {student_id}) added to group {group_id}")
             return row_to_dict(member)
     except Exception as e:
@@ -100,12 +225,33 @@ def add_group_document(group_id: str, document_title: str, file_path: str) -> Op
         return None
 
 
-def get_groups() -> List[Dict[str, Any]]:
-    """Get all active groups with members, using batch queries to avoid N+1."""
+def get_groups(limit: Optional[int] = None, cursor: Optional[str] = None,
+               columns: Columns = 'full', updated_since: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+    """Get active groups (newest first) with members, using batch queries to avoid N+1.
+
+    Pass limit/cursor to fetch one keyset page; the result's next_cursor
+    points at the following page. `columns` selects the group projection.
+    With updated_since, only groups changed after it are returned. Returns
+    None on database error, so callers never mistake a failure for no groups.
+    """
     try:
-        # Query 1: Get all active groups
-        groups_query = "SELECT * FROM groups WHERE is_active = TRUE ORDER BY created_at DESC"
-        groups = rows_to_dicts(execute_raw_sql(groups_query))
+        params = {}
+        changed_filter = ''
+        if updated_since is not None:
+            changed_filter = 'AND updated_at > :updated_since'
+            params['updated_since'] = updated_since
+
+        # Query 1: Get one page of active groups
+        groups_query = f"""
+            SELECT {_select_list('groups', columns, required=('id', 'created_at'))} FROM groups
+            WHERE is_active = TRUE {changed_filter} {{after}}
+            ORDER BY created_at DESC, id DESC
+        """
+        groups = _fetch_keyset_page(
+            groups_query, params, ['created_at', 'id'],
+            "AND (created_at, id) < (:after_0, :after_1)",
+            limit, cursor
+        )
 
         if not groups:
             return []
@@ -163,7 +309,7 @@ def get_groups() -> List[Dict[str, Any]]:
         return groups
     except Exception as e:
         logger.error(f"Error getting groups: {e}", exc_info=True)
-        return []
+        return None
 
 
 def get_group_details(group_id: str) -> Optional[Dict[str, Any]]:
@@ -209,6 +355,8 @@ def delete_group(group_id: str) -> bool:
             # Delete the group itself
             result = db.execute(text("DELETE FROM groups WHERE id = :group_id RETURNING id"), {'group_id': group_id})
             deleted = result.fetchone()
+            if deleted:
+                _notify_change(db, 'group', action='deleted', group_id=group_id)
 
             logger.info(f"Group {group_id} deleted successfully")
             return deleted is not None
@@ -404,7 +552,10 @@ def update_group_project_info(group_id: str, problem_statement: str = None, data
             RETURNING id
         """
 
-        rows_affected = execute_update(query, params)
+        with get_db_context() as db:
+            rows_affected = db.execute(text(query), params).rowcount
+            if rows_affected:
+                _notify_change(db, 'group', action='updated', group_id=group_id)
         logger.info(f"Project info updated for group {group_id}")
         return rows_affected > 0
     except Exception as e:
@@ -458,65 +609,130 @@ def update_group_last_login(group_id: str) -> bool:
         return False
 
 
-def get_group_with_submissions(group_id: str) -> Optional[Dict[str, Any]]:
-    """Get group details with all submissions and feedback."""
-    try:
-        # Get group
-        group_query = "SELECT * FROM groups WHERE id = :group_id"
-        group_rows = execute_raw_sql(group_query, {'group_id': group_id})
+GROUP_DOCUMENT_QUERY = """
+    SELECT (to_jsonb(g) - 'password_hash') || jsonb_build_object(
+        'class_course_code', c.course_code,
+        'members', COALESCE(m.members, '[]'::jsonb),
+        'submissions', COALESCE(sub.submissions, '[]'::jsonb),
+        'feedback', COALESCE(fb.feedback, '{}'::jsonb)
+    ) AS document
+    FROM groups g
+    LEFT JOIN classes c ON c.id = g.class_id
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(
+            to_jsonb(gm) || CASE WHEN s.id IS NULL THEN '{}'::jsonb ELSE jsonb_build_object(
+                'first_name', COALESCE(s.first_name, ''),
+                'last_name', COALESCE(s.last_name, ''),
+                'member_name', btrim(COALESCE(s.first_name, '') || ' ' || COALESCE(s.last_name, '')),
+                'email', COALESCE(s.email, ''),
+                'campus_id', COALESCE(s.campus_id, '')
+            ) END
+            ORDER BY gm.created_at
+        ) AS members
+        FROM group_members gm
+        LEFT JOIN students s ON s.id = gm.student_id
+        WHERE gm.group_id = g.id
+    ) m ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(to_jsonb(gs) ORDER BY gs.stage_number) AS submissions
+        FROM group_submissions gs
+        WHERE gs.group_id = g.id
+    ) sub ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT jsonb_object_agg(gf.stage_number, to_jsonb(gf)) AS feedback
+        FROM group_feedback gf
+        WHERE gf.group_id = g.id
+    ) fb ON TRUE
+    WHERE g.id = :group_id
+"""
 
-        if not group_rows:
+
+def get_group_document(group_id: str) -> Optional[Dict[str, Any]]:
+    """Load a group with members, submissions and feedback in one statement.
+
+    The document is assembled by Postgres (jsonb aggregation over lateral
+    joins), so it is ready for jsonify: timestamps are ISO strings and
+    password_hash is stripped. ``class_course_code`` is included so callers
+    can resolve the project without a separate classes lookup. Feedback is
+    keyed by integer stage number like before.
+    """
+    try:
+        rows = execute_raw_sql(GROUP_DOCUMENT_QUERY, {'group_id': group_id})
+        if not rows:
             return None
 
-        group = row_to_dict(group_rows[0])
+        group = rows[0].document
+        group['feedback'] = {int(stage): fb for stage, fb in group['feedback'].items()}
 
-        # Get members
-        members_query = "SELECT * FROM group_members WHERE group_id = :group_id"
-        members = rows_to_dicts(execute_raw_sql(members_query, {'group_id': group_id}))
+        logger.info(f"Retrieved group {group_id} with {len(group['members'])} members")
+        return group
+    except Exception as e:
+        logger.error(f"Error getting group document for {group_id}: {e}", exc_info=True)
+        return None
 
-        # Batch fetch students if needed
-        student_ids = list(set(m['student_id'] for m in members if m.get('student_id')))
-        students_map = {}
-        if student_ids:
-            students_query = """
-                SELECT id, first_name, last_name, email, campus_id
-                FROM students
-                WHERE id = ANY(:student_ids)
-            """
-            students = execute_raw_sql(students_query, {'student_ids': student_ids})
-            students_map = {s.id: row_to_dict(s) for s in students}
 
-        # Enrich members with student data
-        for member in members:
-            student_id = member.get('student_id')
-            if student_id and student_id in students_map:
-                student = students_map[student_id]
-                member['first_name'] = student.get('first_name', '')
-                member['last_name'] = student.get('last_name', '')
-                member['member_name'] = f"{student.get('first_name', '')} {student.get('last_name', '')}".strip()
-                member['email'] = student.get('email', '')
-                member['campus_id'] = student.get('campus_id', '')
+def get_group_with_submissions(group_id: str) -> Optional[Dict[str, Any]]:
+    """Get group details with all submissions and feedback."""
+    return get_group_document(group_id)
+
+
+# Prev/next group by name for the admin grading view. Each branch of the UNION
+# is a one-row index probe on groups (group_name, id), so LAG/LEAD run over at
+# most three rows instead of a window across every group.
+GROUP_NEIGHBORS_QUERY = """
+    WITH cur AS (
+        SELECT id, group_name FROM groups WHERE id = :group_id
+    ), neighborhood AS (
+        (SELECT g.id, g.group_name
+         FROM groups g, cur
+         WHERE (g.group_name, g.id) < (cur.group_name, cur.id)
+         ORDER BY g.group_name DESC, g.id DESC
+         LIMIT 1)
+        UNION ALL
+        SELECT id, group_name FROM cur
+        UNION ALL
+        (SELECT g.id, g.group_name
+         FROM groups g, cur
+         WHERE (g.group_name, g.id) > (cur.group_name, cur.id)
+         ORDER BY g.group_name, g.id
+         LIMIT 1)
+    )
+    SELECT prev_id, next_id
+    FROM (
+        SELECT id,
+               LAG(id) OVER w AS prev_id,
+               LEAD(id) OVER w AS next_id
+        FROM neighborhood
+        WINDOW w AS (ORDER BY group_name, id)
+    ) nav
+    WHERE id = :group_id
+"""
 
-        group['members'] = members
 
-        # Get submissions
-        submissions_query = """
-            SELECT * FROM group_submissions
-            WHERE group_id = :group_id
-            ORDER BY stage_number ASC
-        """
-        group['submissions'] = rows_to_dicts(execute_raw_sql(submissions_query, {'group_id': group_id}))
+def get_group_neighbors(group_id: str) -> Dict[str, Optional[str]]:
+    """Get the ids of the groups before and after this one in name order."""
+    try:
+        rows = execute_raw_sql(GROUP_NEIGHBORS_QUERY, {'group_id': group_id})
+        if rows:
+            return {'prev_id': rows[0].prev_id, 'next_id': rows[0].next_id}
+    except Exception as e:
+        logger.error(f"Error getting neighbors of group {group_id}: {e}", exc_info=True)
+    return {'prev_id': None, 'next_id': None}
 
-        # Get feedback
-        feedback_query = "SELECT * FROM group_feedback WHERE group_id = :group_id"
-        feedback_rows = execute_raw_sql(feedback_query, {'group_id': group_id})
-        group['feedback'] = {fb.stage_number: row_to_dict(fb) for fb in feedback_rows}
 
-        logger.info(f"Retrieved group {group_id} with {len(members)} members")
-        return group
+def get_submission_scores(submission_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get saved scores for a set of submissions."""
+    if not submission_ids:
+        return []
+    try:
+        query = """
+            SELECT * FROM submission_scores
+            WHERE submission_id = ANY(CAST(:submission_ids AS uuid[]))
+        """
+        return rows_to_dicts(execute_raw_sql(query, {'submission_ids': [str(i) for i in submission_ids]}))
     except Exception as e:
-        logger.error(f"Error getting group with submissions: {e}", exc_info=True)
-        return None
+        logger.error(f"Error getting submission scores: {e}", exc_info=True)
+        return []
 
 
 def submit_group_stage_work(group_id: str, stage_id: str, submission_data: dict) -> Optional[Dict[str, Any]]:
@@ -555,6 +771,9 @@ def submit_group_stage_work(group_id: str, stage_id: str, submission_data: dict)
                 with get_db_context() as db:
                     result = db.execute(text(query), params)
                     submission = result.fetchone()
+                    if submission:
+                        _notify_change(db, 'submission', action='updated', group_id=group_id,
+                                       submission_id=submission.id, stage_number=stage_number)
                     logger.info(f"Updated submission for group {group_id}, stage {stage_number}")
                     return row_to_dict(submission)
         else:
@@ -582,6 +801,8 @@ def submit_group_stage_work(group_id: str, stage_id: str, submission_data: dict)
             with get_db_context() as db:
                 result = db.execute(text(query), params)
                 submission = result.fetchone()
+                _notify_change(db, 'submission', action='created', group_id=group_id,
+                               submission_id=submission.id, stage_number=stage_number)
                 logger.info(f"Created submission for group {group_id}, stage {stage_number}")
                 return row_to_dict(submission)
     except Exception as e:
@@ -589,6 +810,44 @@ def submit_group_stage_work(group_id: str, stage_id: str, submission_data: dict)
         return None
 
 
+def update_submission_score(submission_id: str, score: float, max_score: float,
+                            feedback: str = '', admin_notes: str = '') -> Union[Dict[str, Any], bool, None]:
+    """
+    Save an admin score on a submission.
+
+    Returns:
+        The updated submission, False if there is no such submission, or
+        None on a database error.
+    """
+    try:
+        query = """
+            UPDATE group_submissions
+            SET score = :score, max_score = :max_score, feedback = :feedback,
+                admin_notes = :admin_notes, updated_at = NOW()
+            WHERE id = :submission_id
+            RETURNING *
+        """
+        params = {
+            'submission_id': submission_id,
+            'score': score,
+            'max_score': max_score,
+            'feedback': feedback,
+            'admin_notes': admin_notes
+        }
+
+        with get_db_context() as db:
+            submission = db.execute(text(query), params).fetchone()
+            if submission is None:
+                return False
+            _notify_change(db, 'score', group_id=submission.group_id, submission_id=submission.id,
+                           stage_number=submission.stage_number)
+            logger.info(f"Score saved for submission {submission_id}")
+            return row_to_dict(submission)
+    except Exception as e:
+        logger.error(f"Error saving score for submission {submission_id}: {e}", exc_info=True)
+        return None
+
+
 def get_group_feedback(group_id: str) -> List[Dict[str, Any]]:
     """Get all feedback for a group."""
     try:
@@ -603,6 +862,27 @@ def get_group_feedback(group_id: str) -> List[Dict[str, Any]]:
 
 # --- Student Operations ---
 
+def list_group_comments(group_id: str, limit: Optional[int] = None,
+                       cursor: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Get admin comments for a group, newest first, optionally one keyset page at a time (None on error)."""
+    try:
+        query = """
+            SELECT * FROM group_comments
+            WHERE group_id = :group_id {after}
+            ORDER BY created_at DESC, id DESC
+        """
+        comments = _fetch_keyset_page(
+            query, {'group_id': group_id}, ['created_at', 'id'],
+            "AND (created_at, id) < (:after_0, :after_1)",
+            limit, cursor
+        )
+        logger.info(f"Retrieved {len(comments)} comments for group {group_id}")
+        return comments
+    except Exception as e:
+        logger.error(f"Error getting comments for group {group_id}: {e}", exc_info=True)
+        return None
+
+
 def get_student_by_id(student_id: str) -> Optional[Dict[str, Any]]:
     """Fetch student by ID."""
     try:
@@ -658,11 +938,11 @@ def get_class_by_id(class_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_students_by_class(class_id: str) -> List[Dict[str, Any]]:
+def get_students_by_class(class_id: str, columns: Columns = 'full') -> List[Dict[str, Any]]:
     """Get all students in a class."""
     try:
-        query = """
-            SELECT * FROM students
+        query = f"""
+            SELECT {_select_list('students', columns)} FROM students
             WHERE class_id = :class_id
             ORDER BY last_name, first_name
         """
@@ -674,11 +954,11 @@ def get_students_by_class(class_id: str) -> List[Dict[str, Any]]:
         return []
 
 
-def get_ungrouped_students(class_id: str) -> List[Dict[str, Any]]:
+def get_ungrouped_students(class_id: str, columns: Columns = 'full') -> List[Dict[str, Any]]:
     """Get students who are not assigned to any group."""
     try:
-        query = """
-            SELECT * FROM students
+        query = f"""
+            SELECT {_select_list('students', columns)} FROM students
             WHERE class_id = :class_id AND group_id IS NULL
             ORDER BY last_name, first_name
         """
@@ -690,11 +970,53 @@ def get_ungrouped_students(class_id: str) -> List[Dict[str, Any]]:
         return []
 
 
-def get_grouped_students(class_id: str) -> List[Dict[str, Any]]:
+def get_available_students(group_id: Optional[str] = None,
+                           class_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get ungrouped students for the member picker, projecting only the columns it shows.
+
+    With a group_id, candidates are limited to the group's class (any class if
+    the group has none) and current members are excluded by an anti-join.
+    Without one, all ungrouped students are returned, optionally in one class.
+    """
+    try:
+        if group_id:
+            query = """
+                SELECT s.id, s.first_name, s.last_name, s.campus_id, s.program, s.class_id
+                FROM groups g
+                JOIN students s
+                  ON s.group_id IS NULL
+                 AND (g.class_id IS NULL OR s.class_id = g.class_id)
+                WHERE g.id = :group_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM group_members gm
+                      WHERE gm.group_id = g.id AND gm.student_id = s.id
+                  )
+                ORDER BY s.last_name, s.first_name
+            """
+            params = {'group_id': group_id}
+        else:
+            query = """
+                SELECT s.id, s.first_name, s.last_name, s.campus_id, s.program, s.class_id
+                FROM students s
+                WHERE s.group_id IS NULL
+                  AND (CAST(:class_id AS uuid) IS NULL OR s.class_id = CAST(:class_id AS uuid))
+                ORDER BY s.last_name, s.first_name
+            """
+            params = {'class_id': class_id}
+        students = rows_to_dicts(execute_raw_sql(query, params))
+        logger.info(f"Retrieved {len(students)} available students (group={group_id}, class={class_id})")
+        return students
+    except Exception as e:
+        logger.error(f"Error getting available students: {e}", exc_info=True)
+        return None
+
+
+def get_grouped_students(class_id: str, columns: Columns = 'full') -> List[Dict[str, Any]]:
     """Get students who are assigned to a group."""
     try:
-        query = """
-            SELECT s.*, g.group_name, g.project_title
+        query = f"""
+            SELECT {_select_list('students', columns, 's')}, g.group_name, g.project_title
             FROM students s
             JOIN groups g ON s.group_id = g.id
             WHERE s.class_id = :class_id AND s.group_id IS NOT NULL
@@ -708,42 +1030,149 @@ def get_grouped_students(class_id: str) -> List[Dict[str, Any]]:
         return []
 
 
-def assign_student_to_group(group_id: str, student_id: str) -> bool:
-    """Assign a student to a group."""
-    try:
-        # Get student info
-        student = get_student_by_id(student_id)
-        if not student:
-            logger.warning(f"Student {student_id} not found")
-            return False
+def get_class_roster(class_id: str, counts_only: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Get a class roster partitioned into grouped and ungrouped students.
 
-        if student.get('group_id'):
-            logger.warning(f"Student {student_id} already in group {student.get('group_id')}")
-            return False
+    One LEFT JOIN of students to groups is split in a single pass, matching what
+    get_ungrouped_students and get_grouped_students return separately. With
+    counts_only the database returns just the three counts.
+    """
+    try:
+        if counts_only:
+            query = """
+                SELECT COUNT(*) AS total_students,
+                       COUNT(*) FILTER (WHERE s.group_id IS NULL) AS ungrouped_count,
+                       COUNT(g.id) AS grouped_count
+                FROM students s
+                LEFT JOIN groups g ON s.group_id = g.id
+                WHERE s.class_id = :class_id
+            """
+            return row_to_dict(execute_raw_sql(query, {'class_id': class_id})[0])
 
-        # Update student's group_id
-        update_query = """
-            UPDATE students
-            SET group_id = :group_id
-            WHERE id = :student_id
-            RETURNING id
+        query = """
+            SELECT s.*, g.id AS joined_group_id, g.group_name, g.project_title
+            FROM students s
+            LEFT JOIN groups g ON s.group_id = g.id
+            WHERE s.class_id = :class_id
+            ORDER BY s.last_name, s.first_name
         """
-        rows_affected = execute_update(update_query, {'group_id': group_id, 'student_id': student_id})
+        ungrouped, grouped = [], []
+        total = 0
+        for student in rows_to_dicts(execute_raw_sql(query, {'class_id': class_id})):
+            total += 1
+            joined_group_id = student.pop('joined_group_id')
+            if student.get('group_id') is None:
+                student.pop('group_name')
+                student.pop('project_title')
+                ungrouped.append(student)
+            elif joined_group_id is not None:
+                grouped.append(student)
+        # Rows arrive in name order; a stable sort keeps it within each group
+        grouped.sort(key=lambda student: student['group_name'] or '')
+
+        logger.info(f"Retrieved roster for class {class_id}: {total} students, "
+                    f"{len(grouped)} grouped, {len(ungrouped)} ungrouped")
+        return {
+            'total_students': total,
+            'ungrouped_count': len(ungrouped),
+            'grouped_count': len(grouped),
+            'ungrouped_students': ungrouped,
+            'grouped_students': grouped,
+        }
+    except Exception as e:
+        logger.error(f"Error getting roster for class {class_id}: {e}", exc_info=True)
+        return None
 
-        if rows_affected > 0:
-            # Add to group_members table
-            member_name = f"{student.get('first_name', '')} {student.get('last_name', '')}".strip()
-            if not member_name:
-                member_name = student.get('campus_id', student_id)
 
-            add_group_member(group_id, member_name, student_id=student_id)
-            logger.info(f"Student {student_id} assigned to group {group_id}")
-            return True
+def assign_students_to_group(group_id: str, student_ids: List[str]) -> List[Dict[str, Any]]:
+    """Assign several students to a group in one atomic statement.
 
-        return False
+    Only students that are currently ungrouped are claimed (the conditional
+    UPDATE re-checks ``group_id IS NULL`` under the row lock, so concurrent
+    adds cannot both win), and their ``group_members`` rows are inserted by
+    the same statement.
+
+    Returns:
+        One outcome per requested student, in request order:
+        ``{'student_id', 'status', 'first_name', 'last_name', 'group_id'}``
+        where status is ``'assigned'``, ``'already_grouped'`` (group_id is the
+        group that holds them), ``'not_found'`` (including ids that are not
+        UUIDs), or ``'error'`` for every student if the statement failed.
+    """
+    student_ids = list(dict.fromkeys(str(s).strip().lower() for s in student_ids if s))
+    if not student_ids:
+        return []
+
+    # A single malformed id would fail the uuid[] cast for the whole statement
+    canonical = {}
+    for student_id in student_ids:
+        try:
+            canonical[student_id] = str(uuid.UUID(student_id))
+        except ValueError:
+            pass
+    valid_ids = list(dict.fromkeys(canonical.values()))
+
+    try:
+        query = """
+            WITH claimed AS (
+                UPDATE students
+                SET group_id = :group_id
+                WHERE id = ANY(CAST(:student_ids AS uuid[])) AND group_id IS NULL
+                RETURNING id, group_id, first_name, last_name, campus_id
+            ),
+            new_members AS (
+                INSERT INTO group_members (group_id, member_name, student_id, created_at)
+                SELECT group_id,
+                       COALESCE(NULLIF(btrim(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), ''),
+                                campus_id, id::text),
+                       id, NOW()
+                FROM claimed
+                RETURNING student_id
+            )
+            SELECT s.id, s.first_name, s.last_name,
+                   COALESCE(c.group_id, s.group_id) AS group_id,
+                   c.id IS NOT NULL AS assigned
+            FROM students s
+            LEFT JOIN claimed c ON c.id = s.id
+            WHERE s.id = ANY(CAST(:student_ids AS uuid[]))
+        """
+        rows = []
+        if valid_ids:
+            with get_db_context() as db:
+                rows = db.execute(text(query), {'group_id': group_id, 'student_ids': valid_ids}).fetchall()
+                if any(row.assigned for row in rows):
+                    _notify_change(db, 'group', action='members', group_id=group_id)
+
+        found = {str(row.id): row for row in rows}
+        outcomes = []
+        for student_id in student_ids:
+            row = found.get(canonical.get(student_id))
+            if row is None:
+                outcomes.append({'student_id': student_id, 'status': 'not_found',
+                                 'first_name': None, 'last_name': None, 'group_id': None})
+                continue
+            outcomes.append({
+                'student_id': student_id,
+                'status': 'assigned' if row.assigned else 'already_grouped',
+                'first_name': row.first_name,
+                'last_name': row.last_name,
+                'group_id': row.group_id,
+            })
+
+        assigned = sum(1 for o in outcomes if o['status'] == 'assigned')
+        logger.info(f"Assigned {assigned}/{len(student_ids)} students to group {group_id}")
+        return outcomes
     except Exception as e:
-        logger.error(f"Error assigning student {student_id} to group {group_id}: {e}", exc_info=True)
-        return False
+        logger.error(f"Error assigning students to group {group_id}: {e}", exc_info=True)
+        return [{'student_id': student_id, 'status': 'error', 'first_name': None,
+                 'last_name': None, 'group_id': None} for student_id in student_ids]
+
+
+def assign_student_to_group(group_id: str, student_id: str) -> bool:
+    """Assign a student to a group."""
+    outcomes = assign_students_to_group(group_id, [student_id])
+    return bool(outcomes) and outcomes[0]['status'] == 'assigned'
 
 
 def get_group_members(group_id: str) -> List[Dict[str, Any]]:
@@ -775,6 +1204,7 @@ def unassign_student_from_group(student_id: str) -> bool:
 
             # Update student's group_id to NULL
             db.execute(text("UPDATE students SET group_id = NULL WHERE id = :student_id"), {'student_id': student_id})
+            _notify_change(db, 'group', action='members', group_id=group_id)
 
             logger.info(f"Student {student_id} unassigned from group {group_id}")
             return True
@@ -810,11 +1240,11 @@ def submit_stage_work(group_id: str, stage_id: str, student_id: str, content: st
     return None
 
 
-def get_group_submissions(group_id: str) -> List[Dict[str, Any]]:
+def get_group_submissions(group_id: str, columns: Columns = 'full') -> List[Dict[str, Any]]:
     """Get all submissions for a group."""
     try:
-        query = """
-            SELECT * FROM group_submissions
+        query = f"""
+            SELECT {_select_list('group_submissions', columns)} FROM group_submissions
             WHERE group_id = :group_id
             ORDER BY stage_number ASC
         """
@@ -826,6 +1256,160 @@ def get_group_submissions(group_id: str) -> List[Dict[str, Any]]:
         return []
 
 
+def get_all_submissions(group_id: Optional[str] = None, stage_number: Optional[int] = None,
+                        limit: Optional[int] = None, cursor: Optional[str] = None,
+                        columns: Columns = 'full') -> List[Dict[str, Any]]:
+    """Get submissions across groups, newest first, with the owning group's name and title."""
+    try:
+        filters = []
+        params = {}
+        if group_id:
+            filters.append("AND gs.group_id = :group_id")
+            params['group_id'] = group_id
+        if stage_number is not None:
+            filters.append("AND gs.stage_number = :stage_number")
+            params['stage_number'] = stage_number
+
+        query = f"""
+            SELECT {_select_list('group_submissions', columns, 'gs', required=('id', 'submitted_at'))},
+                   g.group_name, g.project_title
+            FROM group_submissions gs
+            LEFT JOIN groups g ON g.id = gs.group_id
+            WHERE TRUE {' '.join(filters)} {{after}}
+            ORDER BY gs.submitted_at DESC, gs.id DESC
+        """
+        submissions = _fetch_keyset_page(
+            query, params, ['submitted_at', 'id'],
+            "AND (gs.submitted_at, gs.id) < (:after_0, :after_1)",
+            limit, cursor
+        )
+        logger.info(f"Retrieved {len(submissions)} submissions")
+        return submissions
+    except Exception as e:
+        logger.error(f"Error getting submissions: {e}", exc_info=True)
+        return []
+
+
+def get_groups_with_submissions(group_columns: Columns = 'summary',
+                                submission_columns: Columns = 'summary') -> List[Dict[str, Any]]:
+    """
+    Get active groups, each with a `group_submissions` list ordered by stage.
+
+    Submissions are aggregated per group in the database using the requested
+    projection, so the default leaves summary_markdown and content behind.
+    """
+    try:
+        query = f"""
+            SELECT {_select_list('groups', group_columns, 'g')},
+                   COALESCE(subs.items, '[]'::jsonb) AS group_submissions
+            FROM groups g
+            LEFT JOIN LATERAL (
+                SELECT jsonb_agg({_jsonb_object('group_submissions', submission_columns, 'gs')}
+                                 ORDER BY gs.stage_number) AS items
+                FROM group_submissions gs
+                WHERE gs.group_id = g.id
+            ) subs ON TRUE
+            WHERE g.is_active = TRUE
+            ORDER BY g.group_name
+        """
+        groups = rows_to_dicts(execute_raw_sql(query))
+        logger.info(f"Retrieved {len(groups)} groups with submissions")
+        return groups
+    except Exception as e:
+        logger.error(f"Error getting groups with submissions: {e}", exc_info=True)
+        return []
+
+
+def get_admin_submission_rows(group_id: Optional[str] = None, stage_number: Optional[int] = None,
+                              limit: Optional[int] = None, cursor: Optional[str] = None,
+                              stream: bool = False,
+                              updated_since: Optional[datetime] = None) -> Optional[Union[CompactRows, StreamedRows]]:
+    """
+    Get the admin submissions listing, newest first, shaped in SQL.
+
+    Rows already carry the flat fields the submissions page renders (group
+    name, 'N/A' fallbacks, file name from the path), so they can be written
+    straight to JSON as CompactRows, or streamed when there is no limit.
+    With updated_since, only rows whose submission or group changed after it
+    are returned (a group rename changes every row of that group). Returns
+    None on database error.
+    """
+    try:
+        filters = []
+        params = {}
+        if group_id:
+            filters.append("AND gs.group_id = :group_id")
+            params['group_id'] = group_id
+        if stage_number is not None:
+            filters.append("AND gs.stage_number = :stage_number")
+            params['stage_number'] = stage_number
+        if updated_since is not None:
+            filters.append("AND (gs.updated_at > :updated_since OR g.updated_at > :updated_since)")
+            params['updated_since'] = updated_since
+
+        query = f"""
+            SELECT gs.id, gs.group_id,
+                   COALESCE(g.group_name, 'N/A') AS group_name,
+                   COALESCE(g.project_title, 'N/A') AS project_title,
+                   gs.stage_number AS stage, gs.stage_number,
+                   CASE WHEN COALESCE(gs.file_path, '') = '' THEN 'N/A'
+                        ELSE regexp_replace(gs.file_path, '^.*/', '') END AS file_name,
+                   gs.submitted_at, gs.file_size
+            FROM group_submissions gs
+            LEFT JOIN groups g ON g.id = gs.group_id
+            WHERE TRUE {' '.join(filters)} {{after}}
+            ORDER BY gs.submitted_at DESC, gs.id DESC
+        """
+        return _fetch_keyset_page(
+            query, params, ['submitted_at', 'id'],
+            "AND (gs.submitted_at, gs.id) < (:after_0, :after_1)",
+            limit, cursor, compact=True, stream=stream
+        )
+    except Exception as e:
+        logger.error(f"Error getting admin submission rows: {e}", exc_info=True)
+        return None
+
+
+# Stages shown in the admin submission-status grid
+SUBMISSION_STAGES = range(1, 7)
+
+
+def get_groups_submission_status() -> Optional[List[Dict[str, Any]]]:
+    """
+    Get every active group with a per-stage "has submitted" flag.
+
+    One GROUP BY folds each group's submissions into an integer bitmask
+    (bit n-1 set when stage n has a submission), decoded here into the
+    {'stage_1': bool, ...} shape the dashboard expects.
+    """
+    try:
+        query = """
+            SELECT g.id, g.group_name, g.project_title,
+                   COALESCE(bit_or(1 << (gs.stage_number - 1))
+                            FILTER (WHERE gs.stage_number BETWEEN 1 AND 31), 0) AS stage_mask
+            FROM groups g
+            LEFT JOIN group_submissions gs ON gs.group_id = g.id
+            WHERE g.is_active = TRUE
+            GROUP BY g.id, g.group_name, g.project_title
+            ORDER BY g.group_name
+        """
+        groups = []
+        for row in execute_raw_sql(query):
+            groups.append({
+                'id': row.id,
+                'group_name': row.group_name or 'N/A',
+                'project_title': row.project_title or 'N/A',
+                'stages': {
+                    f'stage_{n}': bool(row.stage_mask & (1 << (n - 1))) for n in SUBMISSION_STAGES
+                },
+            })
+        logger.info(f"Retrieved submission status for {len(groups)} groups")
+        return groups
+    except Exception as e:
+        logger.error(f"Error getting groups submission status: {e}", exc_info=True)
+        return None
+
+
 # --- Course Resources ---
 
 def get_course_resources(course_code: str) -> List[Dict[str, Any]]:
@@ -928,20 +1512,55 @@ def delete_resource(resource_id: str) -> bool:
         return False
 
 
-def reorder_resources(resource_ids: List[str]) -> bool:
-    """Reorder resources by updating display_order."""
+def reorder_resources(course_code: str, resource_ids: List[str]) -> Optional[bool]:
+    """Reorder a course's resources in one statement.
+
+    display_order is taken from each id's position. The same statement checks
+    that every id belongs to the course, and nothing is updated unless all do.
+
+    Returns:
+        True if reordered, False if any id is not a resource of the course,
+        None on database error.
+    """
+    if not resource_ids:
+        return True
+
     try:
+        query = """
+            WITH ordering AS (
+                SELECT o.id, o.ord - 1 AS display_order
+                FROM unnest(CAST(:resource_ids AS uuid[])) WITH ORDINALITY AS o(id, ord)
+            ),
+            owned AS (
+                SELECT COUNT(*) AS matched
+                FROM ordering o
+                JOIN course_resources r ON r.id = o.id AND r.course_code = :course_code
+            ),
+            updated AS (
+                UPDATE course_resources r
+                SET display_order = o.display_order
+                FROM ordering o, owned
+                WHERE r.id = o.id
+                  AND r.course_code = :course_code
+                  AND owned.matched = :expected
+                RETURNING r.id
+            )
+            SELECT (SELECT matched FROM owned) AS matched, (SELECT COUNT(*) FROM updated) AS updated
+        """
+        params = {'course_code': course_code, 'resource_ids': resource_ids, 'expected': len(resource_ids)}
         with get_db_context() as db:
-            for order, resource_id in enumerate(resource_ids):
-                db.execute(
-                    text("UPDATE course_resources SET display_order = :order WHERE id = :resource_id"),
-                    {'order': order, 'resource_id': resource_id}
-                )
-            logger.info(f"Reordered {len(resource_ids)} resources")
-            return True
+            result = db.execute(text(query), params).fetchone()
+
+        if result.matched != len(resource_ids):
+            logger.warning(f"Reorder rejected for course {course_code}: "
+                           f"{len(resource_ids) - result.matched} ids do not belong to the course")
+            return False
+
+        logger.info(f"Reordered {result.updated} resources for course {course_code}")
+        return True
     except Exception as e:
         logger.error(f"Error reordering resources: {e}", exc_info=True)
-        return False
+        return None
 
 
 def get_resource_counts_by_course() -> Dict[str, int]:
@@ -975,22 +1594,37 @@ def get_all_classes() -> List[Dict[str, Any]]:
         return []
 
 
-def get_class_records(class_id: str) -> List[Dict[str, Any]]:
-    """Get all student records for a class."""
+def get_class_records(class_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                      columns: Columns = 'full', compact: bool = False,
+                      stream: bool = False) -> Optional[Union[List[Dict[str, Any]], CompactRows, StreamedRows]]:
+    """Get student records for a class, optionally one keyset page at a time.
+
+    compact=True returns CompactRows for direct serialization of large rosters;
+    stream=True streams unbounded (no limit) reads from a server-side cursor.
+    Returns None on database error.
+    """
     try:
-        query = """
-            SELECT s.*, g.group_name
+        query = f"""
+            SELECT {_select_list('students', columns, 's', required=('id', 'first_name', 'last_name'))},
+                   g.group_name
             FROM students s
             LEFT JOIN groups g ON s.group_id = g.id
-            WHERE s.class_id = :class_id
-            ORDER BY s.last_name, s.first_name
+            WHERE s.class_id = :class_id {{after}}
+            ORDER BY s.last_name, s.first_name, s.id
         """
-        records = rows_to_dicts(execute_raw_sql(query, {'class_id': class_id}))
-        logger.info(f"Retrieved {len(records)} class records for {class_id}")
+        records = _fetch_keyset_page(
+            query, {'class_id': class_id}, ['last_name', 'first_name', 'id'],
+            "AND (s.last_name, s.first_name, s.id) > (:after_0, :after_1, :after_2)",
+            limit, cursor, compact, stream
+        )
+        if isinstance(records, StreamedRows):
+            logger.info(f"Streaming class records for {class_id}")
+        else:
+            logger.info(f"Retrieved {len(records)} class records for {class_id}")
         return records
     except Exception as e:
         logger.error(f"Error getting class records for {class_id}: {e}", exc_info=True)
-        return []
+        return None
 
 
 def update_student_exam_status(student_id: str, exam_type: str, status: str) -> bool:
@@ -1145,22 +1779,44 @@ def delete_assessment(assessment_id: str) -> bool:
         return False
 
 
-def get_grades_by_assessment(assessment_id: str) -> List[Dict[str, Any]]:
-    """Get all grades for an assessment."""
+def get_grades_by_assessment(assessment_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                             compact: bool = False, stream: bool = False,
+                             updated_since: Optional[datetime] = None
+                             ) -> Optional[Union[List[Dict[str, Any]], CompactRows, StreamedRows]]:
+    """Get grades for an assessment, optionally one keyset page at a time.
+
+    compact=True returns CompactRows for direct serialization; stream=True
+    streams unbounded (no limit) reads from a server-side cursor. With
+    updated_since, only grades changed after it are returned. Returns None
+    on database error.
+    """
     try:
-        query = """
+        params = {'assessment_id': assessment_id}
+        changed_filter = ''
+        if updated_since is not None:
+            changed_filter = 'AND sg.updated_at > :updated_since'
+            params['updated_since'] = updated_since
+
+        query = f"""
             SELECT sg.*, s.first_name, s.last_name, s.campus_id
             FROM student_grades sg
             JOIN students s ON sg.student_id = s.id
-            WHERE sg.assessment_id = :assessment_id
-            ORDER BY s.last_name, s.first_name
+            WHERE sg.assessment_id = :assessment_id {changed_filter} {{after}}
+            ORDER BY s.last_name, s.first_name, sg.student_id
         """
-        grades = rows_to_dicts(execute_raw_sql(query, {'assessment_id': assessment_id}))
-        logger.info(f"Retrieved {len(grades)} grades for assessment {assessment_id}")
+        grades = _fetch_keyset_page(
+            query, params, ['last_name', 'first_name', 'student_id'],
+            "AND (s.last_name, s.first_name, sg.student_id) > (:after_0, :after_1, :after_2)",
+            limit, cursor, compact, stream
+        )
+        if isinstance(grades, StreamedRows):
+            logger.info(f"Streaming grades for assessment {assessment_id}")
+        else:
+            logger.info(f"Retrieved {len(grades)} grades for assessment {assessment_id}")
         return grades
     except Exception as e:
         logger.error(f"Error getting grades for assessment {assessment_id}: {e}", exc_info=True)
-        return []
+        return None
 
 
 def get_student_grades_for_class(student_id: str, class_id: str) -> List[Dict[str, Any]]:
@@ -1209,26 +1865,131 @@ def upsert_student_grade(student_id: str, assessment_id: str, score: float,
         return None
 
 
-def bulk_upsert_grades(grades: List[Dict[str, Any]]) -> int:
-    """Bulk insert or update multiple grades."""
+# Batches at least this large are staged with COPY instead of bound arrays
+GRADE_COPY_THRESHOLD = 2000
+
+GRADE_MERGE_QUERY = """
+    WITH merged AS (
+        INSERT INTO student_grades (student_id, assessment_id, score, feedback, created_at, updated_at)
+        SELECT s.id, a.id, i.score, i.feedback, NOW(), NOW()
+        FROM {source}
+        JOIN students s ON s.id = i.student_id
+        JOIN assessments a ON a.id = CAST(:assessment_id AS uuid)
+        ON CONFLICT (student_id, assessment_id)
+        DO UPDATE SET score = EXCLUDED.score, feedback = EXCLUDED.feedback, updated_at = NOW()
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted) AS inserted,
+           COUNT(*) FILTER (WHERE NOT inserted) AS updated
+    FROM merged
+"""
+
+
+def _prepare_grade_rows(grades: List[Dict[str, Any]]) -> List[tuple]:
+    """Validate grade dicts into (student_id, score, feedback) tuples.
+
+    Rows without a valid student UUID or with a non-numeric or non-finite
+    score (NaN, inf) are dropped, and a later row for the same student
+    replaces an earlier one (a single upsert cannot touch the same row twice).
+    """
+    rows = {}
+    for grade in grades:
+        if not isinstance(grade, dict):
+            continue
+        try:
+            student_id = str(uuid.UUID(str(grade.get('student_id'))))
+            score = grade.get('score')
+            score = None if score in (None, '') else float(score)
+        except (ValueError, TypeError):
+            continue
+        if score is not None and not math.isfinite(score):
+            continue
+        feedback = grade.get('feedback')
+        rows[student_id] = (student_id, score, None if feedback is None else str(feedback))
+    return list(rows.values())
+
+
+def _csv_field(value: Any) -> str:
+    """Format a value for COPY ... (FORMAT csv), where an unquoted empty field is NULL."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return repr(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_grade_rows(db, rows: List[tuple]) -> None:
+    """Stage grade rows in a transaction-local temp table with COPY."""
+    # An earlier import in the same request transaction may have created it already
+    db.execute(text("""
+        CREATE TEMP TABLE IF NOT EXISTS grade_import (student_id uuid, score numeric, feedback text)
+        ON COMMIT DROP
+    """))
+    db.execute(text("TRUNCATE grade_import"))
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_csv_field(v) for v in row))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
     try:
-        count = 0
-        with get_db_context() as db:
-            for grade_data in grades:
-                query = """
-                    INSERT INTO student_grades (student_id, assessment_id, score, feedback, created_at, updated_at)
-                    VALUES (:student_id, :assessment_id, :score, :feedback, NOW(), NOW())
-                    ON CONFLICT (student_id, assessment_id)
-                    DO UPDATE SET score = :score, feedback = :feedback, updated_at = NOW()
-                """
-                db.execute(text(query), grade_data)
-                count += 1
+        cursor.copy_expert("COPY grade_import (student_id, score, feedback) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_upsert_grades(assessment_id: str, grades: List[Dict[str, Any]]) -> Union[Dict[str, int], bool, None]:
+    """Insert or update many grades for one assessment in a single statement.
 
-        logger.info(f"Bulk upserted {count} grades")
-        return count
+    Normal batches are passed as parallel arrays and merged with one
+    ``INSERT ... SELECT FROM unnest(...) ON CONFLICT``. Batches of
+    ``GRADE_COPY_THRESHOLD`` rows or more (e.g. a semester import) are
+    streamed into a temp table with COPY and merged from there.
+
+    Returns:
+        ``{'inserted', 'updated', 'rejected'}`` counts, where rejected covers
+        malformed rows, duplicates and unknown students; False if the
+        assessment does not exist; None on error.
+    """
+    rows = _prepare_grade_rows(grades)
+
+    try:
+        params = {'assessment_id': assessment_id}
+        with get_db_context() as db:
+            # Checked first, so an unknown assessment is not mistaken for all rows rejected
+            exists = db.execute(text("SELECT 1 FROM assessments WHERE id = CAST(:assessment_id AS uuid)"),
+                                params).first()
+            if exists is None:
+                logger.warning(f"Bulk grade upsert for unknown assessment {assessment_id}")
+                return False
+            if not rows:
+                return {'inserted': 0, 'updated': 0, 'rejected': len(grades)}
+
+            if len(rows) >= GRADE_COPY_THRESHOLD:
+                _copy_grade_rows(db, rows)
+                query = GRADE_MERGE_QUERY.format(source="grade_import i")
+            else:
+                query = GRADE_MERGE_QUERY.format(source="""unnest(
+                    CAST(:student_ids AS uuid[]), CAST(:scores AS numeric[]), CAST(:feedback AS text[])
+                ) AS i(student_id, score, feedback)""")
+                params.update({
+                    'student_ids': [r[0] for r in rows],
+                    'scores': [r[1] for r in rows],
+                    'feedback': [r[2] for r in rows],
+                })
+            counts = db.execute(text(query), params).fetchone()
+
+        result = {
+            'inserted': counts.inserted,
+            'updated': counts.updated,
+            'rejected': len(grades) - counts.inserted - counts.updated,
+        }
+        logger.info(f"Bulk upserted grades for assessment {assessment_id}: {result}")
+        return result
     except Exception as e:
-        logger.error(f"Error bulk upserting grades: {e}", exc_info=True)
-        return 0
+        logger.error(f"Error bulk upserting grades for assessment {assessment_id}: {e}", exc_info=True)
+        return None
 
 
 def get_assessment_stats(assessment_id: str) -> Dict[str, Any]:
@@ -1252,3 +2013,167 @@ def get_assessment_stats(assessment_id: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error getting assessment stats: {e}", exc_info=True)
         return {}
+
+
+# --- Admin Dashboard ---
+
+# One row from the trigger-maintained admin_stats table (migrations/002_admin_stats.sql)
+# plus the ten most recent submissions, in a single round trip.
+ADMIN_STATS_QUERY = """
+    SELECT st.total_groups, st.total_submissions, st.submissions_by_stage, st.updated_at,
+           COALESCE(recent.items, '[]'::jsonb) AS recent_submissions
+    FROM admin_stats st
+    CROSS JOIN LATERAL (
+        SELECT jsonb_agg(
+                   to_jsonb(gs) || jsonb_build_object('group_name', g.group_name,
+                                                      'project_title', g.project_title)
+                   ORDER BY gs.submitted_at DESC, gs.id DESC
+               ) AS items
+        FROM (
+            SELECT * FROM group_submissions
+            ORDER BY submitted_at DESC, id DESC
+            LIMIT 10
+        ) gs
+        LEFT JOIN groups g ON g.id = gs.group_id
+    ) recent
+    WHERE st.id
+"""
+
+
+def get_admin_stats_summary() -> Optional[Dict[str, Any]]:
+    """Get dashboard counts and recent submissions from the admin_stats summary row."""
+    try:
+        rows = execute_raw_sql(ADMIN_STATS_QUERY)
+        if not rows:
+            logger.warning("admin_stats row missing; run repair_admin_stats()")
+            return None
+        summary = row_to_dict(rows[0])
+        summary['submissions_by_stage'] = {
+            f'stage_{n}': count for n, count in enumerate(summary['submissions_by_stage'], start=1)
+        }
+        return summary
+    except Exception as e:
+        logger.error(f"Error getting admin stats summary: {e}", exc_info=True)
+        return None
+
+
+def repair_admin_stats() -> Optional[Dict[str, Any]]:
+    """Recompute the admin_stats row from the base tables, correcting any drift."""
+    try:
+        with get_db_context() as db:
+            row = db.execute(text("SELECT * FROM refresh_admin_stats()")).fetchone()
+            repaired = row_to_dict(row)
+        logger.info(f"Repaired admin stats: {repaired['total_groups']} groups, "
+                    f"{repaired['total_submissions']} submissions")
+        return repaired
+    except Exception as e:
+        logger.error(f"Error repairing admin stats: {e}", exc_info=True)
+        return None
+
+
+def get_table_versions(tables: Sequence[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Get change counters for tables from table_versions (migrations/005_table_versions.sql).
+
+    Returns {table: {'version': int, 'changed_at': datetime}}, or None if the
+    versions cannot be read (callers then skip conditional handling).
+    """
+    try:
+        query = """
+            SELECT table_name, version, changed_at
+            FROM table_versions
+            WHERE table_name = ANY(:tables)
+        """
+        rows = execute_raw_sql(query, {'tables': list(tables)})
+        versions = {row.table_name: {'version': row.version, 'changed_at': row.changed_at} for row in rows}
+        if len(versions) != len(set(tables)):
+            logger.warning(f"Missing table_versions rows for {set(tables) - set(versions)}")
+            return None
+        return versions
+    except Exception as e:
+        logger.error(f"Error getting table versions: {e}", exc_info=True)
+        return None
+
+
+# Seconds subtracted from next_since so rows committed by transactions that
+# were still open when a delta was read are picked up by the next one
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '30'))
+
+# Tables whose hard deletes are recorded in deleted_records (migrations/006_delta_sync.sql)
+TOMBSTONE_TABLES = ('groups', 'group_submissions')
+
+
+def get_tombstones(table: str, since: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Get ids removed from a listing after `since`, plus the next sync point.
+
+    Returns {'deleted': [ids], 'as_of': datetime}. Removed means hard-deleted
+    (from deleted_records) and, for groups, soft-deleted (is_active = FALSE).
+    Call this before reading the changed rows: as_of is taken first and
+    moved back by SYNC_OVERLAP_SECONDS, so a client may see a row twice
+    but never misses one. Returns None on error.
+    """
+    try:
+        sources = []
+        if table in TOMBSTONE_TABLES:
+            sources.append("""
+                SELECT record_id::text AS id FROM deleted_records
+                WHERE table_name = :table AND deleted_at > :since
+            """)
+        if table == 'groups':
+            sources.append("""
+                SELECT id::text FROM groups
+                WHERE is_active = FALSE AND updated_at > :since
+            """)
+        deleted = f"ARRAY({' UNION '.join(sources)})" if sources else "ARRAY[]::text[]"
+
+        query = f"""
+            SELECT now() - make_interval(secs => :overlap) AS as_of,
+                   {deleted} AS deleted
+        """
+        row = execute_raw_sql(query, {'table': table, 'since': since,
+                                      'overlap': SYNC_OVERLAP_SECONDS})[0]
+        return {'deleted': list(row.deleted or []), 'as_of': row.as_of}
+    except Exception as e:
+        logger.error(f"Error getting tombstones for {table}: {e}", exc_info=True)
+        return None
+
+
+# --- Module View Counts ---
+
+def get_module_view_counts() -> Optional[Dict[Tuple[str, int], int]]:
+    """Get every module's view count as {(course_id, module_number): count}, or None on error."""
+    try:
+        rows = execute_raw_sql("SELECT course_id, module_number, view_count FROM course_module_views")
+        return {(row.course_id, row.module_number): row.view_count for row in rows}
+    except Exception as e:
+        logger.error(f"Error getting module view counts: {e}", exc_info=True)
+        return None
+
+
+def add_module_views(deltas: Dict[Tuple[str, int], int]) -> bool:
+    """Add buffered view increments {(course_id, module_number): n} with one batched upsert."""
+    if not deltas:
+        return True
+    try:
+        keys = list(deltas)
+        query = """
+            INSERT INTO course_module_views (course_id, module_number, view_count)
+            SELECT * FROM unnest(CAST(:course_ids AS text[]), CAST(:module_numbers AS integer[]),
+                                 CAST(:increments AS bigint[]))
+            ON CONFLICT (course_id, module_number) DO UPDATE
+            SET view_count = course_module_views.view_count + EXCLUDED.view_count,
+                updated_at = NOW()
+        """
+        params = {
+            'course_ids': [course_id for course_id, _ in keys],
+            'module_numbers': [module_number for _, module_number in keys],
+            'increments': [deltas[key] for key in keys]
+        }
+        with get_db_context() as db:
+            db.execute(text(query), params)
+        logger.info(f"Flushed {sum(deltas.values())} module views across {len(keys)} modules")
+        return True
+    except Exception as e:
+        logger.error(f"Error flushing module views: {e}", exc_info=True)
+        return False
@@ -0,0 +1,58 @@
+"""Delta sync (?updated_since=) for list endpoints.
+
+A client that already holds a listing passes the `next_since` value from
+its previous response as `updated_since` and gets back only rows changed
+after it, plus the ids of rows that were removed (tombstones), instead of
+re-downloading the whole list.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from flask import Response, current_app
+
+from .serialization import dumps_rows
+
+
+def validate_updated_since(args) -> Tuple[bool, str, Optional[datetime]]:
+    """
+    Read `updated_since` (ISO 8601) from request args.
+
+    Returns (is_valid, error_message, since). since is None when the client
+    did not ask for a delta. Naive timestamps are taken as UTC. A delta is
+    one complete change set, so it cannot be combined with limit/cursor.
+    """
+    raw = args.get('updated_since')
+    if not raw:
+        return True, "", None
+    try:
+        since = datetime.fromisoformat(raw.replace('Z', '+00:00'))
+    except ValueError:
+        return False, "updated_since must be an ISO 8601 timestamp", None
+    if args.get('limit') or args.get('cursor'):
+        return False, "updated_since cannot be combined with limit or cursor", None
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return True, "", since
+
+
+def _format_since(value: datetime) -> str:
+    # UTC with a Z suffix, so the value can go back into a query string unescaped
+    return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def delta_response(changed, tombstones, layout: str = 'objects', status: int = 200) -> Response:
+    """
+    JSON response {"changed": [...], "deleted": [ids], "next_since": "..."}.
+
+    `changed` is CompactRows (written with the given layout) or a list of
+    dicts; `tombstones` is what get_tombstones returned.
+    """
+    if hasattr(changed, 'columns'):
+        changed_json = dumps_rows(changed, layout)
+    else:
+        changed_json = current_app.json.dumps(changed)
+    body = ('{"changed":' + changed_json
+            + ',"deleted":' + json.dumps([str(i) for i in tombstones['deleted']])
+            + ',"next_since":' + json.dumps(_format_since(tombstones['as_of'])) + '}')
+    return Response(body, status=status, mimetype='application/json')
@@ -0,0 +1,175 @@
+"""Live change feed for admin dashboards (Server-Sent Events over LISTEN/NOTIFY).
+
+Writers queue events with pg_notify (see _notify_change in database_client),
+which Postgres delivers only once the writing transaction commits. Each
+worker process runs one listener thread on a dedicated connection and fans
+events out to its connected dashboards through per-client queues, so the
+number of open dashboards never changes the number of database connections.
+"""
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = 'portal_events'
+
+# Comment line sent when nothing happened, so proxies keep the stream open
+# and a disconnected client is noticed on the next write
+SSE_KEEPALIVE_SECONDS = 15
+# Streams end after this long and EventSource reconnects, so a stream never
+# pins a worker thread across restarts and deploys
+SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS', '300'))
+# Each open stream occupies one gthread worker thread; keep the rest for requests
+SSE_MAX_CLIENTS = int(os.environ.get('SSE_MAX_CLIENTS')
+                      or max(1, int(os.environ.get('GUNICORN_THREADS', '8')) // 2))
+SUBSCRIBER_QUEUE_SIZE = 100
+LISTENER_MAX_BACKOFF_SECONDS = 30
+
+
+class Subscription:
+    """One connected client's event queue."""
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize)
+        # Set when the client fell behind and events were dropped
+        self.overflowed = False
+
+    def put(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+
+def _connect_listener():
+    """Open a DBAPI connection outside the pool; it stays in LISTEN while clients are connected."""
+    from sqlalchemy.engine import make_url
+    from database import engine
+
+    # LISTEN needs a session-level connection; behind pgbouncer in transaction
+    # mode, point DB_LISTEN_URL straight at Postgres
+    url = make_url(os.environ['DB_LISTEN_URL']) if os.environ.get('DB_LISTEN_URL') else engine.url
+    cargs, cparams = engine.dialect.create_connect_args(url)
+    connection = engine.dialect.connect(*cargs, **cparams)
+    connection.autocommit = True
+    return connection
+
+
+class EventBroker:
+    """
+    Per-process fan-out from one LISTEN connection to many subscribers.
+
+    The listener thread starts with the first subscriber and stops (closing
+    its connection) once the last one leaves. If the connection drops, it
+    reconnects with backoff and sends subscribers a 'resync' event, since
+    notifications sent in the meantime are lost.
+    """
+
+    def __init__(self, channel: str = EVENTS_CHANNEL, connect=_connect_listener,
+                 max_clients: int = SSE_MAX_CLIENTS):
+        self.channel = channel
+        self.max_clients = max_clients
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+
+    def subscribe(self) -> Optional[Subscription]:
+        """Register a client, or return None when this worker is at max_clients."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            subscription = Subscription()
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._thread.start()
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def _should_stop(self) -> bool:
+        with self._lock:
+            if self._subscribers:
+                return False
+            self._thread = None
+            return True
+
+    def _listen(self):
+        backoff = 1
+        reconnecting = False
+        while not self._should_stop():
+            connection = None
+            try:
+                connection = self._connect()
+                connection.cursor().execute(f"LISTEN {self.channel}")
+                logger.info(f"Listening for events on '{self.channel}' (pid {os.getpid()})")
+                if reconnecting:
+                    self.publish({'kind': 'resync'})
+                backoff = 1
+                while not self._should_stop():
+                    if not select.select([connection], [], [], SSE_KEEPALIVE_SECONDS)[0]:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        try:
+                            self.publish(json.loads(notify.payload))
+                        except ValueError:
+                            logger.warning(f"Ignoring malformed event payload: {notify.payload!r}")
+                return
+            except Exception as e:
+                logger.warning(f"Event listener connection lost, retrying in {backoff}s: {e}")
+                reconnecting = True
+                time.sleep(backoff)
+                backoff = min(backoff * 2, LISTENER_MAX_BACKOFF_SECONDS)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as one SSE message, named by its kind."""
+    return f"event: {event.get('kind', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def event_stream(broker: EventBroker, subscription: Subscription,
+                 max_seconds: int = SSE_MAX_STREAM_SECONDS):
+    """Yield SSE text for a subscription until it times out, overflows or the client leaves."""
+    try:
+        yield "retry: 3000\n\n"
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                # Dropped events cannot be replayed; have the client reload instead
+                yield format_sse({'kind': 'resync'})
+                return
+            try:
+                event = subscription.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+# One broker (and at most one LISTEN connection) per worker process
+broker = EventBroker()
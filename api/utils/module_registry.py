@@ -0,0 +1,154 @@
+"""Course module registry.
+
+Resolves every course's module templates once (which exist on disk, their
+template names, prev/next links and category grouping) so module routing is
+dictionary lookups instead of an os.path.exists per module per request. The
+registry is rebuilt only when a course template directory's mtime changes,
+which is checked at most every MODULE_REGISTRY_CHECK_SECONDS.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple, Union
+
+from ..config import COURSES, MODULE_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'courses')
+MODULE_REGISTRY_CHECK_SECONDS = float(os.environ.get('MODULE_REGISTRY_CHECK_SECONDS', '10'))
+
+ModuleKey = Union[int, str]
+
+
+@dataclass(frozen=True)
+class ModuleEntry:
+    """One configured module; only available ones (template on disk) are routable."""
+    course_id: str
+    number: ModuleKey
+    title: str
+    category: Optional[str]
+    filename: str
+    template: str  # Jinja template name, courses/<course_id>/<filename>
+    path: str      # resolved file path
+    available: bool = True
+    prev: Optional[ModuleKey] = None
+    next: Optional[ModuleKey] = None
+
+
+@dataclass(frozen=True)
+class ModuleGroup:
+    """Modules of one category, for the course page's module list."""
+    category: str
+    title: str
+    order: int
+    modules: Tuple[ModuleEntry, ...]
+
+
+@dataclass(frozen=True)
+class CourseModules:
+    """A course's available modules, in COURSES order, and category groups of all its modules."""
+    modules: Mapping[ModuleKey, ModuleEntry]
+    groups: Tuple[ModuleGroup, ...]
+
+    def get(self, number: ModuleKey) -> Optional[ModuleEntry]:
+        return self.modules.get(number)
+
+    def __contains__(self, number) -> bool:
+        return number in self.modules
+
+
+def _build_course(course_id: str, course: dict, categories: dict, templates_root: str) -> CourseModules:
+    course_dir = os.path.join(templates_root, course_id)
+    try:
+        present = set(os.listdir(course_dir))
+    except OSError:
+        present = set()
+
+    configured = course.get('modules', {})
+    available = [number for number, info in configured.items() if info['filename'] in present]
+    links = {number: (available[i - 1] if i > 0 else None,
+                      available[i + 1] if i + 1 < len(available) else None)
+             for i, number in enumerate(available)}
+
+    entries = {}
+    for number, info in configured.items():
+        prev_number, next_number = links.get(number, (None, None))
+        entries[number] = ModuleEntry(
+            course_id=course_id,
+            number=number,
+            title=info['title'],
+            category=info.get('category'),
+            filename=info['filename'],
+            template=f"courses/{course_id}/{info['filename']}",
+            path=os.path.join(course_dir, info['filename']),
+            available=number in links,
+            prev=prev_number,
+            next=next_number,
+        )
+
+    # Sorted by the category's order; ties keep MODULE_CATEGORIES order
+    groups = []
+    for category, info in sorted(categories.items(), key=lambda item: item[1]['order']):
+        modules = tuple(entry for entry in entries.values() if entry.category == category)
+        if modules:
+            groups.append(ModuleGroup(category, info['title'], info['order'], modules))
+    routable = {number: entry for number, entry in entries.items() if entry.available}
+    return CourseModules(MappingProxyType(routable), tuple(groups))
+
+
+class ModuleRegistry:
+    """Immutable per-course module snapshots, swapped out when template directories change."""
+
+    def __init__(self, courses: dict = COURSES, categories: dict = MODULE_CATEGORIES,
+                 templates_root: str = TEMPLATES_ROOT, check_interval: float = MODULE_REGISTRY_CHECK_SECONDS):
+        self.courses = courses
+        self.categories = categories
+        self.templates_root = templates_root
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Mapping[str, CourseModules] = MappingProxyType({})
+        self._signature = None
+        self._next_check = 0.0
+        self.rebuild()
+
+    def _directory_signature(self):
+        signature = []
+        for path in [self.templates_root] + [os.path.join(self.templates_root, c) for c in self.courses]:
+            try:
+                signature.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def rebuild(self):
+        """Re-resolve every course's modules from disk."""
+        with self._lock:
+            signature = self._directory_signature()
+            self._snapshot = MappingProxyType({
+                course_id: _build_course(course_id, course, self.categories, self.templates_root)
+                for course_id, course in self.courses.items()
+            })
+            self._signature = signature
+            self._next_check = time.monotonic() + self.check_interval
+        logger.info(f"Module registry built: "
+                    f"{sum(len(c.modules) for c in self._snapshot.values())} modules")
+
+    def _refresh_if_changed(self):
+        if time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self.check_interval
+        if self._directory_signature() != self._signature:
+            self.rebuild()
+
+    def course(self, course_id: str) -> Optional[CourseModules]:
+        """Modules for a course, or None if the course does not exist."""
+        self._refresh_if_changed()
+        return self._snapshot.get(course_id)
+
+
+# Built at import, i.e. once per worker at startup
+module_registry = ModuleRegistry()
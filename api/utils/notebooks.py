@@ -0,0 +1,479 @@
+"""Jupyter notebook loading with a shared parsed-notebook cache.
+
+Exam and lab notebooks are multi-megabyte JSON files that rarely change, but
+pages used to open and json.load them on every view. NotebookCache keeps the
+parsed notebook and its serialized JSON keyed by path, and revalidates each
+hit with one stat(): an entry is reused only while the file's mtime and
+size are unchanged. Entries are evicted least-recently-used to stay within
+a byte budget.
+
+render_notebook_html turns a notebook into the viewer's cell HTML once and
+keeps the fragment on disk keyed by a hash of the notebook's content, so
+the Jinja walk over every cell and output happens once per notebook version
+rather than on every view. Image outputs are extracted during that pass into
+a content-addressed ImageStore and referenced by URL, so pages carry no
+base64 and each image is cached by the browser across views. Images from
+public notebooks (the exam) go to image_store and are served publicly from
+/nbimg/<sha256>; those from admin-only notebooks (answer key, midterm
+submissions) go to admin_image_store, served only to admins from
+/admin/nbimg/<sha256> with private caching.
+
+Notebooks too large to load whole (student submissions with tens of MB of
+base64 plots) are served a page of cells at a time instead: CellIndex
+records each cell's byte span from one scan of the file, so a page reads
+and parses only its own cells.
+"""
+import base64
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from stat import S_ISREG
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import get_template_attribute, url_for
+from markupsafe import Markup
+
+try:
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import PythonLexer
+except ImportError:  # Code cells are then highlighted by highlight.js in the browser
+    pygments_highlight = None
+
+logger = logging.getLogger(__name__)
+
+NOTEBOOK_CACHE_BYTES = int(os.environ.get('NOTEBOOK_CACHE_BYTES', str(64 * 1024 * 1024)))
+# Parsed JSON takes several times the file size in Python objects; entries
+# are charged this multiple of the file size
+PARSED_SIZE_FACTOR = 3
+
+
+@dataclass(frozen=True)
+class NotebookEntry:
+    """A loaded notebook: the parsed document and a digest of the JSON text it was parsed from."""
+    path: str
+    mtime_ns: int
+    size: int
+    notebook: Dict[str, Any]
+    digest: str  # sha256 of the JSON text; identifies this version of the notebook
+
+    @property
+    def cost(self) -> int:
+        return self.size * PARSED_SIZE_FACTOR
+
+
+class NotebookCache:
+    """Thread-safe LRU of NotebookEntry keyed by path, validated by (mtime, size)."""
+
+    def __init__(self, max_bytes: int = NOTEBOOK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Optional[NotebookEntry]:
+        """
+        Load a notebook, from cache when the file is unchanged.
+
+        Returns None if the file does not exist. Raises ValueError if it is
+        not valid JSON, like json.load would.
+        """
+        path = os.path.realpath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._discard(path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Parse outside the lock; concurrent misses on one file just parse twice
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        entry = NotebookEntry(path, stat.st_mtime_ns, stat.st_size, json.loads(text),
+                              hashlib.sha256(text.encode('utf-8')).hexdigest())
+        self._store(entry)
+        return entry
+
+    def load(self, path: str) -> Optional[Dict[str, Any]]:
+        """The parsed notebook at path, or None if the file does not exist."""
+        entry = self.get(path)
+        return entry.notebook if entry else None
+
+    def _store(self, entry: NotebookEntry) -> None:
+        if entry.cost > self.max_bytes:
+            logger.info(f"Notebook {entry.path} ({entry.size} bytes) exceeds the cache budget; not cached")
+            return
+        with self._lock:
+            old = self._entries.pop(entry.path, None)
+            if old is not None:
+                self._bytes -= old.cost
+            self._entries[entry.path] = entry
+            self._bytes += entry.cost
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.cost
+
+    def _discard(self, path: str) -> None:
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old.cost
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+# One cache per worker process, shared by every notebook view
+notebook_cache = NotebookCache()
+
+
+# --- Pre-rendered cell HTML ---
+
+# Bump when the cell markup or its inputs change so stale fragments are not served
+NOTEBOOK_RENDER_VERSION = 3
+_CACHE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.cache')
+NOTEBOOK_FRAGMENT_DIR = os.environ.get('NOTEBOOK_FRAGMENT_DIR', os.path.join(_CACHE_ROOT, 'notebook_fragments'))
+NOTEBOOK_IMAGE_DIR = os.environ.get('NOTEBOOK_IMAGE_DIR', os.path.join(_CACHE_ROOT, 'notebook_images'))
+# Long outputs (training logs, progress bars) are cut to this many lines / characters
+NOTEBOOK_OUTPUT_MAX_LINES = int(os.environ.get('NOTEBOOK_OUTPUT_MAX_LINES', '200'))
+NOTEBOOK_OUTPUT_MAX_CHARS = int(os.environ.get('NOTEBOOK_OUTPUT_MAX_CHARS', '20000'))
+# highlight.js theme used by the viewers, so server-highlighted code looks the same
+PYGMENTS_STYLE = 'github-dark'
+# Raster output types extracted as images, in order of preference; SVG is
+# left out since it can carry script
+IMAGE_EXTENSIONS = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/gif': '.gif'}
+
+
+def _text(value) -> str:
+    # nbformat stores multi-line strings either as one string or a list of lines
+    return ''.join(value) if isinstance(value, list) else (value or '')
+
+
+def _truncate_output(text: str) -> Dict[str, Any]:
+    lines = text.splitlines(keepends=True)
+    omitted = max(0, len(lines) - NOTEBOOK_OUTPUT_MAX_LINES)
+    shown = ''.join(lines[:NOTEBOOK_OUTPUT_MAX_LINES]) if omitted else text
+    if len(shown) > NOTEBOOK_OUTPUT_MAX_CHARS:
+        shown = shown[:NOTEBOOK_OUTPUT_MAX_CHARS]
+        omitted = omitted or 1
+    return {'text': shown, 'omitted': omitted}
+
+
+def _highlight_python(source: str) -> Optional[Markup]:
+    if pygments_highlight is None or not source:
+        return None
+    return Markup(pygments_highlight(source, PythonLexer(), HtmlFormatter(nowrap=True)))
+
+
+def _output_image_mime(output: Dict[str, Any]) -> Optional[str]:
+    data = output.get('data') or {}
+    return next((mime for mime in IMAGE_EXTENSIONS if data.get(mime)), None)
+
+
+def _image_url(output: Dict[str, Any], mime: str, private: bool) -> str:
+    """Extract an image output into the public or admin image store and return its URL."""
+    data = _text(output['data'][mime])
+    store, endpoint = (admin_image_store, 'admin_notebook_image') if private else (image_store, 'notebook_image')
+    try:
+        digest = store.put(base64.b64decode(data), mime)
+    except (ValueError, OSError) as e:
+        # Keep the image visible even if it cannot be stored
+        logger.warning(f"Could not extract notebook image: {e}")
+        return f"data:{mime};base64,{data.strip()}"
+    return url_for(endpoint, digest=digest)
+
+
+def _cell_view(cell: Dict[str, Any], private: bool = True) -> Dict[str, Any]:
+    """
+    What the notebook_cells macro needs from one nbformat cell; images are extracted here.
+
+    private keeps the cell's images behind admin auth (see _image_url).
+    """
+    source = _text(cell.get('source'))
+    view = {'cell_type': cell.get('cell_type'), 'source': source}
+    if view['cell_type'] != 'code':
+        return view
+
+    outputs = []
+    for output in cell.get('outputs') or []:
+        mime = _output_image_mime(output)
+        if mime:
+            outputs.append({'image': _image_url(output, mime, private)})
+        elif output.get('output_type') == 'stream':
+            outputs.append(_truncate_output(_text(output.get('text'))))
+        elif output.get('output_type') == 'execute_result' and output.get('data'):
+            if 'text/plain' in output['data']:
+                outputs.append(_truncate_output(_text(output['data']['text/plain'])))
+    view.update(highlighted=_highlight_python(source), outputs=outputs,
+                has_outputs=bool(cell.get('outputs')))
+    return view
+
+
+def _pygments_css() -> str:
+    if pygments_highlight is None:
+        return ''
+    scope = '.nb-pygments'
+    rules = HtmlFormatter(style=PYGMENTS_STYLE).get_style_defs(scope).splitlines()
+    # Only token colours; backgrounds and spacing come from the highlight.js theme
+    return '<style>' + '\n'.join(rule for rule in rules if rule.startswith(scope + ' .')) + '</style>\n'
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so concurrent readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class FragmentStore:
+    """Rendered HTML fragments on disk, one file per content-hash key."""
+
+    def __init__(self, directory: str = NOTEBOOK_FRAGMENT_DIR):
+        self.directory = directory
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def get(self, key: str, suffix: str = '.html') -> Optional[str]:
+        try:
+            with open(self._path(key, suffix), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str, suffix: str = '.html') -> None:
+        try:
+            _write_atomic(self._path(key, suffix), text.encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not store notebook fragment {key}: {e}")
+
+
+fragment_store = FragmentStore()
+
+
+class ImageStore:
+    """Notebook output images on disk, named by the sha256 of their bytes."""
+
+    def __init__(self, directory: str = NOTEBOOK_IMAGE_DIR):
+        self.directory = directory
+
+    def _path(self, digest: str, mime: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + IMAGE_EXTENSIONS[mime])
+
+    def put(self, data: bytes, mime: str) -> str:
+        """Store an image (once per distinct content) and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, mime)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        return digest
+
+    def find(self, digest: str) -> Optional[Tuple[str, str]]:
+        """(path, mime) of a stored image, or None if digest is unknown or malformed."""
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            return None
+        for mime in IMAGE_EXTENSIONS:
+            path = self._path(digest, mime)
+            if os.path.exists(path):
+                return path, mime
+        return None
+
+
+# Images of notebooks anyone may view, and of admin-only notebooks
+image_store = ImageStore(os.path.join(NOTEBOOK_IMAGE_DIR, 'public'))
+admin_image_store = ImageStore(os.path.join(NOTEBOOK_IMAGE_DIR, 'admin'))
+
+
+def render_notebook_html(entry: NotebookEntry, class_prefix: str = '', id_prefix: str = 'cell-',
+                         private: bool = True) -> Markup:
+    """
+    Cell HTML for a notebook, rendered once per notebook version and markup variant.
+
+    class_prefix/id_prefix select the markup used by notebook_viewer.html
+    ('' / 'cell-') or the course page's answer key ('nb-' / 'ak-cell-').
+    Pass private=False only for notebooks anyone may view; their images are
+    then publicly cacheable. Must be called within a request (uses
+    macros/notebook.html and url_for).
+    """
+    variant = (f"v{NOTEBOOK_RENDER_VERSION}|{class_prefix}|{id_prefix}|{pygments_highlight is not None}"
+               f"|{'private' if private else 'public'}")
+    key = hashlib.sha256(f"{variant}|{entry.digest}".encode()).hexdigest()
+    html = fragment_store.get(key)
+    if html is None:
+        notebook_cells = get_template_attribute('macros/notebook.html', 'notebook_cells')
+        cells: List[Dict[str, Any]] = [_cell_view(cell, private) for cell in entry.notebook.get('cells', [])]
+        html = _pygments_css() + str(notebook_cells(cells, class_prefix, id_prefix))
+        fragment_store.put(key, html)
+    return Markup(html)
+
+
+# --- Cell-paged access to large notebooks ---
+
+# Notebooks at least this large open in the paged viewer
+NOTEBOOK_LAZY_BYTES = int(os.environ.get('NOTEBOOK_LAZY_BYTES', str(5 * 1024 * 1024)))
+NOTEBOOK_PAGE_CELLS = 20
+NOTEBOOK_MAX_PAGE_CELLS = 100
+CELL_INDEX_CACHE_ENTRIES = 128
+
+# JSON strings (escapes included) or structural brackets; one C-level match
+# skips a whole multi-MB base64 string, so the scan never decodes the file
+_JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+_QUOTE, _LBRACE, _RBRACE, _LBRACKET, _RBRACKET = b'"{}[]'  # as byte values
+
+
+def _scan_cell_spans(buf) -> List[Tuple[int, int]]:
+    """
+    Byte spans of the objects in a notebook's top-level "cells" array.
+
+    buf is the raw file (bytes or mmap). Only strings and brackets are
+    tokenized; depth 1 is the notebook object, depth 2 the cells array.
+    Raises ValueError if no complete cells array is found.
+    """
+    spans = []
+    depth = 0
+    expect_cells = in_cells = False
+    cell_start = 0
+    for match in _JSON_TOKEN.finditer(buf):
+        start = match.start()
+        char = buf[start]
+        if char == _QUOTE:
+            if depth == 1 and not in_cells:
+                expect_cells = buf[start:match.end()] == b'"cells"'
+            continue
+        if char in (_LBRACE, _LBRACKET):
+            if depth == 1 and expect_cells and char == _LBRACKET:
+                in_cells, expect_cells = True, False
+            elif depth == 2 and in_cells and char == _LBRACE:
+                cell_start = start
+            depth += 1
+        else:
+            depth -= 1
+            if in_cells and depth == 2 and char == _RBRACE:
+                spans.append((cell_start, match.end()))
+            elif in_cells and depth == 1 and char == _RBRACKET:
+                return spans
+    raise ValueError("Notebook has no complete 'cells' array")
+
+
+@dataclass(frozen=True)
+class CellIndex:
+    """Byte spans of a notebook's cells, for one version (mtime, size) of the file."""
+    path: str
+    mtime_ns: int
+    size: int
+    spans: Tuple[Tuple[int, int], ...]
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the file does; used to version image URLs."""
+        return f"{self.mtime_ns:x}-{self.size:x}"
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def read_cells(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Parse cells [start, stop) straight from their spans in the file."""
+        cells = []
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_mtime_ns != self.mtime_ns:
+                raise ValueError("Notebook changed since it was indexed")
+            for begin, end in self.spans[start:stop]:
+                f.seek(begin)
+                cells.append(json.loads(f.read(end - begin)))
+        return cells
+
+
+class CellIndexCache:
+    """
+    Per-process LRU of CellIndex keyed by path, validated by (mtime, size).
+
+    Indexes are also kept in the fragment store, so each file version is
+    scanned once across all workers and restarts.
+    """
+
+    def __init__(self, store: FragmentStore = fragment_store, max_entries: int = CELL_INDEX_CACHE_ENTRIES):
+        self.store = store
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[CellIndex]:
+        """
+        The cell index of a notebook, or None if there is no such file.
+
+        Raises ValueError if the file is not a notebook.
+        """
+        path = os.path.realpath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+
+        with self._lock:
+            index = self._entries.get(path)
+            if index is not None and index.mtime_ns == stat.st_mtime_ns and index.size == stat.st_size:
+                self._entries.move_to_end(path)
+                return index
+
+        key = hashlib.sha256(f"cells|{path}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+        stored = self.store.get(key, suffix='.json')
+        if stored is not None:
+            spans = tuple(tuple(span) for span in json.loads(stored))
+        else:
+            spans = tuple(self._scan(path))
+            self.store.put(key, json.dumps(spans, separators=(',', ':')), suffix='.json')
+        index = CellIndex(path, stat.st_mtime_ns, stat.st_size, spans)
+
+        with self._lock:
+            self._entries[path] = index
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    @staticmethod
+    def _scan(path: str) -> List[Tuple[int, int]]:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Empty notebook file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _scan_cell_spans(buf)
+
+
+cell_index_cache = CellIndexCache()
+
+
+def render_cells_page(index: CellIndex, start: int, stop: int, private: bool = True) -> Markup:
+    """
+    Viewer markup for cells [start, stop) of an indexed notebook.
+
+    The first page carries the highlighting styles; private is as for
+    render_notebook_html. Must be called within a request (uses
+    macros/notebook.html and url_for).
+    """
+    notebook_cells = get_template_attribute('macros/notebook.html', 'notebook_cells')
+    cells = [_cell_view(cell, private) for cell in index.read_cells(start, stop)]
+    html = str(notebook_cells(cells, '', 'cell-', start))
+    return Markup((_pygments_css() if start == 0 else '') + html)
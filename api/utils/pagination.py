@@ -0,0 +1,114 @@
+"""Keyset (cursor) pagination utilities.
+
+A cursor is the sort key of the last row on a page, base64-encoded so
+clients treat it as opaque. The next page is fetched with a row-value
+comparison against that key, which walks an index instead of skipping
+OFFSET rows, so page N costs the same as page 1.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Cursor shapes: the kind of each sort-key value, in ORDER BY order.
+# validate_pagination checks a cursor against its endpoint's shape, so a
+# malformed cursor is a 400 rather than a query error (an empty page).
+TIME_ID_CURSOR = ('timestamp', 'uuid')          # e.g. (created_at, id)
+NAME_ID_CURSOR = ('text', 'text', 'uuid')       # (last_name, first_name, student id)
+
+
+class Page(list):
+    """A list of rows carrying the cursor for the following page (None on the last page)."""
+
+    def __init__(self, rows=(), next_cursor: Optional[str] = None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+def _cursor_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode a row's sort key as an opaque, URL-safe cursor."""
+    payload = json.dumps([_cursor_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """Decode a cursor back into its sort key values. Raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _is_cursor_value(kind: str, value: Any) -> bool:
+    if kind == 'text':
+        return value is None or isinstance(value, str)
+    if not isinstance(value, str):
+        return False
+    try:
+        if kind == 'timestamp':
+            datetime.fromisoformat(value)
+        elif kind == 'uuid':
+            uuid.UUID(value)
+        else:
+            raise ValueError(f"Unknown cursor value kind {kind!r}")
+    except ValueError:
+        return False
+    return True
+
+
+def validate_pagination(args, cursor_shape: Optional[Tuple[str, ...]] = None
+                        ) -> Tuple[bool, str, Optional[int], Optional[str]]:
+    """
+    Read `limit` and `cursor` from request args.
+
+    Returns (is_valid, error_message, limit, cursor). limit is None when the
+    client asked for neither, so existing callers keep their full listing;
+    a cursor without a limit gets DEFAULT_PAGE_SIZE. With cursor_shape (e.g.
+    TIME_ID_CURSOR), the cursor must hold one value of each kind.
+    """
+    raw_limit = args.get('limit')
+    cursor = args.get('cursor') or None
+
+    limit = None
+    if raw_limit is not None:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            return False, "limit must be an integer", None, None
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            return False, f"limit must be between 1 and {MAX_PAGE_SIZE}", None, None
+    elif cursor:
+        limit = DEFAULT_PAGE_SIZE
+
+    if cursor:
+        try:
+            values = decode_cursor(cursor, len(cursor_shape) if cursor_shape else None)
+        except ValueError:
+            return False, "Invalid cursor", None, None
+        if cursor_shape and not all(_is_cursor_value(kind, value) for kind, value in zip(cursor_shape, values)):
+            return False, "Invalid cursor", None, None
+
+    return True, "", limit, cursor
+
+
+def pagination_headers(rows) -> dict:
+    """Response headers advertising the next page, if there is one."""
+    next_cursor = getattr(rows, 'next_cursor', None)
+    return {'X-Next-Cursor': next_cursor} if next_cursor else {}
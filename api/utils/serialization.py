@@ -0,0 +1,129 @@
+"""Direct JSON serialization for CompactRows.
+
+Writes tuple rows to JSON without building a dict per row. Values are
+encoded the same way as Flask's default JSON provider (dates as HTTP dates,
+UUID and Decimal as strings), so responses are interchangeable with jsonify.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii
+
+from flask import Response, current_app, stream_with_context
+from werkzeug.http import http_date
+
+
+def _encode_float(value: float) -> str:
+    return json.dumps(value)
+
+
+def _encode_date(value) -> str:
+    return '"' + http_date(value) + '"'
+
+
+def _encode_str_value(value) -> str:
+    return encode_basestring_ascii(str(value))
+
+
+def _encode_other(value) -> str:
+    # jsonb columns arrive as dicts/lists; anything else goes through Flask's provider
+    return current_app.json.dumps(value)
+
+
+_ENCODERS = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+    datetime: _encode_date,
+    date: _encode_date,
+    uuid.UUID: _encode_str_value,
+    Decimal: _encode_str_value,
+}
+
+
+def encode_value(value) -> str:
+    """Encode one column value as a JSON fragment."""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        return _encode_other(value)
+    return encoder(value)
+
+
+def dumps_rows(compact_rows, layout: str = 'objects') -> str:
+    """
+    Serialize CompactRows to a JSON string.
+
+    layout='objects' produces the usual array of objects (what jsonify of
+    rows_to_dicts would give, with keys in column order). layout='columns'
+    produces {"columns": [...], "rows": [[...], ...]}, sending each column
+    name once.
+    """
+    return ''.join(iter_json_rows(compact_rows, layout))
+
+
+def iter_json_rows(compact_rows, layout: str = 'objects'):
+    """Yield JSON text for CompactRows in chunks of one row each."""
+    encode = encode_value
+    if layout == 'columns':
+        yield '{"columns":' + json.dumps(list(compact_rows.columns)) + ',"rows":['
+        separator = ''
+        for row in compact_rows:
+            yield separator + '[' + ','.join([encode(value) for value in row]) + ']'
+            separator = ','
+        yield ']}'
+        return
+
+    prefixes = [
+        (',' if i else '{') + encode_basestring_ascii(column) + ':'
+        for i, column in enumerate(compact_rows.columns)
+    ]
+    yield '['
+    separator = ''
+    for row in compact_rows:
+        yield separator + ''.join([prefix + encode(value) for prefix, value in zip(prefixes, row)]) + '}'
+        separator = ','
+    yield ']'
+
+
+# Streamed bodies are flushed to the client in chunks of roughly this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _chunked(parts, chunk_bytes: int = STREAM_CHUNK_BYTES):
+    """Coalesce many small JSON fragments into fewer, larger writes."""
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_bytes:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def rows_response(rows, layout: str = 'objects', status: int = 200, headers=None) -> Response:
+    """
+    JSON response for CompactRows or StreamedRows, serialized without intermediate dicts.
+
+    StreamedRows are written incrementally as they are read from the database,
+    so memory stays flat; the stream's connection is released when the body
+    finishes or the client disconnects.
+    """
+    if hasattr(rows, 'close'):
+        response = Response(stream_with_context(_chunked(iter_json_rows(rows, layout))),
+                            status=status, headers=headers, mimetype='application/json')
+        response.call_on_close(rows.close)
+        return response
+    return Response(dumps_rows(rows, layout), status=status, headers=headers,
+                    mimetype='application/json')
+
+
+def requested_layout(args) -> str:
+    """Row layout requested with ?format=compact (columns + row arrays), else objects."""
+    return 'columns' if args.get('format') == 'compact' else 'objects'
@@ -1,4 +1,6 @@
 """Input validation utilities."""
+import uuid
+
 from ..config import ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
 
 
@@ -33,3 +35,14 @@ def validate_input(value: str, max_length: int = 255, field_name: str = "input")
         return False, f"{field_name} contains invalid characters"
 
     return True, ""
+
+
+def validate_uuid(value, field_name: str = "id") -> tuple:
+    """Validate that a value is a UUID string, as uuid columns and casts require."""
+    if not isinstance(value, str):
+        return False, f"{field_name} must be a UUID"
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False, f"{field_name} must be a UUID"
+    return True, ""
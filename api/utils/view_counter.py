@@ -0,0 +1,110 @@
+"""Buffered module view counter.
+
+Page views are counted in memory per (course_id, module_number) and written
+with one batched upsert every few seconds, or sooner once enough views have
+piled up, instead of two database round trips per page view. Pages render
+the last known total plus this worker's unflushed views.
+"""
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNT_FLUSH_SECONDS = float(os.environ.get('VIEW_COUNT_FLUSH_SECONDS', '5'))
+VIEW_COUNT_FLUSH_EVENTS = int(os.environ.get('VIEW_COUNT_FLUSH_EVENTS', '100'))
+
+Key = Tuple[str, int]
+
+
+class ViewCounter:
+    """
+    Per-process view aggregator with a background flusher thread.
+
+    The thread starts with the first recorded view (so it belongs to the
+    gunicorn worker, not the master) and loads the stored totals before its
+    first flush, so no request waits on the database. A failed flush puts
+    its increments back, so they go out with the next one. Call flush() on
+    shutdown.
+    """
+
+    def __init__(self, interval: float = VIEW_COUNT_FLUSH_SECONDS,
+                 max_pending: int = VIEW_COUNT_FLUSH_EVENTS):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        # Serializes flushes between the background thread and shutdown
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: Dict[Key, int] = {}
+        self._pending_total = 0
+        self._totals: Dict[Key, int] = {}
+        self._thread = None
+
+    def record(self, course_id: str, module_number: int) -> int:
+        """Count one view and return the count to display."""
+        key = (course_id, module_number)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._pending_total += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                self._thread.start()
+            if self._pending_total >= self.max_pending:
+                self._wake.set()
+        return self.count(course_id, module_number)
+
+    def count(self, course_id: str, module_number: int) -> int:
+        key = (course_id, module_number)
+        with self._lock:
+            return self._totals.get(key, 0) + self._pending.get(key, 0)
+
+    def flush(self) -> bool:
+        """Write pending views with one batched upsert, then refresh the cached totals."""
+        from .database_client import add_module_views
+
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+                self._pending_total = 0
+            if not deltas:
+                return True
+            if not add_module_views(deltas):
+                with self._lock:
+                    for key, n in deltas.items():
+                        self._pending[key] = self._pending.get(key, 0) + n
+                        self._pending_total += n
+                return False
+            # Flushed views are in the database totals now; pick up other workers' views too
+            with self._lock:
+                for key, n in deltas.items():
+                    self._totals[key] = self._totals.get(key, 0) + n
+            self._refresh_totals()
+            return True
+
+    def _refresh_totals(self):
+        from .database_client import get_module_view_counts
+
+        totals = get_module_view_counts()
+        if totals is None:
+            return
+        with self._lock:
+            self._totals = totals
+
+    def _run(self):
+        # Until this returns, pages show only this worker's views; if it
+        # fails, the next successful flush refreshes the totals
+        self._refresh_totals()
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+# One counter per worker process
+view_counter = ViewCounter()
+
+# Covers servers without a worker_exit hook (e.g. the development server)
+atexit.register(view_counter.flush)
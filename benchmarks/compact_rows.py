@@ -0,0 +1,110 @@
+"""
+Benchmark: serializing a 10k-row class roster.
+
+Compares the dict path (rows_to_dicts + jsonify) with CompactRows written
+straight to JSON by api.utils.serialization, in both layouts. Rows come from
+an in-memory sqlite table shaped like `students` so fetch cost is included.
+
+Usage:
+    python benchmarks/compact_rows.py
+    BENCH_ROWS=50000 python benchmarks/compact_rows.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from database import CompactRows, rows_to_dicts  # noqa: E402
+from api.utils.serialization import dumps_rows  # noqa: E402
+
+ROWS = int(os.environ.get('BENCH_ROWS', '10000'))
+REPEAT = int(os.environ.get('BENCH_REPEAT', '5'))
+
+ROSTER_QUERY = """
+    SELECT s.*, g.group_name
+    FROM students s
+    LEFT JOIN groups g ON s.group_id = g.id
+    ORDER BY s.last_name, s.first_name, s.id
+"""
+
+
+def build_database():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE students (
+                id TEXT PRIMARY KEY, first_name TEXT, last_name TEXT, email TEXT,
+                campus_id TEXT, program TEXT, class_id TEXT, group_id TEXT,
+                midterm_exam_status TEXT, final_exam_status TEXT, created_at TIMESTAMP
+            )
+        """))
+        conn.execute(text("CREATE TABLE groups (id TEXT PRIMARY KEY, group_name TEXT)"))
+        group_ids = [str(uuid.uuid4()) for _ in range(ROWS // 4 + 1)]
+        conn.execute(text("INSERT INTO groups VALUES (:id, :name)"),
+                     [{'id': gid, 'name': f'Group {i}'} for i, gid in enumerate(group_ids)])
+        base = datetime(2025, 1, 6, 8, 0)
+        conn.execute(text("""
+            INSERT INTO students VALUES (:id, :first, :last, :email, :campus, 'BSCS',
+                                         :class_id, :group_id, 'submitted', NULL, :created)
+        """), [{
+            'id': str(uuid.uuid4()), 'first': f'First{i}', 'last': f'Last{i % 997}',
+            'email': f'student{i}@up.edu.ph', 'campus': f'2021-{i:05d}',
+            'class_id': 'class-1', 'group_id': group_ids[i // 4] if i % 5 else None,
+            'created': base + timedelta(minutes=i),
+        } for i in range(ROWS)])
+    return engine
+
+
+def dict_path(conn, app):
+    rows = rows_to_dicts(conn.execute(text(ROSTER_QUERY)).fetchall())
+    return app.json.dumps(rows)
+
+
+def compact_path(layout):
+    def run(conn, app):
+        result = conn.execute(text(ROSTER_QUERY))
+        return dumps_rows(CompactRows(result.keys(), [tuple(row) for row in result]), layout)
+    return run
+
+
+def measure(fn, conn, app):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(conn, app)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    payload = fn(conn, app)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(payload)
+
+
+def main():
+    engine = build_database()
+    app = Flask(__name__)
+    cases = [
+        ('dicts + jsonify', dict_path),
+        ('compact objects', compact_path('objects')),
+        ('compact columns', compact_path('columns')),
+    ]
+    print(f"{ROWS} roster rows, best of {REPEAT}")
+    print(f"{'path':<18}{'time (ms)':>12}{'peak mem (MB)':>16}{'payload (KB)':>15}")
+    with app.app_context(), engine.connect() as conn:
+        baseline = None
+        for name, fn in cases:
+            elapsed, peak, size = measure(fn, conn, app)
+            baseline = baseline or elapsed
+            print(f"{name:<18}{elapsed * 1000:>12.1f}{peak / 1e6:>16.1f}{size / 1024:>15.0f}"
+                  f"   ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
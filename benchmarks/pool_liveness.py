@@ -0,0 +1,87 @@
+"""
+Benchmark: round trips spent on connection liveness checks.
+
+Replays the same checkout pattern (bursts of requests separated by
+occasional idle pauses) against two engines:
+
+  * pool_pre_ping=True        -> one ping per checkout
+  * install_idle_liveness()   -> a ping only after an idle pause
+
+and reports pings issued and wall time. Each ping is charged BENCH_RTT_MS
+of simulated network latency so the sqlite default reflects a remote
+Postgres; point BENCH_DATABASE_URL at a real server to measure it directly
+(set BENCH_RTT_MS=0 then).
+
+Usage:
+    python benchmarks/pool_liveness.py
+    BENCH_DATABASE_URL=postgresql://... BENCH_RTT_MS=0 python benchmarks/pool_liveness.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.pool import QueuePool  # noqa: E402
+
+from database import PoolStats, install_idle_liveness  # noqa: E402
+
+RTT_SECONDS = float(os.environ.get('BENCH_RTT_MS', '0.5')) / 1000
+BURSTS = int(os.environ.get('BENCH_BURSTS', '20'))
+CHECKOUTS_PER_BURST = int(os.environ.get('BENCH_CHECKOUTS_PER_BURST', '200'))
+IDLE_THRESHOLD = 0.05   # scaled down from DB_PING_IDLE_SECONDS so the run stays short
+PAUSE = 0.1             # idle gap between bursts, longer than the threshold
+
+
+def make_engine(url, pre_ping):
+    engine = create_engine(url, poolclass=QueuePool, pool_size=4, max_overflow=0,
+                           pool_pre_ping=pre_ping)
+    counter = {'pings': 0}
+    do_ping = engine.dialect.do_ping
+
+    def counted_ping(dbapi_connection):
+        counter['pings'] += 1
+        time.sleep(RTT_SECONDS)
+        return do_ping(dbapi_connection)
+
+    engine.dialect.do_ping = counted_ping
+    return engine, counter
+
+
+def run(engine):
+    start = time.perf_counter()
+    for burst in range(BURSTS):
+        for _ in range(CHECKOUTS_PER_BURST):
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+        time.sleep(PAUSE)
+    return time.perf_counter() - start - BURSTS * PAUSE
+
+
+def main():
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    baseline, baseline_count = make_engine(url, pre_ping=True)
+    idle_aware, idle_count = make_engine(url, pre_ping=False)
+    install_idle_liveness(idle_aware, idle_seconds=IDLE_THRESHOLD, stats=PoolStats())
+
+    checkouts = BURSTS * CHECKOUTS_PER_BURST
+    results = [
+        ('pool_pre_ping', run(baseline), baseline_count['pings']),
+        ('idle-aware', run(idle_aware), idle_count['pings']),
+    ]
+
+    print(f"{checkouts} checkouts in {BURSTS} bursts, simulated RTT {RTT_SECONDS * 1000:.2f} ms")
+    print(f"{'strategy':<16}{'pings':>8}{'pings/checkout':>16}{'busy time (s)':>16}")
+    for name, elapsed, pings in results:
+        print(f"{name:<16}{pings:>8}{pings / checkouts:>16.3f}{elapsed:>16.3f}")
+    saved = results[0][2] - results[1][2]
+    print(f"round trips saved: {saved} ({saved / max(1, results[0][2]):.1%})")
+
+
+if __name__ == '__main__':
+    main()
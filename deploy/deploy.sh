@@ -51,9 +51,15 @@ source .venv/bin/activate
 pip install --upgrade pip
 pip install -r requirements.txt
 pip install gunicorn
+
+# Apply SQL migrations (each file is idempotent)
+set -a; source .env.production; set +a
+for migration in migrations/*.sql; do
+    psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -q -f "$migration"
+done
 ENDSSH
 
-echo "✓ Dependencies installed"
+echo "✓ Dependencies installed, migrations applied"
 
 # Step 4: Create log directory
 echo -e "\n${YELLOW}[4/7] Setting up logging...${NC}"
@@ -6,9 +6,33 @@ import os
 bind = "127.0.0.1:5001"
 backlog = 2048
 
+# Threaded workers: a live-feed stream (/api/admin/events) occupies one
+# thread, not a whole worker. Each worker caps its streams at half its
+# threads (SSE_MAX_CLIENTS) and holds one extra LISTEN connection while any
+# stream is open, on top of its share of DB_CONNECTION_BUDGET.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+# Database pool policy (see database.py): workers split DB_CONNECTION_BUDGET
+# between them, and each needs a connection per thread plus one for
+# background work. Unless set explicitly, the worker count is capped so that
+# every thread can hold a connection within the budget. Behind pgbouncer
+# (DB_POOL_MODE=transaction) the budget is pgbouncer's concern instead.
+db_connection_budget = int(os.environ.get('DB_CONNECTION_BUDGET', '40'))
+db_pool_mode = os.environ.get('DB_POOL_MODE', 'session')
+
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
+if db_pool_mode != 'transaction':
+    workers = max(1, min(workers, db_connection_budget // (threads + 1)))
+workers = int(os.environ.get('GUNICORN_WORKERS', workers))
+
+raw_env = [
+    f"GUNICORN_WORKERS={workers}",
+    f"GUNICORN_THREADS={threads}",
+    f"DB_CONNECTION_BUDGET={db_connection_budget}",
+    f"DB_POOL_MODE={db_pool_mode}",
+]
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -33,3 +57,13 @@ tmp_upload_dir = None
 limit_request_line = 4094
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+
+# Server hooks
+def worker_exit(server, worker):
+    """Write this worker's buffered module views before it goes away."""
+    try:
+        from api.utils.view_counter import view_counter
+        view_counter.flush()
+    except Exception as e:
+        server.log.warning(f"Could not flush module views on worker exit: {e}")
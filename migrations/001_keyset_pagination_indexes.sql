@@ -0,0 +1,31 @@
+-- Composite indexes backing keyset pagination.
+-- Each index matches a paginated query's WHERE equality columns followed by
+-- its ORDER BY keys, so "the next N rows after the cursor" is an index range
+-- scan regardless of how deep the page is.
+--
+-- CONCURRENTLY cannot run inside a transaction block: apply with plain
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f migrations/001_keyset_pagination_indexes.sql
+
+-- /api/admin/submissions (unfiltered and filtered by group)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_group_submissions_submitted_at_id
+    ON group_submissions (submitted_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_group_submissions_group_submitted_at_id
+    ON group_submissions (group_id, submitted_at DESC, id DESC);
+
+-- /api/groups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_groups_active_created_at_id
+    ON groups (created_at DESC, id DESC) WHERE is_active = TRUE;
+
+-- /api/groups/<id>/comments
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_group_comments_group_created_at_id
+    ON group_comments (group_id, created_at DESC, id DESC);
+
+-- get_class_records
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_students_class_name_id
+    ON students (class_id, last_name, first_name, id);
+
+-- get_grades_by_assessment: grades are filtered by assessment and ordered by
+-- student name, so the scan is bounded by one class's roster; this index
+-- serves the filter and the join key.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_student_grades_assessment_student
+    ON student_grades (assessment_id, student_id);
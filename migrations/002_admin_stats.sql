@@ -0,0 +1,116 @@
+-- Single-row summary behind the admin dashboard, kept current by triggers.
+--
+-- The dashboard used to count groups and submissions (plus one count per
+-- stage) on every load. Triggers on groups and group_submissions now apply
+-- +1/-1 deltas to this row in the same transaction as the write, so the
+-- dashboard reads one row. refresh_admin_stats() recomputes everything from
+-- scratch; run it to repair drift (e.g. after bulk loads with triggers
+-- disabled):
+--   flask --app api.index repair-admin-stats
+
+CREATE TABLE IF NOT EXISTS admin_stats (
+    id boolean PRIMARY KEY DEFAULT TRUE CHECK (id),
+    total_groups integer NOT NULL DEFAULT 0,
+    total_submissions integer NOT NULL DEFAULT 0,
+    -- submissions_by_stage[n] is the submission count for stage n (1-6)
+    submissions_by_stage integer[] NOT NULL DEFAULT '{0,0,0,0,0,0}',
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    refreshed_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO admin_stats (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+
+CREATE OR REPLACE FUNCTION refresh_admin_stats() RETURNS admin_stats
+LANGUAGE plpgsql AS $$
+DECLARE
+    result admin_stats;
+BEGIN
+    -- Wait for in-flight writers that already applied a delta, and hold off
+    -- new ones until this transaction commits. Each statement below takes a
+    -- fresh snapshot, so the counts include everything committed before the
+    -- lock was granted and nothing a blocked writer will add afterwards.
+    PERFORM 1 FROM admin_stats WHERE id FOR UPDATE;
+
+    UPDATE admin_stats SET
+        total_groups = (SELECT count(*) FROM groups WHERE is_active IS TRUE),
+        total_submissions = (SELECT count(*) FROM group_submissions),
+        submissions_by_stage = ARRAY(
+            SELECT count(gs.id)::integer
+            FROM generate_series(1, 6) AS stage(n)
+            LEFT JOIN group_submissions gs ON gs.stage_number = stage.n
+            GROUP BY stage.n
+            ORDER BY stage.n
+        ),
+        updated_at = now(),
+        refreshed_at = now()
+    WHERE id
+    RETURNING * INTO result;
+
+    RETURN result;
+END $$;
+
+
+CREATE OR REPLACE FUNCTION admin_stats_track_groups() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    delta integer := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        delta := delta + (NEW.is_active IS TRUE)::integer;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        delta := delta - (OLD.is_active IS TRUE)::integer;
+    END IF;
+
+    IF delta <> 0 THEN
+        UPDATE admin_stats
+        SET total_groups = total_groups + delta, updated_at = now()
+        WHERE id;
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS admin_stats_groups ON groups;
+CREATE TRIGGER admin_stats_groups
+    AFTER INSERT OR DELETE OR UPDATE OF is_active ON groups
+    FOR EACH ROW EXECUTE FUNCTION admin_stats_track_groups();
+
+
+CREATE OR REPLACE FUNCTION admin_stats_track_submissions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    stages integer[];
+    total_delta integer := 0;
+BEGIN
+    SELECT submissions_by_stage INTO stages FROM admin_stats WHERE id FOR UPDATE;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        IF OLD.stage_number BETWEEN 1 AND 6 THEN
+            stages[OLD.stage_number] := stages[OLD.stage_number] - 1;
+        END IF;
+        total_delta := total_delta - 1;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF NEW.stage_number BETWEEN 1 AND 6 THEN
+            stages[NEW.stage_number] := stages[NEW.stage_number] + 1;
+        END IF;
+        total_delta := total_delta + 1;
+    END IF;
+
+    UPDATE admin_stats
+    SET total_submissions = total_submissions + total_delta,
+        submissions_by_stage = stages,
+        updated_at = now()
+    WHERE id;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS admin_stats_submissions ON group_submissions;
+CREATE TRIGGER admin_stats_submissions
+    AFTER INSERT OR DELETE OR UPDATE OF stage_number ON group_submissions
+    FOR EACH ROW EXECUTE FUNCTION admin_stats_track_submissions();
+
+
+-- Seed the row from the current data
+SELECT refresh_admin_stats();
@@ -0,0 +1,4 @@
+-- Backs the prev/next probes in the admin group view (GROUP_NEIGHBORS_QUERY),
+-- which seek to the nearest (group_name, id) on either side of a group.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_groups_name_id
+    ON groups (group_name, id);
@@ -0,0 +1,5 @@
+-- Backs the member picker (get_available_students): ungrouped students of
+-- one class in name order, without touching students already in a group.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_students_ungrouped_class_name
+    ON students (class_id, last_name, first_name)
+    WHERE group_id IS NULL;
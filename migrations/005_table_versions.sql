@@ -0,0 +1,66 @@
+-- Per-table change counters used as HTTP validators (ETag / Last-Modified).
+--
+-- A statement-level trigger bumps a table's row in table_versions on every
+-- INSERT/UPDATE/DELETE/TRUNCATE, so "has anything these endpoints read
+-- changed?" is a primary-key lookup instead of re-running the endpoint's
+-- query. Unlike max(updated_at), this also catches deletes and columns
+-- that do not maintain updated_at (e.g. group renames).
+--
+-- Updates that only touch columns the cached views never render (a login
+-- writing groups.last_login) leave the version alone, so they do not
+-- invalidate every admin ETag.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name text PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0,
+    changed_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, changed_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1, changed_at = now();
+    RETURN NULL;
+END $$;
+
+-- UPDATE variant: compares the statement's old and new rows with the columns
+-- named in the trigger arguments removed, and bumps only if anything else changed
+CREATE OR REPLACE FUNCTION bump_table_version_on_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF EXISTS (
+        SELECT to_jsonb(n) - TG_ARGV FROM new_rows n
+        EXCEPT
+        SELECT to_jsonb(o) - TG_ARGV FROM old_rows o
+    ) THEN
+        INSERT INTO table_versions (table_name, version, changed_at)
+        VALUES (TG_TABLE_NAME, 1, now())
+        ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1, changed_at = now();
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS table_version_groups ON groups;
+CREATE TRIGGER table_version_groups
+    AFTER INSERT OR DELETE OR TRUNCATE ON groups
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Transition tables need a trigger of its own (one event per trigger)
+DROP TRIGGER IF EXISTS table_version_groups_update ON groups;
+CREATE TRIGGER table_version_groups_update
+    AFTER UPDATE ON groups
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version_on_update('last_login');
+
+DROP TRIGGER IF EXISTS table_version_group_submissions ON group_submissions;
+CREATE TRIGGER table_version_group_submissions
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON group_submissions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name)
+VALUES ('groups'), ('group_submissions')
+ON CONFLICT (table_name) DO NOTHING;
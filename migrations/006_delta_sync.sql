@@ -0,0 +1,75 @@
+-- Delta sync (?updated_since=) for the admin groups, submissions and grades lists.
+--
+-- Changed rows are found through updated_at indexes. Hard deletes leave a
+-- tombstone in deleted_records so clients can drop rows they hold; groups
+-- that are soft-deleted (is_active = FALSE) are reported from groups itself.
+
+-- groups had no updated_at; keep it current on every meaningful change
+ALTER TABLE groups ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION groups_touch_updated_at() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- A login only moves last_login; it should not make the group "changed"
+    IF (to_jsonb(NEW) - 'last_login' - 'updated_at') IS DISTINCT FROM
+       (to_jsonb(OLD) - 'last_login' - 'updated_at') THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS groups_touch_updated_at ON groups;
+CREATE TRIGGER groups_touch_updated_at
+    BEFORE UPDATE ON groups
+    FOR EACH ROW EXECUTE FUNCTION groups_touch_updated_at();
+
+-- Membership changes alter the group's member list, so they touch the group
+CREATE OR REPLACE FUNCTION group_members_touch_group() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE groups SET updated_at = now()
+    WHERE id = COALESCE(NEW.group_id, OLD.group_id);
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS group_members_touch_group ON group_members;
+CREATE TRIGGER group_members_touch_group
+    AFTER INSERT OR DELETE ON group_members
+    FOR EACH ROW EXECUTE FUNCTION group_members_touch_group();
+
+
+CREATE TABLE IF NOT EXISTS deleted_records (
+    table_name text NOT NULL,
+    record_id uuid NOT NULL,
+    deleted_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (table_name, record_id)
+);
+
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO deleted_records (table_name, record_id, deleted_at)
+    VALUES (TG_TABLE_NAME, OLD.id, now())
+    ON CONFLICT (table_name, record_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS tombstone_groups ON groups;
+CREATE TRIGGER tombstone_groups
+    AFTER DELETE ON groups
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+DROP TRIGGER IF EXISTS tombstone_group_submissions ON group_submissions;
+CREATE TRIGGER tombstone_group_submissions
+    AFTER DELETE ON group_submissions
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_groups_updated_at
+    ON groups (updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_group_submissions_updated_at
+    ON group_submissions (updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_student_grades_assessment_updated_at
+    ON student_grades (assessment_id, updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_deleted_records_table_deleted_at
+    ON deleted_records (table_name, deleted_at);
@@ -0,0 +1,22 @@
+-- Per-course module view counters, written in batches by api/utils/view_counter.py.
+--
+-- module_views was keyed by module number alone, so modules with the same
+-- number in different courses shared a counter. Its counts predate the other
+-- courses and are carried over as cmsc173's.
+
+CREATE TABLE IF NOT EXISTS course_module_views (
+    course_id text NOT NULL,
+    module_number integer NOT NULL,
+    view_count bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (course_id, module_number)
+);
+
+DO $$
+BEGIN
+    IF to_regclass('module_views') IS NOT NULL THEN
+        INSERT INTO course_module_views (course_id, module_number, view_count)
+        SELECT 'cmsc173', module_number, view_count FROM module_views
+        ON CONFLICT (course_id, module_number) DO NOTHING;
+    END IF;
+END $$;
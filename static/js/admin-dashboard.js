@@ -7,12 +7,16 @@ const AdminDashboard = {
     // Configuration
     config: {
         apiEndpoint: '/api/admin/statistics',
-        refreshInterval: 300000 // 5 minutes
+        eventsEndpoint: '/api/admin/events',
+        refreshInterval: 300000, // 5 minutes
+        liveRefreshDelay: 1000 // batch bursts of live events into one reload
     },
 
     // State
     state: {
-        refreshTimer: null
+        refreshTimer: null,
+        eventSource: null,
+        liveRefreshTimer: null
     },
 
     /**
@@ -352,6 +356,44 @@ const AdminDashboard = {
         }, this.config.refreshInterval);
     },
 
+    /**
+     * Subscribe to live submission, score and group changes (Server-Sent Events).
+     * Polling stays on as a fallback if the stream is unavailable.
+     */
+    startLiveUpdates() {
+        if (!window.EventSource || this.state.eventSource) {
+            return;
+        }
+
+        const source = new EventSource(this.config.eventsEndpoint);
+        ['submission', 'score', 'group', 'resync'].forEach(kind => {
+            source.addEventListener(kind, () => this.scheduleLiveRefresh());
+        });
+        source.onerror = () => {
+            // EventSource reconnects on its own unless the server refused the stream
+            if (source.readyState === EventSource.CLOSED) {
+                this.state.eventSource = null;
+            }
+        };
+        this.state.eventSource = source;
+    },
+
+    /**
+     * Reload the dashboard once after a burst of live events
+     */
+    scheduleLiveRefresh() {
+        if (this.state.liveRefreshTimer) {
+            return;
+        }
+        this.state.liveRefreshTimer = setTimeout(() => {
+            this.state.liveRefreshTimer = null;
+            const stageFilter = document.getElementById('stageFilter');
+            this.fetchDashboardData();
+            this.loadGroupsSubmissionStatus();
+            this.fetchFilteredSubmissions(stageFilter ? stageFilter.value || null : null);
+        }, this.config.liveRefreshDelay);
+    },
+
     /**
      * Load groups submission status table
      */
@@ -461,6 +503,7 @@ const AdminDashboard = {
             await this.loadGroupsSubmissionStatus();
             await this.fetchFilteredSubmissions(1);
             this.startAutoRefresh();
+            this.startLiveUpdates();
 
             // Event delegation for delete buttons
             const groupsTable = document.getElementById('groupsStatusTableBody');
@@ -490,6 +533,10 @@ const AdminDashboard = {
             clearInterval(this.state.refreshTimer);
             this.state.refreshTimer = null;
         }
+        if (this.state.eventSource) {
+            this.state.eventSource.close();
+            this.state.eventSource = null;
+        }
     }
 };
 
@@ -504,6 +551,7 @@ document.addEventListener('visibilitychange', () => {
     } else {
         AdminDashboard.fetchDashboardData();
         AdminDashboard.startAutoRefresh();
+        AdminDashboard.startLiveUpdates();
     }
 });
 
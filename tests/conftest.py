@@ -0,0 +1,128 @@
+"""
+Shared fixtures.
+
+Most of the suite runs without a database server: the unit of work is
+exercised on SQLite and routes are tested with their helpers patched.
+database_client helpers run their real (Postgres-specific) SQL on a scratch
+schema (pg_engine), so those tests run only when TEST_DATABASE_URL points at
+a Postgres database the tests may create schemas in.
+"""
+import os
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# database.py builds its engine at import; connections are only opened on use
+os.environ.setdefault('DATABASE_URL', 'postgresql://test@localhost/test')
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker, scoped_session  # noqa: E402
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+requires_postgres = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+
+
+def run_sql_file(connection, path):
+    with open(path) as f:
+        connection.exec_driver_sql(f.read())
+
+
+@pytest.fixture
+def sqlite_sessions(tmp_path, monkeypatch):
+    """Point database.SessionLocal at a file-backed SQLite database with working SAVEPOINTs."""
+    import database
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+    @event.listens_for(engine, 'connect')
+    def _no_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+    sessions = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(database, 'SessionLocal', sessions)
+    yield engine
+    sessions.remove()
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_engine(monkeypatch):
+    """
+    An engine on a scratch schema of TEST_DATABASE_URL holding tests/schema.sql.
+
+    database.SessionLocal is pointed at it, so database_client helpers run
+    their real SQL there. The schema is dropped afterwards.
+    """
+    import database
+
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={'options': f'-csearch_path={schema}'})
+    with engine.begin() as connection:
+        run_sql_file(connection, SCHEMA)
+
+    sessions = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(database, 'SessionLocal', sessions)
+    try:
+        yield engine
+    finally:
+        sessions.remove()
+        engine.dispose()
+        with admin.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+@pytest.fixture
+def no_database(monkeypatch):
+    """Fail the test if a database_client helper reaches the database."""
+    from api.utils import database_client
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("unexpected database access")
+
+    for name in ('get_db_context', 'execute_raw_sql', 'execute_raw_sql_compact'):
+        monkeypatch.setattr(database_client, name, unexpected)
+
+
+@pytest.fixture
+def flask_app():
+    """A bare Flask app with the request unit of work installed."""
+    from flask import Flask
+    import database
+
+    app = Flask(__name__)
+    database.init_app(app)
+    return app
+
+
+@pytest.fixture
+def portal_app(monkeypatch):
+    """The portal app, for route tests (database helpers are patched per test)."""
+    from api import index
+
+    index.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, RATELIMIT_ENABLED=False)
+    index.limiter.enabled = False
+    return index.app
+
+
+@pytest.fixture
+def admin_client(portal_app):
+    client = portal_app.test_client()
+    with client.session_transaction() as session:
+        session['is_admin'] = True
+    return client
@@ -0,0 +1,83 @@
+-- Minimal versions of the portal tables that the database_client helpers
+-- under test read and write (the production schema is managed in Supabase).
+CREATE TABLE classes (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    course_code text,
+    section text
+);
+
+CREATE TABLE groups (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    group_name text,
+    project_title text,
+    class_id uuid REFERENCES classes (id),
+    is_active boolean NOT NULL DEFAULT TRUE,
+    username text,
+    password_hash text,
+    last_login timestamptz,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE students (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    first_name text,
+    last_name text,
+    email text,
+    campus_id text,
+    program text,
+    class_id uuid REFERENCES classes (id),
+    group_id uuid REFERENCES groups (id) ON DELETE SET NULL
+);
+
+CREATE TABLE group_members (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    group_id uuid NOT NULL REFERENCES groups (id) ON DELETE CASCADE,
+    member_name text,
+    student_id uuid REFERENCES students (id),
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE group_submissions (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    group_id uuid NOT NULL REFERENCES groups (id) ON DELETE CASCADE,
+    stage_number integer NOT NULL,
+    file_path text,
+    score numeric,
+    max_score numeric,
+    feedback text,
+    admin_notes text,
+    submitted_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE group_feedback (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    group_id uuid NOT NULL REFERENCES groups (id) ON DELETE CASCADE,
+    stage_number integer NOT NULL,
+    feedback text
+);
+
+CREATE TABLE course_resources (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    course_code text NOT NULL,
+    title text,
+    display_order integer NOT NULL DEFAULT 0
+);
+
+CREATE TABLE assessments (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    class_id uuid REFERENCES classes (id),
+    title text,
+    max_score numeric
+);
+
+CREATE TABLE student_grades (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    student_id uuid NOT NULL REFERENCES students (id),
+    assessment_id uuid NOT NULL REFERENCES assessments (id) ON DELETE CASCADE,
+    score numeric,
+    feedback text,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    UNIQUE (student_id, assessment_id)
+);
@@ -0,0 +1,78 @@
+"""admin_stats summary row (migrations/002_admin_stats.sql) and the repair-admin-stats command."""
+import os
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from conftest import MIGRATIONS, requires_postgres, run_sql_file
+
+COUNTS = "SELECT total_groups, total_submissions, submissions_by_stage FROM admin_stats"
+
+
+@pytest.fixture
+def stats_db(pg_engine):
+    with pg_engine.begin() as connection:
+        run_sql_file(connection, os.path.join(MIGRATIONS, '002_admin_stats.sql'))
+    return pg_engine
+
+
+def _assert_matches_refresh(engine):
+    with engine.begin() as connection:
+        tracked = connection.execute(text(COUNTS)).one()
+        connection.execute(text("SELECT refresh_admin_stats()"))
+        assert connection.execute(text(COUNTS)).one() == tracked
+    return tracked
+
+
+@requires_postgres
+def test_triggers_track_inserts_updates_and_deletes(stats_db):
+    with stats_db.begin() as connection:
+        alpha, beta = connection.execute(text(
+            "INSERT INTO groups (group_name, is_active) VALUES ('Alpha', TRUE), ('Beta', FALSE) RETURNING id")).scalars()
+        connection.execute(text("""
+            INSERT INTO group_submissions (group_id, stage_number)
+            VALUES (:alpha, 1), (:alpha, 2), (:beta, 2), (:beta, 7)
+        """), {'alpha': alpha, 'beta': beta})
+    assert _assert_matches_refresh(stats_db) == (1, 4, [1, 2, 0, 0, 0, 0])
+
+    with stats_db.begin() as connection:
+        connection.execute(text("UPDATE groups SET is_active = NOT is_active"))
+        connection.execute(text("UPDATE group_submissions SET stage_number = 3 WHERE stage_number = 2"))
+        connection.execute(text("UPDATE group_submissions SET stage_number = 6 WHERE stage_number = 7"))
+    assert _assert_matches_refresh(stats_db) == (1, 4, [1, 0, 2, 0, 0, 1])
+
+    with stats_db.begin() as connection:
+        connection.execute(text("DELETE FROM group_submissions WHERE stage_number = 3"))
+        connection.execute(text("DELETE FROM groups WHERE id = :beta"), {'beta': beta})
+    assert _assert_matches_refresh(stats_db) == (0, 1, [1, 0, 0, 0, 0, 0])
+
+
+@requires_postgres
+def test_repair_corrects_drift(stats_db):
+    with stats_db.begin() as connection:
+        connection.execute(text("INSERT INTO groups (group_name) VALUES ('Alpha')"))
+        connection.execute(text("UPDATE admin_stats SET total_groups = 5, total_submissions = -2"))
+
+    repaired = database_client.repair_admin_stats()
+    assert (repaired['total_groups'], repaired['total_submissions']) == (1, 0)
+    assert _assert_matches_refresh(stats_db)[:2] == (1, 0)
+
+
+def test_repair_command_reports_counts(portal_app, monkeypatch):
+    from api import index
+
+    monkeypatch.setattr(index, 'repair_admin_stats', lambda: {
+        'total_groups': 3, 'total_submissions': 7, 'submissions_by_stage': [2, 5, 0, 0, 0, 0]})
+    result = portal_app.test_cli_runner().invoke(args=['repair-admin-stats'])
+    assert result.exit_code == 0
+    assert result.output == "admin_stats: 3 groups, 7 submissions, by stage [2, 5, 0, 0, 0, 0]\n"
+
+
+def test_repair_command_fails_when_the_repair_fails(portal_app, monkeypatch):
+    from api import index
+
+    monkeypatch.setattr(index, 'repair_admin_stats', lambda: None)
+    result = portal_app.test_cli_runner().invoke(args=['repair-admin-stats'])
+    assert result.exit_code == 1
+    assert "Repairing admin stats failed" in result.output
@@ -0,0 +1,72 @@
+"""Member picker candidates (database_client.get_available_students and its endpoint)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api import index
+from api.utils import database_client
+from conftest import requires_postgres
+
+
+@pytest.fixture
+def classes(pg_engine):
+    """
+    Two classes. In class A, ALICE is a candidate for ALPHA; BOB belongs to BETA,
+    CAROL is listed as an ALPHA member without her group_id set, and DAVE sits
+    in class B.
+    """
+    ids = {name: str(uuid.uuid4())
+           for name in ('a', 'b', 'alpha', 'beta', 'alice', 'bob', 'carol', 'dave')}
+    with pg_engine.begin() as connection:
+        connection.execute(text("INSERT INTO classes (id, course_code) VALUES (:a, 'CMSC 173'), (:b, 'CMSC 178')"), ids)
+        connection.execute(text("""
+            INSERT INTO groups (id, group_name, class_id) VALUES (:alpha, 'Alpha', :a), (:beta, 'Beta', :a)
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO students (id, first_name, last_name, class_id, group_id)
+            VALUES (:alice, 'Alice', 'A', :a, NULL), (:bob, 'Bob', 'B', :a, :beta),
+                   (:carol, 'Carol', 'C', :a, NULL), (:dave, 'Dave', 'D', :b, NULL)
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO group_members (group_id, member_name, student_id) VALUES (:alpha, 'Carol C', :carol)
+        """), ids)
+    return ids
+
+
+def _names(students):
+    return [s['first_name'] for s in students]
+
+
+@requires_postgres
+def test_group_candidates_exclude_grouped_members_and_other_classes(pg_engine, classes):
+    students = database_client.get_available_students(group_id=classes['alpha'])
+    assert _names(students) == ['Alice']
+    assert set(students[0]) == {'id', 'first_name', 'last_name', 'campus_id', 'program', 'class_id'}
+
+
+@requires_postgres
+def test_group_without_a_class_draws_from_every_class(pg_engine, classes):
+    with pg_engine.begin() as connection:
+        connection.execute(text("UPDATE groups SET class_id = NULL WHERE id = :alpha"), classes)
+    assert _names(database_client.get_available_students(group_id=classes['alpha'])) == ['Alice', 'Dave']
+
+
+@requires_postgres
+def test_unknown_group_has_no_candidates(pg_engine, classes):
+    assert database_client.get_available_students(group_id=str(uuid.uuid4())) == []
+
+
+@requires_postgres
+def test_class_filter(pg_engine, classes):
+    assert _names(database_client.get_available_students()) == ['Alice', 'Carol', 'Dave']
+    assert _names(database_client.get_available_students(class_id=classes['b'])) == ['Dave']
+
+
+@pytest.mark.parametrize('class_id', ['nope', '1; DROP TABLE students'])
+def test_endpoint_rejects_a_malformed_class_id(portal_app, monkeypatch, class_id):
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://unused')
+    monkeypatch.setattr(index, 'get_available_students', lambda **kwargs: pytest.fail("queried"))
+    response = portal_app.test_client().get('/api/students/ungrouped/all', query_string={'class_id': class_id})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "class_id must be a UUID"}
@@ -0,0 +1,59 @@
+"""Class roster from one query (database_client.get_class_roster)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from conftest import requires_postgres
+
+pytestmark = requires_postgres
+
+
+@pytest.fixture
+def roster_class(pg_engine):
+    """Class A: Zed and Amy in Beta, Bea in Alpha, Cy and Al ungrouped. Dee is in class B."""
+    ids = {name: str(uuid.uuid4()) for name in ('a', 'b', 'alpha', 'beta')}
+    with pg_engine.begin() as connection:
+        connection.execute(text("INSERT INTO classes (id, course_code) VALUES (:a, 'CMSC 173'), (:b, 'CMSC 178')"), ids)
+        connection.execute(text("""
+            INSERT INTO groups (id, group_name, project_title, class_id)
+            VALUES (:alpha, 'Alpha', 'Parser', :a), (:beta, 'Beta', 'Planner', :a)
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO students (first_name, last_name, campus_id, class_id, group_id) VALUES
+                ('Zed', 'Abad', '1', :a, :beta), ('Amy', 'Cruz', '2', :a, :beta), ('Bea', 'Diaz', '3', :a, :alpha),
+                ('Cy', 'Ong', '4', :a, NULL), ('Al', 'Lim', '5', :a, NULL), ('Dee', 'Tan', '6', :b, NULL)
+        """), ids)
+    return ids
+
+
+def _names(students):
+    return [s['first_name'] for s in students]
+
+
+def test_roster_partitions_students_like_the_separate_queries(roster_class):
+    roster = database_client.get_class_roster(roster_class['a'])
+
+    assert (roster['total_students'], roster['grouped_count'], roster['ungrouped_count']) == (5, 3, 2)
+    assert _names(roster['grouped_students']) == ['Bea', 'Zed', 'Amy']
+    assert _names(roster['ungrouped_students']) == ['Al', 'Cy']
+
+    # Same rows and columns as get_grouped_students / get_ungrouped_students
+    assert roster['grouped_students'] == database_client.get_grouped_students(roster_class['a'])
+    assert roster['ungrouped_students'] == database_client.get_ungrouped_students(roster_class['a'])
+    assert roster['grouped_students'][0]['project_title'] == 'Parser'
+    assert 'group_name' not in roster['ungrouped_students'][0]
+
+
+def test_counts_only_matches_the_full_roster(roster_class):
+    full = database_client.get_class_roster(roster_class['a'])
+    counts = database_client.get_class_roster(roster_class['a'], counts_only=True)
+    assert counts == {key: full[key] for key in ('total_students', 'ungrouped_count', 'grouped_count')}
+
+
+def test_empty_class(roster_class):
+    assert database_client.get_class_roster(str(uuid.uuid4()), counts_only=True) == {
+        'total_students': 0, 'ungrouped_count': 0, 'grouped_count': 0}
+    roster = database_client.get_class_roster(str(uuid.uuid4()))
+    assert (roster['grouped_students'], roster['ungrouped_students']) == ([], [])
@@ -0,0 +1,98 @@
+"""Conditional GET for polled endpoints (api.utils.conditional.conditional_get)."""
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask, jsonify
+
+from database import CompactRows
+from api.utils import database_client
+from api.utils.conditional import conditional_get
+
+CHANGED_AT = datetime(2026, 3, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    state = {'groups': {'version': 1, 'changed_at': CHANGED_AT},
+             'group_submissions': {'version': 5, 'changed_at': CHANGED_AT}}
+    monkeypatch.setattr(database_client, 'get_table_versions',
+                        lambda tables: None if state.get('down') else {t: dict(state[t]) for t in tables})
+    return state
+
+
+@pytest.fixture
+def client(versions):
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/stats')
+    @conditional_get('groups', 'group_submissions')
+    def stats():
+        calls.append(1)
+        return jsonify({'ok': True})
+
+    @app.route('/broken')
+    @conditional_get('groups')
+    def broken():
+        return jsonify({'error': 'boom'}), 500
+
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_unchanged_poll_gets_304_without_running_the_view(client):
+    first = client.get('/stats')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    again = client.get('/stats', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert client.calls == [1]
+
+
+def test_change_to_any_table_changes_the_etag(client, versions):
+    etag = client.get('/stats').headers['ETag']
+    versions['group_submissions']['version'] += 1
+    response = client.get('/stats', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_query_string_is_part_of_the_etag(client):
+    assert client.get('/stats?limit=10').headers['ETag'] != client.get('/stats').headers['ETag']
+
+
+def test_if_modified_since(client):
+    last_modified = client.get('/stats').headers['Last-Modified']
+    assert client.get('/stats', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_without_versions_the_view_just_runs(client, versions):
+    versions['down'] = True
+    response = client.get('/stats', headers={'If-None-Match': '"anything"'})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_errors_carry_no_validators(client):
+    response = client.get('/broken')
+    assert response.status_code == 500
+    assert 'ETag' not in response.headers
+
+
+def test_failed_listing_is_a_500_without_validators(admin_client, versions, monkeypatch):
+    from api import index
+
+    monkeypatch.setattr(index, 'get_admin_submission_rows', lambda **kwargs: None)
+    response = admin_client.get('/api/admin/submissions')
+    assert response.status_code == 500
+    assert 'ETag' not in response.headers
+
+    # The next poll, with the database back, gets the listing rather than a 304
+    monkeypatch.setattr(index, 'get_admin_submission_rows', lambda **kwargs: CompactRows(('id',), [(1,)]))
+    response = admin_client.get('/api/admin/submissions', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.get_json() == [{'id': 1}]
@@ -0,0 +1,54 @@
+"""Delta sync helpers (api.utils.delta)."""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+
+from database import CompactRows
+from api.utils.delta import delta_response, validate_updated_since
+
+app = Flask(__name__)
+AS_OF = datetime(2026, 3, 1, 20, 0, tzinfo=timezone(timedelta(hours=8)))
+
+
+def test_no_updated_since_means_full_listing():
+    assert validate_updated_since({}) == (True, "", None)
+
+
+def test_z_suffix_and_naive_timestamps_are_utc():
+    expected = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    assert validate_updated_since({'updated_since': '2026-03-01T12:00:00Z'})[2] == expected
+    assert validate_updated_since({'updated_since': '2026-03-01T12:00:00'})[2] == expected
+    assert validate_updated_since({'updated_since': '2026-03-01T20:00:00+08:00'})[2] == expected
+
+
+def test_rejects_garbage_and_pagination():
+    ok, message, since = validate_updated_since({'updated_since': 'yesterday'})
+    assert (ok, since) == (False, None) and 'ISO 8601' in message
+    for extra in ({'limit': '10'}, {'cursor': 'abc'}):
+        ok, message, _ = validate_updated_since({'updated_since': '2026-03-01T12:00:00Z', **extra})
+        assert not ok and 'limit or cursor' in message
+
+
+def test_delta_response_body():
+    rows = CompactRows(('id', 'name'), [(uuid.UUID(int=1), 'A')])
+    deleted = uuid.UUID(int=2)
+    with app.app_context():
+        response = delta_response(rows, {'deleted': [deleted], 'as_of': AS_OF})
+        body = json.loads(response.get_data())
+    assert response.mimetype == 'application/json'
+    assert body == {'changed': [{'id': str(uuid.UUID(int=1)), 'name': 'A'}],
+                    'deleted': [str(deleted)],
+                    'next_since': '2026-03-01T12:00:00Z'}
+    # next_since round-trips as the next request's updated_since
+    assert validate_updated_since({'updated_since': body['next_since']})[2] == AS_OF
+
+
+def test_delta_response_accepts_dicts_and_columns_layout():
+    with app.app_context():
+        plain = json.loads(delta_response([{'id': 1}], {'deleted': [], 'as_of': AS_OF}).get_data())
+        columns = json.loads(delta_response(CompactRows(('id',), [(1,), (2,)]),
+                                            {'deleted': [], 'as_of': AS_OF}, layout='columns').get_data())
+    assert plain['changed'] == [{'id': 1}] and plain['deleted'] == []
+    assert columns['changed']['columns'] == ['id']
@@ -0,0 +1,137 @@
+"""Live change feed (api.utils.events)."""
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from api.utils import events
+from api.utils.events import EventBroker, Subscription, event_stream, format_sse
+
+
+class FakeListenConnection:
+    """Stands in for a psycopg2 connection in LISTEN: notify() wakes select()."""
+
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._pending = []
+        self.notifies = []
+        self.executed = []
+        self.closed = False
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def cursor(self):
+        return SimpleNamespace(execute=self.executed.append)
+
+    def notify(self, payload):
+        self._pending.append(SimpleNamespace(payload=payload))
+        self._writer.send(b'x')
+
+    def poll(self):
+        self._reader.recv(1024)
+        self.notifies.extend(self._pending)
+        self._pending.clear()
+
+    def close(self):
+        self.closed = True
+        self._reader.close()
+        self._writer.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_keepalive(monkeypatch):
+    monkeypatch.setattr(events, 'SSE_KEEPALIVE_SECONDS', 0.02)
+
+
+@pytest.fixture
+def listen():
+    connections = []
+    connected = threading.Event()
+
+    def connect():
+        connections.append(FakeListenConnection())
+        connected.set()
+        return connections[-1]
+
+    connect.connections = connections
+    connect.connected = connected
+    return connect
+
+
+def test_one_listener_fans_out_to_every_subscriber(listen):
+    broker = EventBroker(channel='test_events', connect=listen, max_clients=5)
+    first, second = broker.subscribe(), broker.subscribe()
+    assert listen.connected.wait(2)
+    assert len(listen.connections) == 1
+    assert listen.connections[0].executed == ['LISTEN test_events']
+
+    listen.connections[0].notify(json.dumps({'kind': 'submission', 'id': 1}))
+    listen.connections[0].notify('not json')
+    assert first.queue.get(timeout=2) == {'kind': 'submission', 'id': 1}
+    assert second.queue.get(timeout=2) == {'kind': 'submission', 'id': 1}
+    assert first.queue.empty()
+
+
+def test_listener_closes_after_last_subscriber_leaves(listen):
+    broker = EventBroker(connect=listen)
+    subscription = broker.subscribe()
+    assert listen.connected.wait(2)
+    thread = broker._thread
+    broker.unsubscribe(subscription)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert listen.connections[0].closed
+    assert broker._thread is None
+
+
+def test_max_clients_per_worker(listen):
+    broker = EventBroker(connect=listen, max_clients=1)
+    subscription = broker.subscribe()
+    assert broker.subscribe() is None
+    broker.unsubscribe(subscription)
+
+
+def test_overflowing_subscriber_is_marked():
+    subscription = Subscription(maxsize=1)
+    subscription.put({'kind': 'a'})
+    subscription.put({'kind': 'b'})
+    assert subscription.overflowed
+
+
+def test_format_sse_names_event_by_kind():
+    assert format_sse({'kind': 'grade', 'id': 3}) == 'event: grade\ndata: {"kind": "grade", "id": 3}\n\n'
+    assert format_sse({'id': 3}).startswith('event: message\n')
+
+
+def test_event_stream_yields_events_then_resyncs_on_overflow():
+    unsubscribed = []
+    broker = SimpleNamespace(unsubscribe=unsubscribed.append)
+    subscription = Subscription(maxsize=1)
+    subscription.put({'kind': 'grade'})
+    stream = event_stream(broker, subscription, max_seconds=5)
+
+    assert next(stream) == 'retry: 3000\n\n'
+    assert next(stream) == format_sse({'kind': 'grade'})
+    assert next(stream) == ': keepalive\n\n'
+    subscription.overflowed = True
+    assert next(stream) == format_sse({'kind': 'resync'})
+    with pytest.raises(StopIteration):
+        next(stream)
+    assert unsubscribed == [subscription]
+
+
+def test_event_stream_ends_at_max_seconds():
+    broker = SimpleNamespace(unsubscribe=lambda subscription: None)
+    assert list(event_stream(broker, Subscription(), max_seconds=0)) == ['retry: 3000\n\n']
+
+
+def test_events_endpoint_refuses_when_worker_is_full(admin_client, monkeypatch):
+    from api import index
+
+    monkeypatch.setattr(index, 'event_broker', EventBroker(connect=None, max_clients=0))
+    response = admin_client.get('/api/admin/events')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
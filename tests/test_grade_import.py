@@ -0,0 +1,110 @@
+"""Bulk grade import (database_client.bulk_upsert_grades and its helpers)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from api.utils.database_client import _csv_field, _prepare_grade_rows
+from conftest import requires_postgres
+
+ALICE = 'aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa'
+BOB = 'bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb'
+
+
+def test_prepare_drops_malformed_and_keeps_last_row_per_student():
+    rows = _prepare_grade_rows([
+        {'student_id': ALICE, 'score': 80},
+        {'student_id': 'not-a-uuid', 'score': 90},
+        {'student_id': BOB, 'score': 'ten'},
+        'not a dict',
+        {'student_id': ALICE.upper(), 'score': '95.5', 'feedback': 7},
+        {'student_id': BOB, 'score': ''},
+    ])
+    assert rows == [(ALICE, 95.5, '7'), (BOB, None, None)]
+
+
+@pytest.mark.parametrize('score', [float('nan'), float('inf'), float('-inf'), 'NaN', 'Infinity', '-inf'])
+def test_prepare_rejects_non_finite_scores(score):
+    assert _prepare_grade_rows([{'student_id': ALICE, 'score': score}]) == []
+
+
+def test_csv_field_quotes_text_and_leaves_null_unquoted():
+    assert _csv_field(None) == ''
+    assert _csv_field(1.5) == '1.5'
+    assert _csv_field('say "hi", ok') == '"say ""hi"", ok"'
+
+
+# --- Against Postgres ---
+
+
+@pytest.fixture
+def assessment(pg_engine):
+    assessment_id = str(uuid.uuid4())
+    with pg_engine.begin() as connection:
+        connection.execute(text("INSERT INTO students (id, first_name) VALUES (:a, 'Alice'), (:b, 'Bob')"),
+                           {'a': ALICE, 'b': BOB})
+        connection.execute(text("INSERT INTO assessments (id, title) VALUES (:id, 'Quiz')"), {'id': assessment_id})
+    return assessment_id
+
+
+def _grades(engine, assessment_id):
+    with engine.connect() as connection:
+        return connection.execute(text("""
+            SELECT student_id::text, score::float, feedback FROM student_grades
+            WHERE assessment_id = :id ORDER BY student_id
+        """), {'id': assessment_id}).all()
+
+
+@requires_postgres
+@pytest.mark.parametrize('copy_threshold', [2000, 1], ids=['unnest', 'copy'])
+def test_upsert_inserts_then_updates(pg_engine, assessment, monkeypatch, copy_threshold):
+    monkeypatch.setattr(database_client, 'GRADE_COPY_THRESHOLD', copy_threshold)
+    unknown = str(uuid.uuid4())
+    result = database_client.bulk_upsert_grades(assessment, [
+        {'student_id': ALICE, 'score': 80, 'feedback': 'ok, "good"'},
+        {'student_id': unknown, 'score': 70},
+        {'student_id': BOB, 'score': 'nan'},
+    ])
+    assert result == {'inserted': 1, 'updated': 0, 'rejected': 2}
+
+    result = database_client.bulk_upsert_grades(assessment, [
+        {'student_id': ALICE, 'score': 90}, {'student_id': BOB, 'score': ''}])
+    assert result == {'inserted': 1, 'updated': 1, 'rejected': 0}
+    assert _grades(pg_engine, assessment) == [(ALICE, 90.0, None), (BOB, None, None)]
+
+
+@requires_postgres
+def test_copy_import_can_run_twice_in_one_request(pg_engine, assessment, flask_app, monkeypatch):
+    monkeypatch.setattr(database_client, 'GRADE_COPY_THRESHOLD', 1)
+    with flask_app.test_request_context(method='POST'):
+        for score in (70, 75):
+            result = database_client.bulk_upsert_grades(assessment, [{'student_id': ALICE, 'score': score}])
+            assert result is not None
+        assert flask_app.process_response(flask_app.response_class()).status_code == 200
+
+    assert _grades(pg_engine, assessment) == [(ALICE, 75.0, None)]
+
+
+@requires_postgres
+def test_unknown_assessment_is_not_counted_as_rejected_rows(pg_engine, assessment):
+    assert database_client.bulk_upsert_grades(str(uuid.uuid4()), [{'student_id': ALICE, 'score': 1}]) is False
+    assert database_client.bulk_upsert_grades(str(uuid.uuid4()), []) is False
+    assert database_client.bulk_upsert_grades(assessment, [{'student_id': 'x', 'score': 1}]) == {
+        'inserted': 0, 'updated': 0, 'rejected': 1}
+
+
+# --- Endpoint ---
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'assessment_id': 'not-a-uuid', 'grades': []}, 400),
+    ({'assessment_id': 7, 'grades': []}, 400),
+    ({'assessment_id': BOB, 'grades': {}}, 400),
+    ({'assessment_id': BOB, 'grades': []}, 404),
+])
+def test_bulk_endpoint_rejects_bad_or_unknown_assessments(admin_client, monkeypatch, body, status):
+    from api import index
+
+    monkeypatch.setattr(index, 'bulk_upsert_grades', lambda assessment_id, grades: False)
+    assert admin_client.post('/api/admin/grades/bulk', json=body).status_code == status
@@ -0,0 +1,64 @@
+"""Group document assembled in Postgres (database_client.get_group_document)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from conftest import requires_postgres
+
+pytestmark = requires_postgres
+
+
+@pytest.fixture
+def groups(pg_engine):
+    """ALPHA has a linked member, a free-text member, two submissions and feedback; EMPTY has nothing."""
+    ids = {name: str(uuid.uuid4()) for name in ('class', 'alpha', 'empty', 'alice')}
+    with pg_engine.begin() as connection:
+        connection.execute(text("INSERT INTO classes (id, course_code) VALUES (:class, 'CMSC 173')"), ids)
+        connection.execute(text("""
+            INSERT INTO groups (id, group_name, class_id, password_hash)
+            VALUES (:alpha, 'Alpha', :class, 'secret'), (:empty, 'Empty', NULL, 'secret')
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO students (id, first_name, last_name, email, campus_id, group_id)
+            VALUES (:alice, 'Alice', 'Reyes', 'alice@example.edu', '2021-00001', :alpha)
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO group_members (group_id, member_name, student_id, created_at)
+            VALUES (:alpha, 'stale name', :alice, now() - interval '1 day'), (:alpha, 'Guest', NULL, now())
+        """), ids)
+        connection.execute(text("""
+            INSERT INTO group_submissions (group_id, stage_number, file_path)
+            VALUES (:alpha, 3, 'late.pdf'), (:alpha, 1, 'first.pdf')
+        """), ids)
+        connection.execute(text("INSERT INTO group_feedback (group_id, stage_number, feedback) VALUES (:alpha, 1, 'Good')"), ids)
+    return ids
+
+
+def test_document_nests_members_submissions_and_feedback(groups):
+    group = database_client.get_group_document(groups['alpha'])
+
+    assert group['group_name'] == 'Alpha'
+    assert group['class_course_code'] == 'CMSC 173'
+    assert 'password_hash' not in group
+
+    linked, guest = group['members']
+    assert (linked['member_name'], linked['email'], linked['campus_id']) == ('Alice Reyes', 'alice@example.edu', '2021-00001')
+    assert linked['student_id'] == groups['alice']
+    assert guest['member_name'] == 'Guest' and 'email' not in guest
+
+    assert [(s['stage_number'], s['file_path']) for s in group['submissions']] == [(1, 'first.pdf'), (3, 'late.pdf')]
+    assert isinstance(group['submissions'][0]['submitted_at'], str)
+    assert list(group['feedback']) == [1]
+    assert group['feedback'][1]['feedback'] == 'Good'
+
+
+def test_group_without_members_has_empty_collections(groups):
+    group = database_client.get_group_document(groups['empty'])
+    assert (group['members'], group['submissions'], group['feedback']) == ([], [], {})
+    assert group['class_course_code'] is None
+
+
+def test_unknown_group_is_none(groups):
+    assert database_client.get_group_document(str(uuid.uuid4())) is None
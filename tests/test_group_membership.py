@@ -0,0 +1,66 @@
+"""Bulk student assignment (database_client.assign_students_to_group)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from conftest import requires_postgres
+
+MISSING = 'cccccccc-cccc-cccc-cccc-cccccccccccc'
+
+
+@pytest.fixture
+def roster(pg_engine):
+    """ALICE is ungrouped; BOB already belongs to another group."""
+    ids = {name: str(uuid.uuid4()) for name in ('group', 'other', 'alice', 'bob')}
+    with pg_engine.begin() as connection:
+        connection.execute(text("INSERT INTO groups (id, group_name) VALUES (:group, 'Alpha'), (:other, 'Beta')"), ids)
+        connection.execute(text("""
+            INSERT INTO students (id, first_name, last_name, group_id)
+            VALUES (:alice, 'Alice', 'A', NULL), (:bob, 'Bob', 'B', :other)
+        """), ids)
+    return ids
+
+
+def _members(engine, group_id):
+    with engine.connect() as connection:
+        return connection.execute(text(
+            "SELECT member_name, student_id::text FROM group_members WHERE group_id = :id"), {'id': group_id}).all()
+
+
+@requires_postgres
+def test_outcomes_in_request_order(pg_engine, roster):
+    outcomes = database_client.assign_students_to_group(roster['group'], [roster['bob'], roster['alice'], MISSING])
+    assert [(o['student_id'], o['status']) for o in outcomes] == [
+        (roster['bob'], 'already_grouped'), (roster['alice'], 'assigned'), (MISSING, 'not_found')]
+    assert str(outcomes[0]['group_id']) == roster['other']
+    assert _members(pg_engine, roster['group']) == [('Alice A', roster['alice'])]
+
+
+@requires_postgres
+def test_a_student_is_claimed_only_once(pg_engine, roster):
+    first = database_client.assign_students_to_group(roster['group'], [roster['alice']])
+    second = database_client.assign_students_to_group(roster['other'], [roster['alice']])
+    assert [o['status'] for o in first + second] == ['assigned', 'already_grouped']
+    assert _members(pg_engine, roster['other']) == []
+
+
+@requires_postgres
+def test_malformed_ids_are_not_found_and_do_not_fail_the_rest(pg_engine, roster):
+    outcomes = database_client.assign_students_to_group(roster['group'], ['not-a-uuid', roster['alice'], "1'; DROP"])
+    assert [(o['student_id'], o['status']) for o in outcomes] == [
+        ('not-a-uuid', 'not_found'), (roster['alice'], 'assigned'), ("1'; drop", 'not_found')]
+
+
+@requires_postgres
+def test_ids_are_normalized_and_deduplicated(pg_engine, roster):
+    alice = roster['alice']
+    outcomes = database_client.assign_students_to_group(roster['group'], [alice.upper(), alice, '', None])
+    assert [(o['student_id'], o['status']) for o in outcomes] == [(alice, 'assigned')]
+    assert len(_members(pg_engine, roster['group'])) == 1
+
+
+def test_only_malformed_ids_skip_the_database(no_database):
+    outcomes = database_client.assign_students_to_group(MISSING, ['nope', ''])
+    assert [(o['student_id'], o['status']) for o in outcomes] == [('nope', 'not_found')]
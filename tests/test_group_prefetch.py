@@ -0,0 +1,57 @@
+"""Admin group view prefetches the next group's document (api.index._group_prefetch)."""
+import uuid
+
+import pytest
+
+from api import index
+
+FIRST = uuid.UUID('11111111-1111-1111-1111-111111111111')
+SECOND = uuid.UUID('22222222-2222-2222-2222-222222222222')
+
+
+class _InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def groups(monkeypatch):
+    fetched = []
+
+    def get_group_document(group_id):
+        fetched.append(str(group_id))
+        return {'id': str(group_id), 'group_name': f"Group {str(group_id)[0]}", 'submissions': [], 'members': [],
+                'class_course_code': None}
+
+    def get_group_neighbors(group_id):
+        # The database hands back UUID objects, not strings
+        return {'prev_id': None, 'next_id': SECOND if str(group_id) == str(FIRST) else None}
+
+    monkeypatch.setattr(index, 'get_group_document', get_group_document)
+    monkeypatch.setattr(index, 'get_group_neighbors', get_group_neighbors)
+    monkeypatch.setattr(index, 'get_submission_scores', lambda ids: [])
+    monkeypatch.setattr(index, '_group_prefetch_executor', _InlineExecutor())
+    monkeypatch.setattr(index, '_group_prefetch', index.TTLCache(ttl=30, max_entries=32))
+    return fetched
+
+
+def test_next_group_is_served_from_prefetch(admin_client, groups):
+    assert admin_client.get(f'/admin/group/{FIRST}').status_code == 200
+    assert groups == [str(FIRST), str(SECOND)]
+
+    # Navigating to the prefetched group reads nothing more for its document
+    assert admin_client.get(f'/admin/group/{SECOND}').status_code == 200
+    assert groups == [str(FIRST), str(SECOND)]
+
+
+def test_prefetch_entry_is_consumed_once(admin_client, groups):
+    admin_client.get(f'/admin/group/{FIRST}')
+    admin_client.get(f'/admin/group/{SECOND}')
+    admin_client.get(f'/admin/group/{SECOND}')
+    assert groups == [str(FIRST), str(SECOND), str(SECOND)]
+
+
+def test_uppercase_url_hits_prefetch(admin_client, groups):
+    admin_client.get(f'/admin/group/{FIRST}')
+    admin_client.get(f'/admin/group/{str(SECOND).upper()}')
+    assert groups == [str(FIRST), str(SECOND)]
@@ -0,0 +1,81 @@
+"""Course module registry (api.utils.module_registry)."""
+import os
+
+import pytest
+
+from api.utils.module_registry import ModuleRegistry, module_registry
+
+COURSES = {
+    'demo': {'modules': {
+        1: {'title': 'Intro', 'category': 'basics', 'filename': 'intro.html'},
+        2: {'title': 'Missing', 'category': 'basics', 'filename': 'missing.html'},
+        3: {'title': 'Trees', 'category': 'advanced', 'filename': 'trees.html'},
+        'lab': {'title': 'Lab', 'filename': 'lab.html'},
+    }},
+}
+CATEGORIES = {'advanced': {'title': 'Advanced', 'order': 2}, 'basics': {'title': 'Basics', 'order': 1}}
+
+
+@pytest.fixture
+def templates(tmp_path):
+    course_dir = tmp_path / 'demo'
+    course_dir.mkdir()
+    for name in ('intro.html', 'trees.html', 'lab.html'):
+        (course_dir / name).write_text('<p></p>')
+    return tmp_path
+
+
+def make_registry(templates, check_interval=3600):
+    return ModuleRegistry(COURSES, CATEGORIES, str(templates), check_interval=check_interval)
+
+
+def test_only_modules_on_disk_are_routable(templates):
+    course = make_registry(templates).course('demo')
+    assert list(course.modules) == [1, 3, 'lab']
+    assert 2 not in course
+    intro = course.get(1)
+    assert intro.template == 'courses/demo/intro.html'
+    assert intro.path == os.path.join(str(templates), 'demo', 'intro.html')
+
+
+def test_prev_next_skip_missing_modules(templates):
+    course = make_registry(templates).course('demo')
+    assert (course.get(1).prev, course.get(1).next) == (None, 3)
+    assert (course.get(3).prev, course.get(3).next) == (1, 'lab')
+    assert course.get('lab').next is None
+
+
+def test_groups_follow_category_order_and_list_unavailable_modules(templates):
+    groups = make_registry(templates).course('demo').groups
+    assert [group.category for group in groups] == ['basics', 'advanced']
+    assert [(m.number, m.available) for m in groups[0].modules] == [(1, True), (2, False)]
+
+
+def test_unknown_course(templates):
+    assert make_registry(templates).course('nope') is None
+
+
+def test_rebuilds_when_a_template_directory_changes(templates):
+    registry = make_registry(templates, check_interval=0)
+    assert 2 not in registry.course('demo')
+    course_dir = templates / 'demo'
+    (course_dir / 'missing.html').write_text('<p></p>')
+    # Make the change visible even on filesystems with coarse mtimes
+    stat = os.stat(course_dir)
+    os.utime(course_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    course = registry.course('demo')
+    assert 2 in course
+    assert (course.get(1).next, course.get(2).prev) == (2, 1)
+
+
+def test_directory_changes_are_checked_at_most_every_interval(templates):
+    registry = make_registry(templates)
+    (templates / 'demo' / 'missing.html').write_text('<p></p>')
+    assert 2 not in registry.course('demo')
+
+
+def test_repo_templates_resolve_for_every_course():
+    for course_id in module_registry.courses:
+        course = module_registry.course(course_id)
+        for entry in course.modules.values():
+            assert os.path.isfile(entry.path)
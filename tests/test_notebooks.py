@@ -0,0 +1,313 @@
+"""Notebook cache, cell index and paged viewer (api.utils.notebooks)."""
+import base64
+import hashlib
+import json
+import os
+import re
+
+import pytest
+
+from api import index
+from api.utils import notebooks
+from api.utils.notebooks import (
+    CellIndexCache, FragmentStore, ImageStore, NotebookCache, _scan_cell_spans, render_notebook_html
+)
+
+PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+
+
+def make_notebook(n_cells=45):
+    cells = []
+    for i in range(n_cells):
+        if i % 3 == 0:
+            cells.append({'cell_type': 'markdown', 'metadata': {},
+                          'source': [f'# Part {i} with "quotes", {{braces}} and [brackets] ñ\n']})
+        else:
+            outputs = [{'output_type': 'stream', 'name': 'stdout', 'text': [f'cell {i} ]}}"\\\n']}]
+            if i % 3 == 1:
+                outputs.append({'output_type': 'display_data', 'metadata': {},
+                                'data': {'image/png': base64.b64encode(PNG).decode(), 'text/plain': ['<Figure>']}})
+            cells.append({'cell_type': 'code', 'execution_count': i, 'metadata': {'tags': ['x']},
+                          'source': [f'x = {{"k": [{i}]}}\n', 'print("]}")'], 'outputs': outputs})
+    return {'metadata': {'cells': 'not the cells'}, 'cells': cells, 'nbformat': 4, 'nbformat_minor': 5}
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(notebooks.fragment_store, 'directory', str(tmp_path / 'fragments'))
+    monkeypatch.setattr(notebooks.image_store, 'directory', str(tmp_path / 'images' / 'public'))
+    monkeypatch.setattr(notebooks.admin_image_store, 'directory', str(tmp_path / 'images' / 'admin'))
+    return tmp_path
+
+
+@pytest.fixture
+def midterm(tmp_path, stores, monkeypatch):
+    data_dir = tmp_path / 'midterm'
+    student_dir = data_dir / 'Jane Doe (123)'
+    student_dir.mkdir(parents=True)
+    notebook = make_notebook()
+    with open(student_dir / 'big.ipynb', 'w', encoding='utf-8') as f:
+        json.dump(notebook, f, indent=1, ensure_ascii=False)
+    monkeypatch.setattr(index, 'CMSC173_DATA_DIR', str(data_dir))
+    monkeypatch.setattr(index, 'cell_index_cache', CellIndexCache(store=FragmentStore(str(tmp_path / 'idx'))))
+    return notebook
+
+
+# --- Cell index ---
+
+@pytest.mark.parametrize('indent', [None, 1])
+def test_scan_finds_every_cell_span(indent):
+    notebook = make_notebook()
+    raw = json.dumps(notebook, indent=indent, ensure_ascii=False).encode('utf-8')
+    spans = _scan_cell_spans(raw)
+    assert [json.loads(raw[start:end]) for start, end in spans] == notebook['cells']
+
+
+def test_scan_rejects_non_notebooks():
+    with pytest.raises(ValueError):
+        _scan_cell_spans(b'{"metadata": {}, "cells": [{"cell_type": "code"')
+    with pytest.raises(ValueError):
+        _scan_cell_spans(b'[1, 2, 3]')
+
+
+def test_cell_index_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / 'nb.ipynb'
+    path.write_text(json.dumps(make_notebook(6)))
+    cache = CellIndexCache(store=FragmentStore(str(tmp_path / 'idx')))
+
+    first = cache.get(str(path))
+    assert len(first) == 6
+    assert cache.get(str(path)) is first
+    assert first.read_cells(4, 6) == make_notebook(6)['cells'][4:6]
+
+    path.write_text(json.dumps(make_notebook(9)))
+    os.utime(path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    assert len(cache.get(str(path))) == 9
+
+
+def test_cell_index_is_loaded_from_the_store_by_another_worker(tmp_path, monkeypatch):
+    path = tmp_path / 'nb.ipynb'
+    path.write_text(json.dumps(make_notebook(6)))
+    store = FragmentStore(str(tmp_path / 'idx'))
+    spans = CellIndexCache(store=store).get(str(path)).spans
+
+    monkeypatch.setattr(CellIndexCache, '_scan', staticmethod(lambda p: pytest.fail("scanned twice")))
+    assert CellIndexCache(store=store).get(str(path)).spans == spans
+
+
+def test_cell_index_of_missing_file_or_directory_is_none(tmp_path):
+    cache = CellIndexCache(store=FragmentStore(str(tmp_path / 'idx')))
+    assert cache.get(str(tmp_path / 'missing.ipynb')) is None
+    assert cache.get(str(tmp_path)) is None
+
+
+def test_notebook_cache_revalidates_by_mtime(tmp_path):
+    path = tmp_path / 'nb.ipynb'
+    path.write_text(json.dumps(make_notebook(3)))
+    cache = NotebookCache()
+    entry = cache.get(str(path))
+    assert cache.get(str(path)) is entry
+    assert cache.stats()['hits'] == 1
+
+    path.write_text(json.dumps(make_notebook(4)))
+    os.utime(path, ns=(entry.mtime_ns + 10**9, entry.mtime_ns + 10**9))
+    assert len(cache.load(str(path))['cells']) == 4
+    assert cache.get(str(tmp_path / 'missing.ipynb')) is None
+
+
+def test_notebook_cache_keeps_only_the_parsed_document_within_budget(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f'nb{i}.ipynb')
+        paths[-1].write_text(json.dumps(make_notebook(3)))
+    size = os.path.getsize(paths[0])
+    cache = NotebookCache(max_bytes=2 * size * notebooks.PARSED_SIZE_FACTOR)
+    entries = [cache.get(str(path)) for path in paths]
+    assert not hasattr(entries[0], 'json')
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['bytes'] == 2 * entries[0].cost == 2 * size * notebooks.PARSED_SIZE_FACTOR
+    # The least recently used notebook was evicted
+    assert cache.get(str(paths[0])) is not entries[0]
+
+
+# --- Paged viewer API ---
+
+CELLS_URL = '/api/admin/cmsc173-midterm/notebook-cells/Jane Doe (123)/big.ipynb'
+
+
+def test_cells_api_pages_through_the_notebook(admin_client, midterm):
+    page = admin_client.get(CELLS_URL, query_string={'offset': 0}).get_json()
+    assert (page['offset'], page['next_offset'], page['total']) == (0, 20, 45)
+    assert 'id="cell-0"' in page['html'] and 'id="cell-19"' in page['html']
+    assert 'id="cell-20"' not in page['html']
+
+    last = admin_client.get(CELLS_URL, query_string={'offset': 40, 'limit': 20}).get_json()
+    assert last['next_offset'] is None
+    assert 'id="cell-44"' in last['html']
+
+
+@pytest.mark.parametrize('args', [{'offset': -1}, {'limit': 0}, {'limit': 101}, {'offset': 'x'}])
+def test_cells_api_rejects_bad_paging(admin_client, midterm, args):
+    assert admin_client.get(CELLS_URL, query_string=args).status_code == 400
+
+
+def test_cells_api_paths(admin_client, midterm):
+    base = '/api/admin/cmsc173-midterm/notebook-cells/'
+    assert admin_client.get(base + 'Jane Doe (123)/missing.ipynb').status_code == 404
+    assert admin_client.get(base + 'Jane Doe (123)').status_code == 404
+    assert admin_client.get(base + '../outside.ipynb').status_code == 400
+
+
+@pytest.mark.parametrize('query', ['', '?lazy=1'])
+def test_unreadable_notebook_is_a_409_not_a_crash(admin_client, midterm, tmp_path, query):
+    (tmp_path / 'midterm' / 'Jane Doe (123)' / 'broken.ipynb').write_text('{"cells": [')
+    page = '/admin_cmsc173_midterm/notebook/Jane Doe (123)/broken.ipynb'
+    assert admin_client.get(page + query).status_code == 409
+    assert admin_client.get('/api/admin/cmsc173-midterm/notebook-cells/Jane Doe (123)/broken.ipynb').status_code == 409
+
+
+def test_cells_api_requires_admin(portal_app, midterm):
+    assert portal_app.test_client().get(CELLS_URL).status_code == 401
+
+
+def test_large_notebook_opens_in_paged_mode(admin_client, midterm, monkeypatch):
+    monkeypatch.setattr(index, 'NOTEBOOK_LAZY_BYTES', 1)
+    html = admin_client.get('/admin_cmsc173_midterm/notebook/Jane Doe (123)/big.ipynb').get_data(as_text=True)
+    assert 'id="notebook-lazy-status"' in html
+    assert 'id="cell-19"' in html and 'id="cell-20"' not in html
+
+
+def test_small_notebook_renders_whole(admin_client, midterm):
+    html = admin_client.get('/admin_cmsc173_midterm/notebook/Jane Doe (123)/big.ipynb').get_data(as_text=True)
+    assert 'id="notebook-lazy-status"' not in html
+    assert 'id="cell-44"' in html
+
+
+# --- Pre-rendered cell HTML ---
+
+
+def _fragments(stores):
+    return [name for _, _, names in os.walk(stores / 'fragments') for name in names]
+
+
+def test_rendered_cells_are_reused_until_the_notebook_changes(portal_app, stores, tmp_path, monkeypatch):
+    renders = []
+    get_template_attribute = notebooks.get_template_attribute
+    monkeypatch.setattr(notebooks, 'get_template_attribute',
+                        lambda *args: renders.append(args) or get_template_attribute(*args))
+    path = tmp_path / 'lecture.ipynb'
+    path.write_text(json.dumps(make_notebook(6)))
+    with portal_app.test_request_context():
+        first = str(render_notebook_html(NotebookCache().get(str(path))))
+        # A fresh cache (e.g. another worker) still finds the stored fragment
+        assert str(render_notebook_html(NotebookCache().get(str(path)))) == first
+        assert len(renders) == 1
+
+        path.write_text(json.dumps(make_notebook(7)))
+        changed = str(render_notebook_html(NotebookCache().get(str(path))))
+    assert changed != first
+    assert len(renders) == 2
+    assert len(_fragments(stores)) == 2
+
+
+def test_markup_variants_render_separately(portal_app, stores, tmp_path):
+    path = tmp_path / 'lecture.ipynb'
+    path.write_text(json.dumps(make_notebook(3)))
+    entry = NotebookCache().get(str(path))
+    with portal_app.test_request_context():
+        viewer = str(render_notebook_html(entry))
+        answer_key = str(render_notebook_html(entry, 'nb-', 'ak-cell-'))
+    assert 'id="cell-0"' in viewer and 'id="ak-cell-0"' in answer_key
+    assert len(_fragments(stores)) == 2
+
+
+def test_code_is_highlighted_on_the_server(portal_app, stores, tmp_path):
+    if notebooks.pygments_highlight is None:
+        pytest.skip('Pygments is not installed')
+    path = tmp_path / 'lecture.ipynb'
+    path.write_text(json.dumps(make_notebook(3)))
+    with portal_app.test_request_context():
+        html = str(render_notebook_html(NotebookCache().get(str(path))))
+    assert '<style>.nb-pygments .' in html
+    assert 'class="language-python hljs nb-pygments" data-highlighted="yes"' in html
+
+
+def test_long_outputs_are_truncated(monkeypatch):
+    monkeypatch.setattr(notebooks, 'NOTEBOOK_OUTPUT_MAX_LINES', 3)
+    monkeypatch.setattr(notebooks, 'NOTEBOOK_OUTPUT_MAX_CHARS', 10)
+    assert notebooks._truncate_output('a\nb\n') == {'text': 'a\nb\n', 'omitted': 0}
+    assert notebooks._truncate_output('1\n2\n3\n4\n5\n') == {'text': '1\n2\n3\n', 'omitted': 2}
+    assert notebooks._truncate_output('x' * 50) == {'text': 'x' * 10, 'omitted': 1}
+
+    view = notebooks._cell_view({'cell_type': 'code', 'source': '', 'outputs': [
+        {'output_type': 'stream', 'text': ['1\n', '2\n', '3\n', '4\n']}]})
+    assert view['outputs'] == [{'text': '1\n2\n3\n', 'omitted': 1}]
+
+
+# --- Extracted images ---
+
+
+PNG_DIGEST = hashlib.sha256(PNG).hexdigest()
+
+
+def _image_urls(html):
+    return re.findall(r'<img class="(?:nb-)?cell-output-image" src="([^"]+)"', html)
+
+
+def test_image_store_writes_each_image_once(tmp_path):
+    store = ImageStore(str(tmp_path))
+    assert store.put(PNG, 'image/png') == PNG_DIGEST
+    path, mime = store.find(PNG_DIGEST)
+    mtime = os.stat(path).st_mtime_ns
+    assert store.put(PNG, 'image/png') == PNG_DIGEST
+    assert os.stat(path).st_mtime_ns == mtime
+    assert mime == 'image/png'
+    assert store.find('0' * 64) is None
+    assert store.find('../' + PNG_DIGEST[3:]) is None
+
+
+def test_public_notebook_images_are_publicly_cacheable(portal_app, stores, tmp_path):
+    path = tmp_path / 'exam.ipynb'
+    path.write_text(json.dumps(make_notebook(3)))
+    with portal_app.test_request_context():
+        html = str(render_notebook_html(NotebookCache().get(str(path)), private=False))
+    assert _image_urls(html) == [f'/nbimg/{PNG_DIGEST}']
+    assert 'base64' not in html
+
+    response = portal_app.test_client().get(f'/nbimg/{PNG_DIGEST}')
+    assert response.status_code == 200
+    assert response.data == PNG
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+
+def test_admin_notebook_images_need_admin_and_stay_private(portal_app, admin_client, midterm, monkeypatch):
+    monkeypatch.setattr(index, 'NOTEBOOK_LAZY_BYTES', 1)
+    for page in ('/admin_cmsc173_midterm/notebook/Jane Doe (123)/big.ipynb', CELLS_URL):
+        response = admin_client.get(page)
+        html = response.get_json()['html'] if response.is_json else response.get_data(as_text=True)
+        assert set(_image_urls(html)) == {f'/admin/nbimg/{PNG_DIGEST}'}
+
+    response = admin_client.get(f'/admin/nbimg/{PNG_DIGEST}')
+    assert response.status_code == 200
+    assert response.data == PNG
+    assert response.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+
+    anonymous = portal_app.test_client()
+    assert anonymous.get(f'/admin/nbimg/{PNG_DIGEST}').status_code == 401
+    # Knowing the digest is not enough to fetch it from the public route
+    assert anonymous.get(f'/nbimg/{PNG_DIGEST}').status_code == 404
+
+
+def test_full_render_of_admin_notebook_uses_admin_images(admin_client, midterm):
+    html = admin_client.get('/admin_cmsc173_midterm/notebook/Jane Doe (123)/big.ipynb').get_data(as_text=True)
+    assert set(_image_urls(html)) == {f'/admin/nbimg/{PNG_DIGEST}'}
+
+
+def test_course_page_does_not_load_the_exam_notebook(portal_app, monkeypatch):
+    def unexpected(path):
+        raise AssertionError(f'loaded {path}')
+
+    monkeypatch.setattr(index.notebook_cache, 'get', unexpected)
+    monkeypatch.setattr(index.notebook_cache, 'load', unexpected)
+    assert portal_app.test_client().get('/course/cmsc178ip').status_code == 200
@@ -0,0 +1,58 @@
+"""Keyset cursors (api.utils.pagination) and their validation at the API layer."""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from api import index
+from api.utils.pagination import (
+    NAME_ID_CURSOR, TIME_ID_CURSOR, decode_cursor, encode_cursor, validate_pagination
+)
+
+ROW_ID = uuid.UUID('11111111-1111-1111-1111-111111111111')
+CREATED = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([CREATED, ROW_ID])
+    assert decode_cursor(cursor, 2) == [CREATED.isoformat(), str(ROW_ID)]
+
+
+def test_cursor_without_limit_gets_default_page():
+    cursor = encode_cursor([CREATED, ROW_ID])
+    assert validate_pagination({'cursor': cursor}, TIME_ID_CURSOR) == (True, "", 50, cursor)
+
+
+def test_no_pagination_args_means_full_listing():
+    assert validate_pagination({}, TIME_ID_CURSOR) == (True, "", None, None)
+
+
+@pytest.mark.parametrize('limit', ['0', '501', 'ten'])
+def test_bad_limit(limit):
+    assert validate_pagination({'limit': limit})[0] is False
+
+
+@pytest.mark.parametrize('values, shape', [
+    ([CREATED], TIME_ID_CURSOR),                       # too short
+    ([CREATED, ROW_ID, 'x'], TIME_ID_CURSOR),          # too long
+    (['yesterday', ROW_ID], TIME_ID_CURSOR),           # not a timestamp
+    ([CREATED, 'not-a-uuid'], TIME_ID_CURSOR),         # not a uuid
+    ([CREATED, 42], TIME_ID_CURSOR),                   # wrong type
+    (['Doe', 7, ROW_ID], NAME_ID_CURSOR),              # name must be text
+])
+def test_wrong_shape_cursor_is_rejected(values, shape):
+    assert validate_pagination({'limit': '10', 'cursor': encode_cursor(values)}, shape) == \
+        (False, "Invalid cursor", None, None)
+
+
+def test_name_cursor_allows_null_names():
+    cursor = encode_cursor([None, 'Ann', ROW_ID])
+    assert validate_pagination({'limit': '10', 'cursor': cursor}, NAME_ID_CURSOR)[0] is True
+
+
+@pytest.mark.parametrize('cursor', ['%%%', 'bm90IGpzb24', encode_cursor([CREATED])])
+def test_groups_api_rejects_bad_cursor_with_400(portal_app, monkeypatch, cursor):
+    monkeypatch.setattr(index, 'get_groups', lambda **kwargs: pytest.fail("query must not run"))
+    response = portal_app.test_client().get('/api/groups', query_string={'limit': 10, 'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
@@ -0,0 +1,159 @@
+"""Connection budget split and idle-aware liveness checks for the pool."""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from database import (
+    PoolStats, build_engine_options, compute_pool_limits, connections_per_worker, install_idle_liveness
+)
+
+
+def test_threaded_workers_get_a_connection_per_thread_within_budget():
+    # 4 workers x 8 threads: 10 connections each, 8 of them persistent
+    assert compute_pool_limits(40, 4, threads=8) == (8, 2)
+
+
+def test_pool_never_exceeds_worker_share():
+    for workers in (1, 3, 17, 40, 80):
+        for threads in (1, 8, 32):
+            pool_size, max_overflow = compute_pool_limits(40, workers, threads)
+            assert pool_size >= 1
+            assert pool_size + max_overflow <= max(1, 40 // workers)
+
+
+def test_single_threaded_worker_keeps_one_persistent_connection():
+    assert compute_pool_limits(40, 4) == (1, 9)
+
+
+def test_engine_options_follow_threads(caplog):
+    options = build_engine_options(mode='session', budget=40, workers=4, threads=8)
+    assert (options['pool_size'], options['max_overflow']) == (8, 2)
+    assert 'requests will wait' not in caplog.text
+
+    build_engine_options(mode='session', budget=40, workers=17, threads=8)
+    assert 'requests will wait' in caplog.text
+
+
+def test_transaction_mode_has_no_client_pool():
+    from sqlalchemy.pool import NullPool
+    assert build_engine_options(mode='transaction')['poolclass'] is NullPool
+
+
+@pytest.mark.parametrize('workers, threads, limits', [
+    (1, 1, (1, 39)),     # one sync worker may use the whole budget
+    (3, 1, (1, 12)),     # the remainder of an uneven split is left unused
+    (5, 8, (8, 0)),      # a share of exactly one connection per thread
+    (8, 8, (5, 0)),      # fewer connections than threads: all of them persistent
+    (80, 8, (1, 0)),     # more workers than budget: still one each
+])
+def test_budget_split_across_workers_and_threads(workers, threads, limits):
+    assert compute_pool_limits(40, workers, threads) == limits
+
+
+def test_engine_options_read_workers_and_threads_from_gunicorn(monkeypatch):
+    monkeypatch.setenv('GUNICORN_WORKERS', '4')
+    monkeypatch.setenv('WEB_CONCURRENCY', '10')
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    options = build_engine_options(mode='session', budget=40)
+    assert (options['pool_size'], options['max_overflow']) == (8, 2)
+
+    monkeypatch.delenv('GUNICORN_WORKERS')
+    monkeypatch.delenv('GUNICORN_THREADS')
+    options = build_engine_options(mode='session', budget=40)
+    assert (options['pool_size'], options['max_overflow']) == (1, 3)
+
+
+def test_transaction_mode_ignores_the_budget(caplog):
+    options = build_engine_options(mode='transaction', budget=1, workers=17, threads=8)
+    assert not {'pool_size', 'max_overflow', 'pool_timeout'} & set(options)
+    assert caplog.text == ''
+
+
+def test_budget_below_worker_count_warns(caplog):
+    options = build_engine_options(mode='session', budget=2, workers=4, threads=1)
+    assert (options['pool_size'], options['max_overflow']) == (1, 0)
+    assert 'below the worker count 4' in caplog.text
+
+
+def test_instrumented_pool_records_waits_and_timeouts(tmp_path, monkeypatch):
+    import database
+    from sqlalchemy.exc import TimeoutError
+
+    monkeypatch.setattr(database, 'pool_stats', PoolStats())
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=database.InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with engine.connect():
+        with pytest.raises(TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    snapshot = database.pool_stats.snapshot()
+    assert (snapshot['acquire_count'], snapshot['timeouts']) == (2, 1)
+    assert snapshot['acquire_max_ms'] >= 50
+
+
+def test_default_gunicorn_workers_fit_the_budget(monkeypatch):
+    import importlib.util
+    import os
+
+    monkeypatch.setenv('DB_CONNECTION_BUDGET', '40')
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+    monkeypatch.delenv('DB_POOL_MODE', raising=False)
+    monkeypatch.setattr('multiprocessing.cpu_count', lambda: 8)
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'deploy', 'gunicorn_config.py')
+    spec = importlib.util.spec_from_file_location('gunicorn_config', path)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+
+    assert config.workers * connections_per_worker(config.threads) <= 40
+    assert 'GUNICORN_THREADS=8' in config.raw_env
+
+
+@pytest.fixture
+def idle_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    engine.pings = []
+    engine.dialect.do_ping = lambda dbapi_connection: engine.pings.append(dbapi_connection) or True
+    yield engine
+    engine.dispose()
+
+
+def checkout(engine):
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        return conn.connection.dbapi_connection
+
+
+def test_recently_used_connections_skip_the_ping(idle_engine):
+    stats = PoolStats()
+    install_idle_liveness(idle_engine, idle_seconds=60, stats=stats)
+    for _ in range(5):
+        checkout(idle_engine)
+    assert idle_engine.pings == []
+    assert stats.pings_skipped == 5
+
+
+def test_idle_connections_are_pinged(idle_engine):
+    stats = PoolStats()
+    install_idle_liveness(idle_engine, idle_seconds=0, stats=stats)
+    checkout(idle_engine)
+    checkout(idle_engine)
+    assert len(idle_engine.pings) == 2
+    assert (stats.pings, stats.stale_connections) == (2, 0)
+
+
+def test_stale_connection_is_replaced_transparently(idle_engine):
+    stats = PoolStats()
+    install_idle_liveness(idle_engine, idle_seconds=0, stats=stats)
+    first = checkout(idle_engine)
+
+    def dead_once(dbapi_connection):
+        idle_engine.dialect.do_ping = lambda conn: True
+        raise sqlite3.OperationalError('server closed the connection unexpectedly')
+
+    idle_engine.dialect.do_ping = dead_once
+    assert checkout(idle_engine) is not first
+    assert stats.stale_connections == 1
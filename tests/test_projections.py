@@ -0,0 +1,42 @@
+"""Column projections for read helpers (api.utils.database_client.resolve_columns)."""
+import pytest
+
+from api.utils.database_client import PROJECTIONS, _jsonb_object, _select_list, resolve_columns
+
+
+def test_full_selects_every_column():
+    assert resolve_columns('students') is None
+    assert resolve_columns('students', None) is None
+    assert _select_list('students', 'full', alias='s') == 's.*'
+    assert _jsonb_object('students', 'full', 's') == 'to_jsonb(s)'
+
+
+def test_named_projection_leaves_out_large_columns():
+    summary = resolve_columns('group_submissions', 'summary')
+    assert summary == PROJECTIONS['group_submissions']['summary']
+    assert 'content' not in summary
+    assert 'password_hash' not in resolve_columns('groups', 'summary')
+
+
+def test_required_columns_are_appended_once():
+    assert resolve_columns('groups', ['group_name'], required=('created_at', 'id', 'group_name')) \
+        == ('group_name', 'created_at', 'id')
+
+
+def test_select_list_and_jsonb_object():
+    assert _select_list('students', ['id', 'last_name'], alias='s') == 's.id, s.last_name'
+    assert _select_list('students', ['id']) == 'id'
+    assert _jsonb_object('students', ['id', 'last_name'], 's') \
+        == "jsonb_build_object('id', s.id, 'last_name', s.last_name)"
+
+
+@pytest.mark.parametrize('table, columns', [
+    ('students', 'tiny'),
+    ('resources', 'summary'),
+    ('students', []),
+    ('students', ['id', 'name; DROP TABLE students']),
+    ('students', ['Id']),
+])
+def test_unknown_or_unsafe_projections_are_rejected(table, columns):
+    with pytest.raises(ValueError):
+        resolve_columns(table, columns)
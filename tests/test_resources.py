@@ -0,0 +1,100 @@
+"""Course resource reordering (database_client.reorder_resources and its endpoint)."""
+import uuid
+
+import pytest
+from sqlalchemy import event, text
+
+from api.utils import database_client
+from conftest import requires_postgres
+
+
+@pytest.fixture
+def resources(pg_engine):
+    """Three cmsc173 resources in display order, plus one of another course."""
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+    with pg_engine.begin() as connection:
+        for i, resource_id in enumerate(ids):
+            connection.execute(text("""
+                INSERT INTO course_resources (id, course_code, title, display_order)
+                VALUES (:id, :course, :title, :order)
+            """), {'id': resource_id, 'course': 'cmsc173' if i < 3 else 'cmsc178ip', 'title': f'r{i}', 'order': i})
+    return ids
+
+
+def _order(engine, course_code='cmsc173'):
+    with engine.connect() as connection:
+        return connection.execute(text("""
+            SELECT id::text FROM course_resources WHERE course_code = :course ORDER BY display_order
+        """), {'course': course_code}).scalars().all()
+
+
+@requires_postgres
+def test_reorder_is_one_statement(pg_engine, resources):
+    statements = []
+    event.listen(pg_engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    new_order = [resources[2], resources[0], resources[1]]
+
+    assert database_client.reorder_resources('cmsc173', new_order) is True
+    assert len(statements) == 1
+    assert _order(pg_engine) == new_order
+
+
+@requires_postgres
+def test_foreign_id_rejects_the_whole_reorder(pg_engine, resources):
+    before = _order(pg_engine)
+    other_course = resources[3]
+    assert database_client.reorder_resources('cmsc173', [resources[2], other_course, resources[0]]) is False
+    assert database_client.reorder_resources('cmsc173', [resources[1], str(uuid.uuid4())]) is False
+    assert _order(pg_engine) == before
+    assert _order(pg_engine, 'cmsc178ip') == [other_course]
+
+
+@requires_postgres
+def test_failed_reorder_in_a_request_rolls_back(pg_engine, resources, flask_app):
+    before = _order(pg_engine)
+    with flask_app.test_request_context(method='PUT'):
+        assert database_client.reorder_resources('cmsc173', [resources[2], resources[3]]) is False
+        flask_app.process_response(flask_app.response_class())
+    assert _order(pg_engine) == before
+
+
+def test_empty_reorder_skips_the_database(no_database):
+    assert database_client.reorder_resources('cmsc173', []) is True
+
+
+# --- Endpoint ---
+
+A = 'aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa'
+
+
+class ReorderCalls(list):
+    """Stands in for reorder_resources, recording the ids it was called with."""
+    result = True
+
+    def __call__(self, course_id, ids):
+        self.append(ids)
+        return self.result
+
+
+@pytest.fixture
+def reorder_calls(monkeypatch):
+    from api import index
+
+    calls = ReorderCalls()
+    monkeypatch.setattr(index, 'reorder_resources', calls)
+    return calls
+
+
+@pytest.mark.parametrize('ordered_ids', [['not-a-uuid'], [A, 7], [A, A.upper()], [A, None]])
+def test_reorder_endpoint_rejects_bad_ids(admin_client, reorder_calls, ordered_ids):
+    response = admin_client.put('/api/admin/resources/reorder', json={'course_id': 'cmsc173', 'ordered_ids': ordered_ids})
+    assert response.status_code == 400
+    assert reorder_calls == []
+
+
+@pytest.mark.parametrize('result, status', [(True, 200), (False, 400), (None, 500)])
+def test_reorder_endpoint_maps_outcomes(admin_client, reorder_calls, result, status):
+    reorder_calls.result = result
+    response = admin_client.put('/api/admin/resources/reorder', json={'course_id': 'cmsc173', 'ordered_ids': [A.upper()]})
+    assert response.status_code == status
+    assert reorder_calls == [[A]]
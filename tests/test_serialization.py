@@ -0,0 +1,71 @@
+"""Compact rows and their direct JSON serialization (api.utils.serialization)."""
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask import Flask
+
+from database import CompactRows
+from api.utils.serialization import dumps_rows, requested_layout, rows_response
+
+ROWS = CompactRows(
+    ('id', 'name', 'score', 'ratio', 'active', 'submitted_at', 'due', 'meta', 'note'),
+    [
+        (uuid.UUID('11111111-1111-1111-1111-111111111111'), 'Ñoño "quoted"', Decimal('9.50'), 0.25, True,
+         datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc), date(2026, 3, 2), {'k': [1, 2]}, None),
+        (uuid.UUID('22222222-2222-2222-2222-222222222222'), 'B', Decimal('7'), 1.0, False,
+         datetime(2026, 3, 1, 13, 0, tzinfo=timezone.utc), date(2026, 3, 3), [], 'x'),
+    ],
+)
+
+app = Flask(__name__)
+
+
+def test_objects_layout_matches_jsonify_of_dicts():
+    with app.app_context():
+        assert json.loads(dumps_rows(ROWS)) == json.loads(app.json.dumps(ROWS.to_dicts()))
+
+
+def test_columns_layout_sends_each_name_once():
+    with app.app_context():
+        body = json.loads(dumps_rows(ROWS, 'columns'))
+    assert body['columns'] == list(ROWS.columns)
+    assert [row[1] for row in body['rows']] == ['Ñoño "quoted"', 'B']
+
+
+def test_empty_rows():
+    with app.app_context():
+        assert dumps_rows(CompactRows(('a',), [])) == '[]'
+        assert json.loads(dumps_rows(CompactRows(('a',), []), 'columns')) == {'columns': ['a'], 'rows': []}
+
+
+class _Streamed:
+    """StreamedRows stand-in: iterable once, records close()."""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self._rows = rows
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def close(self):
+        self.closed = True
+
+
+def test_streamed_rows_are_written_incrementally_and_closed():
+    rows = _Streamed(('n',), [(i,) for i in range(5000)])
+    with app.test_request_context():
+        response = rows_response(rows)
+        assert response.is_streamed
+        body = b''.join(response.iter_encoded())
+        response.close()
+    assert json.loads(body) == [{'n': i} for i in range(5000)]
+    assert rows.closed
+
+
+def test_requested_layout():
+    assert requested_layout({'format': 'compact'}) == 'columns'
+    assert requested_layout({}) == 'objects'
@@ -0,0 +1,70 @@
+"""Admin submission scoring (database_client.update_submission_score and its endpoint)."""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.utils import database_client
+from conftest import requires_postgres
+
+
+@pytest.fixture
+def submission(pg_engine):
+    with pg_engine.begin() as connection:
+        group_id = connection.execute(text("INSERT INTO groups (group_name) VALUES ('Alpha') RETURNING id")).scalar()
+        return str(connection.execute(text(
+            "INSERT INTO group_submissions (group_id, stage_number) VALUES (:group_id, 2) RETURNING id"),
+            {'group_id': group_id}).scalar())
+
+
+@requires_postgres
+def test_score_is_saved(pg_engine, submission):
+    saved = database_client.update_submission_score(submission, 18, 20, 'Good', 'late')
+    assert (saved['score'], saved['max_score'], saved['feedback'], saved['admin_notes']) == (18, 20, 'Good', 'late')
+
+
+@requires_postgres
+def test_unknown_submission_is_false(pg_engine, submission):
+    assert database_client.update_submission_score(str(uuid.uuid4()), 18, 20) is False
+
+
+@requires_postgres
+def test_database_error_is_none(pg_engine, submission):
+    with pg_engine.begin() as connection:
+        connection.execute(text("DROP TABLE group_submissions"))
+    assert database_client.update_submission_score(submission, 18, 20) is None
+
+
+class ScoreCalls(list):
+    """Stands in for update_submission_score, recording the submission ids it was called with."""
+    result = None
+
+    def __call__(self, submission_id, *args):
+        self.append(submission_id)
+        return self.result
+
+
+@pytest.fixture
+def score_calls(monkeypatch):
+    from api import index
+
+    calls = ScoreCalls()
+    monkeypatch.setattr(index, 'update_submission_score', calls)
+    return calls
+
+
+SUBMISSION = '5b1f4c8e-7d2a-4e3b-9c6f-0a1b2c3d4e5f'
+
+
+@pytest.mark.parametrize('result, status', [({'id': SUBMISSION}, 200), (False, 404), (None, 500)])
+def test_endpoint_maps_outcomes(admin_client, score_calls, result, status):
+    score_calls.result = result
+    response = admin_client.post(f'/api/admin/submissions/{SUBMISSION}/score', json={'score': 18, 'max_score': 20})
+    assert response.status_code == status
+    assert score_calls == [SUBMISSION]
+
+
+def test_endpoint_rejects_a_malformed_submission_id(admin_client, score_calls):
+    response = admin_client.post('/api/admin/submissions/nope/score', json={'score': 18})
+    assert response.status_code == 400
+    assert score_calls == []
@@ -0,0 +1,28 @@
+"""Submission status grid (api.utils.database_client.get_groups_submission_status)."""
+from types import SimpleNamespace
+
+from api.utils import database_client
+from api.utils.database_client import get_groups_submission_status
+
+
+def test_stage_mask_is_decoded_per_stage(monkeypatch):
+    rows = [
+        SimpleNamespace(id='g1', group_name='Alpha', project_title='Trees', stage_mask=0b100101),
+        SimpleNamespace(id='g2', group_name=None, project_title=None, stage_mask=0),
+    ]
+    monkeypatch.setattr(database_client, 'execute_raw_sql', lambda query: rows)
+
+    alpha, unnamed = get_groups_submission_status()
+    assert alpha == {'id': 'g1', 'group_name': 'Alpha', 'project_title': 'Trees', 'stages': {
+        'stage_1': True, 'stage_2': False, 'stage_3': True,
+        'stage_4': False, 'stage_5': False, 'stage_6': True}}
+    assert (unnamed['group_name'], unnamed['project_title']) == ('N/A', 'N/A')
+    assert not any(unnamed['stages'].values())
+
+
+def test_database_error_is_none(monkeypatch):
+    def fail(query):
+        raise RuntimeError('connection refused')
+
+    monkeypatch.setattr(database_client, 'execute_raw_sql', fail)
+    assert get_groups_submission_status() is None
@@ -0,0 +1,69 @@
+"""table_versions triggers (migrations/005_table_versions.sql); needs TEST_DATABASE_URL."""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from conftest import TEST_DATABASE_URL, requires_postgres
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'migrations', '005_table_versions.sql')
+
+pytestmark = requires_postgres
+
+
+@pytest.fixture
+def db():
+    """A scratch schema with minimal groups / group_submissions tables and migration 005 applied."""
+    engine = create_engine(TEST_DATABASE_URL)
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with engine.connect() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+        connection.execute(text(f"SET search_path TO {schema}"))
+        connection.execute(text("""
+            CREATE TABLE groups (id uuid PRIMARY KEY, group_name text, last_login timestamptz);
+            CREATE TABLE group_submissions (id uuid PRIMARY KEY, group_id uuid);
+        """))
+        with open(MIGRATION) as f:
+            connection.exec_driver_sql(f.read())
+        connection.commit()
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+            connection.commit()
+    engine.dispose()
+
+
+def _version(db):
+    return db.execute(text("SELECT version FROM table_versions WHERE table_name = 'groups'")).scalar()
+
+
+def test_login_does_not_bump_groups_version(db):
+    group_id = uuid.uuid4()
+    db.execute(text("INSERT INTO groups (id, group_name) VALUES (:id, 'A')"), {'id': group_id})
+    before = _version(db)
+
+    db.execute(text("UPDATE groups SET last_login = now() WHERE id = :id"), {'id': group_id})
+    assert _version(db) == before
+
+
+def test_rendered_change_bumps_groups_version(db):
+    group_id = uuid.uuid4()
+    db.execute(text("INSERT INTO groups (id, group_name) VALUES (:id, 'A')"), {'id': group_id})
+    before = _version(db)
+
+    db.execute(text("UPDATE groups SET group_name = 'B', last_login = now() WHERE id = :id"), {'id': group_id})
+    assert _version(db) == before + 1
+
+    db.execute(text("DELETE FROM groups WHERE id = :id"), {'id': group_id})
+    assert _version(db) == before + 2
+
+
+def test_no_op_update_does_not_bump(db):
+    db.execute(text("INSERT INTO groups (id, group_name) VALUES (:id, 'A')"), {'id': uuid.uuid4()})
+    before = _version(db)
+    db.execute(text("UPDATE groups SET group_name = group_name"))
+    assert _version(db) == before
@@ -0,0 +1,152 @@
+"""Request unit of work (database.get_db_context) on SQLite."""
+import pytest
+from sqlalchemy import event, text
+
+import database
+from database import get_db_context
+
+
+@pytest.fixture
+def notes(sqlite_sessions):
+    with sqlite_sessions.begin() as connection:
+        connection.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL)"))
+    return sqlite_sessions
+
+
+def _bodies(engine):
+    with engine.connect() as connection:
+        return [row[0] for row in connection.execute(text("SELECT body FROM notes ORDER BY id"))]
+
+
+def _failing_insert():
+    """What a database_client helper does: the error is logged and swallowed."""
+    try:
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES (NULL)"))
+    except Exception:
+        return None
+
+
+def test_failed_helper_keeps_earlier_writes_in_request(notes, flask_app):
+    with flask_app.test_request_context(method='POST'):
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('group')"))
+        assert _failing_insert() is None
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('credentials')"))
+        flask_app.process_response(flask_app.response_class())
+
+    assert _bodies(notes) == ['group', 'credentials']
+
+
+@pytest.fixture
+def statements(notes):
+    executed = []
+    event.listen(notes, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: executed.append(statement.split()[0].upper()))
+    return executed
+
+
+def test_reads_in_write_request_skip_savepoints(notes, flask_app, statements):
+    with flask_app.test_request_context(method='POST'):
+        database.execute_raw_sql("SELECT count(*) FROM notes")
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('x')"))
+        database.execute_raw_sql("SELECT count(*) FROM notes")
+        flask_app.process_response(flask_app.response_class())
+
+    assert statements == ['BEGIN', 'SELECT', 'SAVEPOINT', 'INSERT', 'RELEASE', 'SELECT']
+
+
+def test_failed_read_before_any_write_does_not_fail_the_request(notes, flask_app):
+    with flask_app.test_request_context(method='POST'):
+        with pytest.raises(Exception):
+            database.execute_raw_sql("SELECT missing FROM notes")
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('kept')"))
+        response = flask_app.process_response(flask_app.response_class())
+
+    assert response.status_code == 200
+    assert _bodies(notes) == ['kept']
+
+
+def test_failed_read_after_a_write_fails_the_request(notes, flask_app):
+    with flask_app.test_request_context(method='POST'):
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('lost')"))
+        with pytest.raises(Exception):
+            database.execute_raw_sql("SELECT missing FROM notes")
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('partial')"))
+        response = flask_app.process_response(flask_app.response_class())
+
+    # Committing 'partial' without 'lost' would leave half a request behind
+    assert response.status_code == 500
+    assert _bodies(notes) == []
+
+
+def test_request_writes_commit_once_at_end(notes, flask_app):
+    with flask_app.test_request_context(method='POST'):
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('pending')"))
+        assert _bodies(notes) == []
+        flask_app.process_response(flask_app.response_class())
+
+    assert _bodies(notes) == ['pending']
+
+
+def test_uncommitted_request_is_rolled_back_on_teardown(notes, flask_app):
+    with flask_app.test_request_context(method='POST'):
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('lost')"))
+        flask_app.do_teardown_request()
+
+    assert _bodies(notes) == []
+
+
+def test_read_only_request_error_leaves_session_usable(notes, flask_app):
+    with flask_app.test_request_context(method='GET'):
+        with pytest.raises(Exception):
+            with get_db_context(write=False) as db:
+                db.execute(text("SELECT missing FROM notes"))
+        assert database.execute_raw_sql("SELECT count(*) FROM notes")[0][0] == 0
+
+
+def test_write_during_read_only_request_is_committed(notes, flask_app):
+    with flask_app.test_request_context(method='GET'):
+        database.execute_raw_sql("SELECT count(*) FROM notes")
+        with get_db_context() as db:
+            db.execute(text("INSERT INTO notes (body) VALUES ('upgraded')"))
+        flask_app.process_response(flask_app.response_class())
+
+    assert _bodies(notes) == ['upgraded']
+
+
+def test_outside_request_each_block_commits(notes):
+    with get_db_context() as db:
+        db.execute(text("INSERT INTO notes (body) VALUES ('standalone')"))
+    assert _failing_insert() is None
+
+    assert _bodies(notes) == ['standalone']
+
+
+def test_stream_in_read_only_request_reuses_request_connection(notes, flask_app):
+    with get_db_context() as db:
+        db.execute(text("INSERT INTO notes (body) VALUES ('a'), ('b'), ('c')"))
+
+    with flask_app.test_request_context(method='GET'):
+        database.execute_raw_sql("SELECT count(*) FROM notes")
+        assert notes.pool.checkedout() == 1
+        rows = database.stream_raw_sql("SELECT body FROM notes ORDER BY id", batch_size=2)
+        assert notes.pool.checkedout() == 1
+        # Later reads in the request do not share the stream's cursor connection
+        assert database.SessionLocal() is not rows._owner
+        assert database.execute_raw_sql("SELECT count(*) FROM notes")[0][0] == 3
+        assert notes.pool.checkedout() == 2
+        flask_app.process_response(flask_app.response_class())
+        flask_app.do_teardown_request()
+        # The stream outlives the request's unit of work
+        assert rows.columns == ('body',)
+        assert list(rows) == [('a',), ('b',), ('c',)]
+
+    assert notes.pool.checkedout() == 0
@@ -0,0 +1,101 @@
+"""Buffered module view counter (api.utils.view_counter)."""
+import threading
+import time
+
+import pytest
+
+from api.utils import database_client
+from api.utils.view_counter import ViewCounter
+
+
+class FakeViews:
+    """module_views table stand-in for add_module_views/get_module_view_counts."""
+
+    def __init__(self, totals=None):
+        self.totals = dict(totals or {})
+        self.batches = []
+        self.fail = False
+        self.flushed = threading.Event()
+        self.loaded_on = []
+
+    def add(self, deltas):
+        if self.fail:
+            return False
+        self.batches.append(dict(deltas))
+        for key, n in deltas.items():
+            self.totals[key] = self.totals.get(key, 0) + n
+        self.flushed.set()
+        return True
+
+    def counts(self):
+        self.loaded_on.append(threading.current_thread())
+        return dict(self.totals)
+
+
+def wait_for_totals(counter):
+    deadline = time.monotonic() + 2
+    while not counter._totals and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def views(monkeypatch):
+    fake = FakeViews({('cmsc173', 1): 10})
+    monkeypatch.setattr(database_client, 'add_module_views', fake.add)
+    monkeypatch.setattr(database_client, 'get_module_view_counts', fake.counts)
+    return fake
+
+
+def test_totals_are_loaded_off_the_request_thread(views):
+    counter = ViewCounter(interval=3600, max_pending=1000)
+    # Before the totals arrive, a page shows this worker's views
+    assert counter.record('cmsc173', 1) in (1, 11)
+    wait_for_totals(counter)
+    assert views.loaded_on == [counter._thread]
+    assert counter.count('cmsc173', 1) == 11
+
+
+def test_views_are_counted_in_memory_and_flushed_in_one_batch(views):
+    counter = ViewCounter(interval=3600, max_pending=1000)
+    counter.record('cmsc173', 1)
+    wait_for_totals(counter)
+    assert counter.record('cmsc173', 1) == 12
+    assert counter.record('cmsc178ip', 2) == 1
+    assert views.batches == []
+
+    assert counter.flush()
+    assert views.batches == [{('cmsc173', 1): 2, ('cmsc178ip', 2): 1}]
+    assert counter.count('cmsc173', 1) == 12
+    assert counter.flush() and len(views.batches) == 1
+
+
+def test_failed_flush_keeps_views_for_the_next_one(views):
+    counter = ViewCounter(interval=3600, max_pending=1000)
+    counter.record('cmsc173', 1)
+    wait_for_totals(counter)
+    views.fail = True
+    assert not counter.flush()
+    assert counter.count('cmsc173', 1) == 11
+
+    counter.record('cmsc173', 1)
+    views.fail = False
+    assert counter.flush()
+    assert views.batches == [{('cmsc173', 1): 2}]
+    assert views.totals[('cmsc173', 1)] == 12
+
+
+def test_totals_pick_up_other_workers_views(views):
+    counter = ViewCounter(interval=3600, max_pending=1000)
+    counter.record('cmsc173', 1)
+    wait_for_totals(counter)
+    views.totals[('cmsc173', 1)] += 5
+    counter.flush()
+    assert counter.count('cmsc173', 1) == 16
+
+
+def test_enough_pending_views_wake_the_flusher(views):
+    counter = ViewCounter(interval=3600, max_pending=3)
+    for _ in range(3):
+        counter.record('cmsc173', 2)
+    assert views.flushed.wait(2)
+    assert views.batches == [{('cmsc173', 2): 3}]